@@ -0,0 +1,74 @@
+"""
+Price alert benchmark.
+
+Fills an in-memory alert engine with random alerts around the current prices, then
+replays a random walk of price ticks and reports the evaluation time per tick and
+how many alerts each tick triggered.
+
+Usage:
+    python benchmarks/alerts.py [--alerts 100000] [--symbols 6] [--ticks 2000]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from telegram_bot.components.alerts import AlertEngine  # noqa: E402
+
+
+def build_engine(alert_count, symbols, chats, seed=0):
+    """
+    Create an engine holding `alert_count` alerts spread over `symbols` and `chats`.
+
+    Returns:
+        tuple: (AlertEngine, dict of starting prices)
+    """
+    rng = random.Random(seed)
+    prices = {symbol: 100.0 * (index + 1) for index, symbol in enumerate(symbols)}
+    engine = AlertEngine(max_per_chat=alert_count)
+    for _ in range(alert_count):
+        symbol = rng.choice(symbols)
+        direction = rng.choice(("above", "below"))
+        # Thresholds within +-20% of the price, on the side that has not triggered yet
+        offset = rng.uniform(0.001, 0.2) * prices[symbol]
+        threshold = prices[symbol] + offset if direction == "above" else prices[symbol] - offset
+        engine.add(rng.randrange(chats), symbol, direction, threshold)
+    return engine, prices
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure price alert evaluation per tick.")
+    parser.add_argument("--alerts", type=int, default=100000, help="Active alerts")
+    parser.add_argument("--symbols", type=int, default=6, help="Symbols the alerts are spread over")
+    parser.add_argument("--chats", type=int, default=10000, help="Chats the alerts belong to")
+    parser.add_argument("--ticks", type=int, default=2000, help="Price ticks replayed (one price per symbol each)")
+    args = parser.parse_args(argv)
+
+    symbols = [f"SYM{index}" for index in range(args.symbols)]
+    started = time.perf_counter()
+    engine, prices = build_engine(args.alerts, symbols, args.chats)
+    print(f"indexed {len(engine)} alerts in {time.perf_counter() - started:.2f}s")
+
+    rng = random.Random(1)
+    timings, triggered = [], []
+    for _ in range(args.ticks):
+        for symbol in symbols:
+            prices[symbol] *= 1 + rng.gauss(0, 0.001)
+        started = time.perf_counter()
+        fired = engine.check(prices)
+        timings.append((time.perf_counter() - started) * 1e6)
+        triggered.append(len(fired))
+
+    timings.sort()
+    print(f"{args.ticks} ticks x {args.symbols} symbols: median {statistics.median(timings):.1f} us, "
+          f"p99 {timings[int(len(timings) * 0.99)]:.1f} us, max {timings[-1]:.1f} us per tick")
+    print(f"triggered {sum(triggered)} alerts, at most {max(triggered)} in one tick; {len(engine)} remain")
+
+
+if __name__ == "__main__":
+    main()
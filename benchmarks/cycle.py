@@ -0,0 +1,232 @@
+"""
+End-to-end monitoring pass benchmark.
+
+Runs the replay server with synthetic markets in its own process, then, for each size,
+a SignalMonitor over that many symbols in another process, talking to the replay server
+over HTTP like it talks to CoinEx, CoinMarketCap and Telegram. Each run makes one cold
+pass that warms the candle store, then `--cycles` passes with one new candle per symbol
+each. Reports passes per second, the p50/p99 duration of each pass stage and the peak
+memory, appends the results to benchmarks/results/cycle.jsonl and compares them with the
+previous run of the same size and options there.
+
+Usage:
+    python benchmarks/cycle.py [--symbols 6 100 1000 10000] [--cycles 10] [--latency 0.0] [--http-client httpx]
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+RESULTS = ROOT / "benchmarks" / "results" / "cycle.jsonl"
+STAGES = ("fetch", "evaluate", "price", "dispatch")
+INTERVAL = "1hour"
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def write_config(symbols, replay_url, concurrency, http_client):
+    config = yaml.safe_load((ROOT / "config" / "config.yaml").read_text())
+    config["bot"].update({"symbols": symbols, "interval": INTERVAL, "timeframes": []})
+    config["monitor"].update({"concurrency": concurrency, "signal_mode": "streaming", "snapshot_path": None})
+    config["http"]["pool_size"] = concurrency
+    config["exchange"]["kline_url"] = f"{replay_url}/v1/market/kline"
+    config["api"]["coinmarketcap"]["quotes_url"] = f"{replay_url}/v1/cryptocurrency/quotes/latest"
+    config["telegram"].update({"api_url": f"{replay_url}/bot", "global_rate": 1000, "chat_rate": 1000, "chat_burst": 1000,
+                               "http_client": http_client})
+    config["state"] = {"backend": "memory"}
+    path = Path(tempfile.mkdtemp()) / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return path
+
+
+async def run_child(args):
+    """
+    Benchmark one size in this process and print the result as one JSON line.
+    """
+    import aiohttp
+    from telegram import Bot
+    from telegram.request import HTTPXRequest
+
+    from telegram_bot.components.bot_request import AiohttpRequest
+    from telegram_bot.components.candle_store import INTERVAL_SECONDS
+    from telegram_bot.components.message_queue import MessageQueue, message_queue_settings
+    from telegram_bot.components.monitor import SignalMonitor
+    from telegram_bot.config.configuration import get_configuration_manager
+
+    symbols = [f"S{index:05d}USDT" for index in range(args.child)]
+    config_manager = get_configuration_manager(
+        str(write_config(symbols, args.replay_url, args.concurrency, args.http_client))
+    )
+    # The same Bot API client and pool the bot builds from telegram.http_client
+    pool_size = int(config_manager.get("telegram.pool_size", 256))
+    if config_manager.get("telegram.http_client", "httpx") == "aiohttp":
+        request = AiohttpRequest(pool_size)
+    else:
+        request = HTTPXRequest(connection_pool_size=pool_size)
+    bot = Bot(config_manager.get("bot.token"), base_url=config_manager.get("telegram.api_url"), request=request)
+    await bot.initialize()
+    outbox = MessageQueue(bot, **message_queue_settings(config_manager))
+    outbox.start()
+    monitor = SignalMonitor(config_manager, outbox=outbox)
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    async with aiohttp.ClientSession() as control:
+        async def advance():
+            async with control.post(f"{args.replay_url}/_replay/advance",
+                                    params={"seconds": INTERVAL_SECONDS[INTERVAL]}) as response:
+                await response.read()
+
+        started = time.perf_counter()
+        await monitor.run_symbols(symbols)
+        cold = time.perf_counter() - started
+
+        passes, stages, changed = [], {stage: [] for stage in STAGES}, []
+        for _ in range(args.cycles):
+            await advance()
+            started = time.perf_counter()
+            changed.append(len(await monitor.run_symbols(symbols)))
+            passes.append(time.perf_counter() - started)
+            for stage in STAGES:
+                stages[stage].append(monitor.last_pass[stage])
+
+    await outbox.stop()
+    await monitor.close()
+    await bot.shutdown()
+    print(json.dumps({
+        "symbols": args.child,
+        "cycles": args.cycles,
+        "passes_per_second": len(passes) / sum(passes),
+        "pass_p50": statistics.median(passes),
+        "pass_p99": percentile(passes, 0.99),
+        "stages": {stage: {"p50": statistics.median(values), "p99": percentile(values, 0.99)}
+                   for stage, values in stages.items()},
+        "cold_pass": cold,
+        "changed_per_pass": statistics.median(changed),
+        "baseline_rss_mb": baseline_rss / 1024,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def start_replay_server(latency):
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "telegram_bot.components.replay", "serve", "--port", "0", "--latency", str(latency)],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, env=env,
+    )
+    for line in server.stdout:
+        if "listening on" in line:
+            return server, line.rsplit(" ", 1)[-1].strip()
+    raise RuntimeError("Replay server did not start")
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout
+        # Results appended by earlier runs do not change what is measured
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no", "--", ".",
+                                f":!{RESULTS.parent.relative_to(ROOT)}"], cwd=ROOT, capture_output=True, text=True).stdout
+    except OSError:
+        return None
+    return commit.strip() + ("-dirty" if dirty.strip() else "")
+
+
+def previous_results(options):
+    """
+    Return the latest stored result per size that was measured with the same options.
+    """
+    previous = {}
+    if RESULTS.exists():
+        for line in RESULTS.read_text().splitlines():
+            record = json.loads(line)
+            # Runs recorded before the option existed all used aiohttp for the Bot API
+            if dict({"http_client": "aiohttp"}, **record.get("options", {})) == options:
+                previous[record["symbols"]] = record
+    return previous
+
+
+def change(current, before):
+    return f"{(current / before - 1) * 100:+.1f}%" if before else "n/a"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure monitoring passes end to end against the replay server.")
+    parser.add_argument("--symbols", type=int, nargs="+", default=[6, 100, 1000, 10000], help="Sizes to measure")
+    parser.add_argument("--cycles", type=int, default=10, help="Passes measured per size after the cold pass")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the replay server adds to every response")
+    parser.add_argument("--concurrency", type=int, default=64, help="monitor.concurrency and http.pool_size")
+    parser.add_argument("--http-client", choices=["httpx", "aiohttp"],
+                        help="Bot API client; telegram.http_client of config/config.yaml by default")
+    parser.add_argument("--no-save", action="store_true", help=f"Do not append the results to {RESULTS.relative_to(ROOT)}")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--replay-url", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        asyncio.run(run_child(args))
+        return
+
+    if args.http_client is None:
+        config = yaml.safe_load((ROOT / "config" / "config.yaml").read_text())
+        args.http_client = (config.get("telegram") or {}).get("http_client") or "httpx"
+    options = {"cycles": args.cycles, "latency": args.latency, "concurrency": args.concurrency,
+               "http_client": args.http_client}
+    previous = previous_results(options)
+    server, replay_url = start_replay_server(args.latency)
+    results = []
+    try:
+        for size in args.symbols:
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", str(size), "--cycles", str(args.cycles), "--replay-url", replay_url,
+                 "--concurrency", str(args.concurrency), "--http-client", args.http_client],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+    finally:
+        server.terminate()
+        server.wait()
+
+    revision = git_revision()
+    print(f"{'symbols':>8} {'passes/s':>9} {'pass p50':>9} {'pass p99':>9} "
+          + " ".join(f"{stage + ' p50/p99 ms':>21}" for stage in STAGES)
+          + f" {'cold pass':>9} {'peak RSS':>9} {'vs previous':>12}")
+    for result in results:
+        before = previous.get(result["symbols"])
+        print(f"{result['symbols']:>8} {result['passes_per_second']:>9.2f} {result['pass_p50'] * 1000:>7.1f}ms "
+              f"{result['pass_p99'] * 1000:>7.1f}ms "
+              + " ".join(f"{result['stages'][stage]['p50'] * 1000:>10.1f}/{result['stages'][stage]['p99'] * 1000:<10.1f}"
+                         for stage in STAGES)
+              + f" {result['cold_pass']:>8.2f}s {result['peak_rss_mb']:>7.0f}MB "
+              f"{change(result['passes_per_second'], before['passes_per_second']) if before else 'n/a':>12}"
+              + (f" (vs {before['revision']})" if before else ""))
+
+    if not args.no_save:
+        RESULTS.parent.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+        with RESULTS.open("a") as file:
+            for result in results:
+                file.write(json.dumps({"revision": revision, "date": stamp, "python": platform.python_version(),
+                                       "machine": f"{platform.machine()} x{os.cpu_count()}", "options": options,
+                                       **result}) + "\n")
+        print(f"Results appended to {RESULTS.relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
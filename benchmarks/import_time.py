@@ -0,0 +1,90 @@
+"""
+Import-time benchmark.
+
+Imports each target in a fresh interpreter, with the bot's environment variables
+removed, and reports the median wall time and which heavy third-party modules the
+import pulled in.
+
+Usage:
+    python benchmarks/import_time.py [--runs 7] [module ...]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIRECTORY = Path(__file__).resolve().parent.parent / "src"
+
+DEFAULT_TARGETS = [
+    "telegram_bot",
+    "telegram_bot.config.configuration",
+    "telegram_bot.components.utils",
+    "telegram_bot.components.command_handler",
+    "telegram_bot.components.backtest",
+    "telegram_bot.main",
+]
+
+# Modules whose presence after an import is reported
+HEAVY_MODULES = ["numpy", "yaml", "requests", "httpx", "telebot", "telegram", "asyncio"]
+
+# Environment variables the bot reads; removed to prove imports do not need them
+BOT_ENV_VARS = ["TELEGRAM_BOT_TOKEN", "TELEGRAM_CHAT_ID", "COINMARKETCAP_API_KEY"]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure(module, runs=7):
+    """
+    Import a module in `runs` fresh interpreters.
+
+    Args:
+        module (str): Dotted module name.
+        runs (int): Number of interpreters to start.
+
+    Returns:
+        dict: Median and minimum import time in milliseconds and the heavy modules loaded,
+        or the error output if the import failed.
+    """
+    env = {name: value for name, value in os.environ.items() if name not in BOT_ENV_VARS}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIRECTORY), env.get("PYTHONPATH")]))
+    timings, loaded = [], []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, env=env,
+        )
+        if result.returncode != 0:
+            return {"module": module, "error": result.stderr.strip().splitlines()[-1]}
+        sample = json.loads(result.stdout.strip().splitlines()[-1])
+        timings.append(sample["seconds"] * 1000)
+        loaded = sample["loaded"]
+    return {"module": module, "median_ms": statistics.median(timings), "min_ms": min(timings), "loaded": loaded}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the import time of the package and its modules.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_TARGETS, help="Modules to import")
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters per module")
+    args = parser.parse_args(argv)
+
+    print(f"{'module':<42} {'median ms':>10} {'min ms':>8}  heavy modules loaded")
+    for module in args.modules:
+        result = measure(module, args.runs)
+        if "error" in result:
+            print(f"{module:<42} {'FAILED':>10}  {result['error']}")
+            continue
+        print(f"{module:<42} {result['median_ms']:>10.1f} {result['min_ms']:>8.1f}  {', '.join(result['loaded']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
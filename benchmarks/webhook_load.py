@@ -0,0 +1,197 @@
+"""
+Webhook load test.
+
+Starts a fake Telegram Bot API and the bot in webhook mode in this process, then posts
+synthetic `/price` and `/start` updates to the webhook and reports the acknowledged
+updates per second, the webhook acknowledgement latency, and the handler latency from
+posting an update to the fake API receiving its reply. Quotes are pre-seeded in the
+price cache, so no upstream API is called.
+
+Usage:
+    python benchmarks/webhook_load.py [--updates 5000] [--clients 64] [--concurrency 32]
+                                     [--http-client aiohttp]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+TOKEN = "123456:load-test"
+SECRET = "load-test-secret"
+SEEDED_QUOTES = {"BTC": 65000.0, "ETH": 3000.0, "SOL": 150.0, "BNB": 600.0, "ADA": 0.45, "XRP": 0.6}
+
+
+class FakeBotApi:
+    """
+    Minimal Bot API answering the methods the bot calls and timing every reply per chat.
+    """
+
+    def __init__(self):
+        self.replies = {}  # chat id -> perf_counter time the reply arrived
+        self.done = asyncio.Event()
+        self.expected = 0
+        self._runner = None
+        self.port = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}/bot"
+
+    async def start(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_route("POST", "/{path:.*}", self._method)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+    async def _method(self, request):
+        from aiohttp import web
+
+        method = request.match_info["path"].rsplit("/", 1)[-1]
+        params = dict(await request.post()) if request.can_read_body else {}
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Load", "username": "load_test_bot"}
+        elif method == "sendMessage":
+            chat_id = int(params["chat_id"])
+            self.replies[chat_id] = time.perf_counter()
+            if len(self.replies) >= self.expected:
+                self.done.set()
+            result = {"message_id": chat_id, "date": int(time.time()), "chat": {"id": chat_id, "type": "private"},
+                      "text": params.get("text", "")}
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+
+def synthetic_update(update_id):
+    """
+    Build a private-chat update alternating between `/price <coin>` and `/start`.
+    """
+    coins = list(SEEDED_QUOTES)
+    text = f"/price {coins[update_id % len(coins)]}" if update_id % 2 else "/start"
+    command = text.split()[0]
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": update_id, "type": "private"},
+            "from": {"id": update_id, "is_bot": False, "first_name": "Load"},
+            "text": text,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(command)}],
+        },
+    }
+
+
+def write_config(api_url, concurrency, max_pending, http_client):
+    config = yaml.safe_load((ROOT / "config" / "config.yaml").read_text())
+    config["bot"].update({"token": TOKEN, "mode": "webhook"})
+    config["webhook"] = {"listen": "127.0.0.1", "port": 0, "path": "/telegram", "secret_token": SECRET,
+                         "concurrency": concurrency, "max_pending": max_pending}
+    config["telegram"].update({"api_url": api_url, "http_client": http_client})
+    config["cache"]["ttl"] = 3600
+    config["metrics"]["enabled"] = False
+    path = Path(tempfile.mkdtemp()) / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return path
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run(args):
+    import aiohttp
+
+    from telegram_bot.components.price_cache import get_price_cache
+    from telegram_bot.components.webhook import SECRET_TOKEN_HEADER, WebhookServer, serve_webhook
+    from telegram_bot.config.configuration import get_configuration_manager
+    from telegram_bot.main import initialize_bot
+
+    api = FakeBotApi()
+    await api.start()
+    config_manager = get_configuration_manager(str(write_config(api.base_url, args.concurrency, args.max_pending, args.http_client)))
+    get_price_cache(config_manager).update(SEEDED_QUOTES)
+    application = initialize_bot(config_manager)
+    server = WebhookServer(application, "127.0.0.1", 0, "/telegram", SECRET, args.max_pending)
+    stop_event = asyncio.Event()
+    serving = asyncio.create_task(serve_webhook(application, server, stop_event=stop_event))
+    while not application.running or not server.port:
+        await asyncio.sleep(0.01)
+
+    url = f"http://127.0.0.1:{server.port}/telegram"
+    bodies = [json.dumps(synthetic_update(update_id)).encode() for update_id in range(1, args.updates + 1)]
+    api.expected = args.updates
+    sent_at, acks, statuses = {}, [], {}
+    next_update = iter(range(args.updates))
+
+    async def client(session):
+        for index in next_update:
+            started = time.perf_counter()
+            sent_at[index + 1] = started
+            async with session.post(url, data=bodies[index], headers={SECRET_TOKEN_HEADER: SECRET,
+                                                                      "Content-Type": "application/json"}) as response:
+                await response.read()
+            acks.append(time.perf_counter() - started)
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+
+    started = time.perf_counter()
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=args.clients)) as session:
+        await asyncio.gather(*(client(session) for _ in range(args.clients)))
+        acked = time.perf_counter() - started
+        try:
+            await asyncio.wait_for(api.done.wait(), timeout=args.timeout)
+        except asyncio.TimeoutError:
+            pass
+    handled = time.perf_counter() - started
+
+    stop_event.set()
+    await serving
+    await api.stop()
+
+    latencies = [api.replies[chat_id] - sent_at[chat_id] for chat_id in api.replies]
+    print(f"{args.updates} updates, {args.clients} clients, handler concurrency {args.concurrency}, "
+          f"{args.http_client}: "
+          f"HTTP statuses {statuses}")
+    print(f"acknowledged: {args.updates / acked:.0f} updates/s; ack latency p50 {statistics.median(acks) * 1000:.2f} ms, "
+          f"p99 {percentile(acks, 0.99) * 1000:.2f} ms")
+    if latencies:
+        print(f"handled: {len(latencies)} replies, {len(latencies) / handled:.0f} updates/s; handler latency "
+              f"p50 {statistics.median(latencies) * 1000:.2f} ms, p99 {percentile(latencies, 0.99) * 1000:.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay synthetic updates against the webhook server.")
+    parser.add_argument("--updates", type=int, default=5000, help="Updates to post")
+    parser.add_argument("--clients", type=int, default=64, help="Concurrent HTTP clients")
+    parser.add_argument("--concurrency", type=int, default=32, help="webhook.concurrency: handlers run at once")
+    parser.add_argument("--max-pending", type=int, default=100000, help="webhook.max_pending")
+    parser.add_argument("--http-client", choices=("aiohttp", "httpx"), default="aiohttp",
+                        help="telegram.http_client: client for Bot API calls")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds to wait for the replies")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -31,7 +31,11 @@ setuptools.setup(
         "numpy",
         "python-decouple",
         "telebot",
-        "python-telegram-bot",
+        "python-telegram-bot[job-queue]",
         "pyyaml",
+        "aiohttp",
     ],  # Dependencies
+    extras_require={
+        "fast": ["orjson"],  # Faster decoding of kline responses and WebSocket messages
+    },
 )
@@ -3,23 +3,39 @@ Telegram Bot Package Initialization.
 
 This module initializes the `telegram_bot` package by exposing the following components:
 - Command Handlers: `start_command`, `get_crypto_price`
-- Utility Functions: `fetch_crypto_price`, `check_signals`
+- Utility Functions: `fetch_crypto_price`, `fetch_crypto_prices`, `check_signals`
 - Configuration Management: `ConfigurationManager`
 
+Components are imported on first access, so importing the package itself loads no
+third-party modules, reads no configuration and needs no environment variables.
+
 Usage:
     from telegram_bot import start_command, ConfigurationManager
 """
 
-# Expose components as part of the package
-from .components.command_handler import start_command, get_crypto_price
-from .components.utils import fetch_crypto_price, check_signals
-from .config.configuration import ConfigurationManager
+import importlib
+
+# Public name -> module providing it, imported on first access
+_EXPORTS = {
+    "start_command": ".components.command_handler",
+    "get_crypto_price": ".components.command_handler",
+    "fetch_crypto_price": ".components.utils",
+    "fetch_crypto_prices": ".components.utils",
+    "check_signals": ".components.utils",
+    "ConfigurationManager": ".config.configuration",
+}
 
 # Define the public API for the package
-__all__ = [
-    "start_command",
-    "get_crypto_price",
-    "fetch_crypto_price",
-    "check_signals",
-    "ConfigurationManager",
-]
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,9 +1,24 @@
-from .command_handler import start_command, get_crypto_price
-from .utils import fetch_crypto_price, check_signals
-
-__all__ = [
-    "start_command",
-    "get_crypto_price",
-    "fetch_crypto_price",
-    "check_signals",
-]
+import importlib
+
+# Public name -> module providing it, imported on first access
+_EXPORTS = {
+    "start_command": ".command_handler",
+    "get_crypto_price": ".command_handler",
+    "fetch_crypto_price": ".utils",
+    "fetch_crypto_prices": ".utils",
+    "check_signals": ".utils",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,436 @@
+import bisect
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from telegram_bot.components.metrics import REGISTRY, instrumented
+
+# Alert directions: "above" fires once the price is at or above the threshold, "below" at or below it
+DIRECTIONS = ("above", "below")
+
+ALERTS_ACTIVE = REGISTRY.gauge("telegram_bot_alerts_active", "Price alerts waiting to trigger.")
+ALERTS_TRIGGERED = REGISTRY.counter("telegram_bot_alerts_triggered_total", "Price alerts triggered.")
+
+
+class MemoryAlertStore:
+    """
+    In-process alert store. Alerts are lost on restart; use `SQLiteAlertStore` to keep them.
+
+    Alerts are (alert_id, chat_id, symbol, direction, threshold) tuples.
+    """
+
+    def __init__(self):
+        self._alerts = {}
+        self._ids = itertools.count(1)
+
+    def load(self):
+        """
+        Return every stored alert.
+
+        Returns:
+            list: Alert tuples ordered by id.
+        """
+        return [self._alerts[alert_id] for alert_id in sorted(self._alerts)]
+
+    def add(self, chat_id, symbol, direction, threshold):
+        """
+        Store a new alert.
+
+        Args:
+            chat_id (int): Telegram chat that is notified.
+            symbol (str): Cryptocurrency symbol (e.g., "BTC").
+            direction (str): "above" or "below".
+            threshold (float): Price that triggers the alert.
+
+        Returns:
+            tuple: The stored alert.
+        """
+        alert = (next(self._ids), chat_id, symbol, direction, float(threshold))
+        self._alerts[alert[0]] = alert
+        return alert
+
+    def remove_many(self, alert_ids):
+        """
+        Delete several alerts in one batch.
+
+        Args:
+            alert_ids (list): Ids of the alerts to delete.
+
+        Returns:
+            None
+        """
+        for alert_id in alert_ids:
+            self._alerts.pop(alert_id, None)
+
+    def close(self):
+        pass
+
+    def __repr__(self):
+        return f"<MemoryAlertStore(alerts={len(self._alerts)})>"
+
+
+class SQLiteAlertStore(MemoryAlertStore):
+    """
+    Alert store backed by an SQLite database in WAL mode; triggered alerts are deleted
+    in one transaction per check.
+    """
+
+    def __init__(self, path="data/alerts.db"):
+        """
+        Initialize the SQLiteAlertStore.
+
+        Args:
+            path (str): Database file path; created if missing.
+        """
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS price_alert (id INTEGER PRIMARY KEY AUTOINCREMENT, chat_id INTEGER, "
+            "symbol TEXT, direction TEXT, threshold REAL, created_at REAL)"
+        )
+
+    def load(self):
+        with self._lock:
+            return self._connection.execute(
+                "SELECT id, chat_id, symbol, direction, threshold FROM price_alert ORDER BY id"
+            ).fetchall()
+
+    def add(self, chat_id, symbol, direction, threshold):
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO price_alert (chat_id, symbol, direction, threshold, created_at) VALUES (?, ?, ?, ?, ?)",
+                (chat_id, symbol, direction, float(threshold), time.time()),
+            )
+        return cursor.lastrowid, chat_id, symbol, direction, float(threshold)
+
+    def remove_many(self, alert_ids):
+        if not alert_ids:
+            return
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                cursor.executemany("DELETE FROM price_alert WHERE id = ?", [(alert_id,) for alert_id in alert_ids])
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __repr__(self):
+        return f"<SQLiteAlertStore(path={self.path})>"
+
+
+class _Thresholds:
+    """
+    Thresholds of one symbol and direction, kept sorted with the alert ids alongside.
+    """
+
+    def __init__(self):
+        self.prices = []
+        self.ids = []
+
+    def insert(self, threshold, alert_id):
+        position = bisect.bisect_right(self.prices, threshold)
+        self.prices.insert(position, threshold)
+        self.ids.insert(position, alert_id)
+
+    def remove(self, threshold, alert_id):
+        position = bisect.bisect_left(self.prices, threshold)
+        while self.ids[position] != alert_id:
+            position += 1
+        del self.prices[position]
+        del self.ids[position]
+
+    def pop_at_or_below(self, price):
+        if not self.prices or self.prices[0] > price:
+            return []
+        end = bisect.bisect_right(self.prices, price)
+        ids = self.ids[:end]
+        del self.prices[:end]
+        del self.ids[:end]
+        return ids
+
+    def pop_at_or_above(self, price):
+        if not self.prices or self.prices[-1] < price:
+            return []
+        start = bisect.bisect_left(self.prices, price)
+        ids = self.ids[start:]
+        del self.prices[start:]
+        del self.ids[start:]
+        return ids
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class AlertEngine:
+    """
+    User price alerts indexed for per-tick evaluation.
+
+    Each symbol keeps its "above" and "below" thresholds in sorted arrays, so a price
+    tick finds every triggered alert with one binary search per direction, in
+    O(log n + triggered) time regardless of how many alerts are waiting. Alerts are
+    one-shot: triggered alerts are removed from the index and deleted from the store
+    in one batch.
+
+    Methods are serialized by a lock, so they can run in worker threads (e.g., via
+    `asyncio.to_thread`) while the store waits on the database.
+    """
+
+    def __init__(self, store=None, max_per_chat=50):
+        """
+        Initialize the AlertEngine and load the stored alerts.
+
+        Args:
+            store (MemoryAlertStore, optional): Persistence; in-memory by default.
+            max_per_chat (int): Active alerts a chat may hold.
+        """
+        self.store = store if store is not None else MemoryAlertStore()
+        self.max_per_chat = int(max_per_chat)
+        self._alerts = {}  # alert id -> alert
+        self._chats = {}  # chat id -> set of alert ids
+        self._index = {}  # symbol -> {"above": _Thresholds, "below": _Thresholds}
+        self._lock = threading.Lock()
+        self._load(self.store.load())
+        ALERTS_ACTIVE.set(len(self._alerts))
+
+    def _load(self, alerts):
+        """
+        Build the index from stored alerts with one sort instead of one insertion each.
+        """
+        entries = {}
+        for alert in alerts:
+            alert_id, chat_id, symbol, direction, threshold = alert
+            self._alerts[alert_id] = alert
+            self._chats.setdefault(chat_id, set()).add(alert_id)
+            entries.setdefault((symbol, direction), []).append((threshold, alert_id))
+        for (symbol, direction), pairs in entries.items():
+            pairs.sort()
+            thresholds = self._index.setdefault(symbol, {"above": _Thresholds(), "below": _Thresholds()})[direction]
+            thresholds.prices = [threshold for threshold, _ in pairs]
+            thresholds.ids = [alert_id for _, alert_id in pairs]
+
+    def _insert(self, alert):
+        alert_id, chat_id, symbol, direction, threshold = alert
+        self._alerts[alert_id] = alert
+        self._chats.setdefault(chat_id, set()).add(alert_id)
+        sides = self._index.setdefault(symbol, {"above": _Thresholds(), "below": _Thresholds()})
+        sides[direction].insert(threshold, alert_id)
+
+    def _discard(self, alert_id):
+        alert = self._alerts.pop(alert_id)
+        chat_alerts = self._chats[alert[1]]
+        chat_alerts.discard(alert_id)
+        if not chat_alerts:
+            del self._chats[alert[1]]
+        return alert
+
+    def _prune(self, symbol):
+        sides = self._index[symbol]
+        if not len(sides["above"]) and not len(sides["below"]):
+            del self._index[symbol]
+
+    def add(self, chat_id, symbol, direction, threshold):
+        """
+        Create an alert.
+
+        Args:
+            chat_id (int): Telegram chat that is notified.
+            symbol (str): Cryptocurrency symbol (e.g., "BTC").
+            direction (str): "above" or "below".
+            threshold (float): Price that triggers the alert.
+
+        Returns:
+            tuple: The new (alert_id, chat_id, symbol, direction, threshold) alert.
+
+        Raises:
+            ValueError: If the direction or threshold is invalid or the chat holds too many alerts.
+        """
+        with self._lock:
+            if direction not in DIRECTIONS:
+                raise ValueError(f"Direction must be one of {', '.join(DIRECTIONS)}")
+            if not threshold > 0:
+                raise ValueError("The price must be positive")
+            if len(self._chats.get(chat_id, ())) >= self.max_per_chat:
+                raise ValueError(f"A chat can hold at most {self.max_per_chat} alerts")
+            alert = self.store.add(chat_id, symbol.upper(), direction, float(threshold))
+            self._insert(alert)
+            ALERTS_ACTIVE.set(len(self._alerts))
+            return alert
+
+    def remove(self, chat_id, alert_id):
+        """
+        Delete one of a chat's alerts.
+
+        Args:
+            chat_id (int): Chat owning the alert.
+            alert_id (int): Id of the alert.
+
+        Returns:
+            bool: False if the chat has no such alert.
+        """
+        with self._lock:
+            if alert_id not in self._chats.get(chat_id, ()):
+                return False
+            _, _, symbol, direction, threshold = self._discard(alert_id)
+            self._index[symbol][direction].remove(threshold, alert_id)
+            self._prune(symbol)
+            self.store.remove_many([alert_id])
+            ALERTS_ACTIVE.set(len(self._alerts))
+            return True
+
+    def remove_chat(self, chat_id):
+        """
+        Delete every alert of a chat.
+
+        Args:
+            chat_id (int): Chat owning the alerts.
+
+        Returns:
+            int: Number of alerts deleted.
+        """
+        with self._lock:
+            alert_ids = sorted(self._chats.get(chat_id, ()))
+            for alert_id in alert_ids:
+                _, _, symbol, direction, threshold = self._discard(alert_id)
+                self._index[symbol][direction].remove(threshold, alert_id)
+                self._prune(symbol)
+            self.store.remove_many(alert_ids)
+            ALERTS_ACTIVE.set(len(self._alerts))
+            return len(alert_ids)
+
+    def alerts(self, chat_id):
+        """
+        Return a chat's active alerts.
+
+        Args:
+            chat_id (int): Telegram chat.
+
+        Returns:
+            list: Alert tuples ordered by id.
+        """
+        with self._lock:
+            return [self._alerts[alert_id] for alert_id in sorted(self._chats.get(chat_id, ()))]
+
+    def symbols(self):
+        """
+        Return the symbols that have active alerts.
+
+        Returns:
+            list: Cryptocurrency symbols (e.g., ["BTC", "ETH"]).
+        """
+        with self._lock:
+            return list(self._index)
+
+    @instrumented("alert_check")
+    def check(self, prices):
+        """
+        Trigger the alerts crossed by a price tick.
+
+        Args:
+            prices (dict): Mapping of symbol to its latest price.
+
+        Returns:
+            list: Triggered alert tuples, removed from the engine and the store.
+        """
+        with self._lock:
+            triggered = []
+            for symbol, price in prices.items():
+                sides = self._index.get(symbol)
+                if sides is None or price is None:
+                    continue
+                alert_ids = sides["above"].pop_at_or_below(price) + sides["below"].pop_at_or_above(price)
+                if alert_ids:
+                    triggered.extend(self._discard(alert_id) for alert_id in alert_ids)
+                    self._prune(symbol)
+            if triggered:
+                self.store.remove_many([alert[0] for alert in triggered])
+                ALERTS_TRIGGERED.inc(len(triggered))
+                ALERTS_ACTIVE.set(len(self._alerts))
+            return triggered
+
+    def close(self):
+        self.store.close()
+
+    def __len__(self):
+        return len(self._alerts)
+
+    def __repr__(self):
+        return f"<AlertEngine(alerts={len(self._alerts)}, symbols={len(self._index)}, store={self.store!r})>"
+
+
+def alert_messages(triggered, prices):
+    """
+    Group triggered alerts into one notification per chat.
+
+    Args:
+        triggered (list): Alert tuples returned by `AlertEngine.check`.
+        prices (dict): Mapping of symbol to the price that triggered them.
+
+    Returns:
+        dict: Mapping of chat id to its message.
+    """
+    lines = {}
+    for alert_id, chat_id, symbol, direction, threshold in triggered:
+        lines.setdefault(chat_id, []).append(
+            f"🔔 {symbol} is {direction} {threshold:g} USD (now {prices[symbol]:.6g} USD) [#{alert_id}]"
+        )
+    return {chat_id: "\n".join(chat_lines) for chat_id, chat_lines in lines.items()}
+
+
+def create_alert_store(config_manager):
+    """
+    Build the alert store selected by `alerts.backend`.
+
+    Args:
+        config_manager (ConfigurationManager): The configuration manager to load settings from.
+
+    Returns:
+        MemoryAlertStore: The configured store.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    backend = config_manager.get("alerts.backend", "memory")
+    if backend == "memory":
+        return MemoryAlertStore()
+    if backend == "sqlite":
+        return SQLiteAlertStore(config_manager.get("alerts.path", "data/alerts.db"))
+    raise ValueError(f"Unknown alert backend: {backend}")
+
+
+_shared_engine = None
+_shared_engine_lock = threading.Lock()
+
+
+def get_alert_engine(config_manager=None):
+    """
+    Return the process-wide alert engine used by the alert commands and the alert job.
+
+    Args:
+        config_manager (ConfigurationManager, optional): Source of the `alerts.*` settings,
+            used only when the engine is first created.
+
+    Returns:
+        AlertEngine: The shared engine.
+    """
+    global _shared_engine
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            if config_manager is None:
+                _shared_engine = AlertEngine()
+            else:
+                _shared_engine = AlertEngine(create_alert_store(config_manager), config_manager.get("alerts.max_per_chat", 50))
+            logging.info(f"Alert engine: {_shared_engine}")
+        return _shared_engine
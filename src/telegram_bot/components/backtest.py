@@ -0,0 +1,519 @@
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+
+from telegram_bot.components.http_client import get_http_client
+from telegram_bot.components.utils import (
+    ALPHA1,
+    K1,
+    TRIGGER,
+    highpass_coefficients,
+    parse_ohlcv,
+    upstream_url,
+)
+
+# On-disk column layout of a candle archive: one raw little-endian file per column
+ARCHIVE_COLUMNS = (
+    ("time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+)
+
+# Dtype of the per-trade records produced by a backtest
+TRADE_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("side", "i1"),  # 1 = buy, -1 = sell
+    ("entry", "<f8"),
+    ("take_profit", "<f8"),
+    ("stop_loss", "<f8"),
+    ("exit_time", "<i8"),
+    ("exit", "<f8"),
+    ("outcome", "U4"),  # "tp", "sl" or "open"
+    ("pnl", "<f8"),  # Percent
+])
+
+
+class CandleArchive:
+    """
+    A columnar on-disk store of historical candles.
+
+    Each (symbol, interval) is a directory holding one raw file per column
+    (`time.i8`, `close.f8`, ...). Files are only ever appended to, and reads are
+    memory-mapped, so archives far larger than RAM can be replayed.
+    """
+
+    def __init__(self, root="data/candles"):
+        """
+        Initialize the CandleArchive.
+
+        Args:
+            root (str): Directory holding the archive.
+        """
+        self.root = os.path.abspath(root)
+
+    def path(self, symbol, interval):
+        """
+        Return the directory of a (symbol, interval) series.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+            interval (str): Candle interval (e.g., "1hour").
+
+        Returns:
+            str: Directory path.
+        """
+        return os.path.join(self.root, symbol, interval)
+
+    def symbols(self, interval):
+        """
+        List the symbols that have an archived series for an interval.
+
+        Args:
+            interval (str): Candle interval (e.g., "1hour").
+
+        Returns:
+            list: Sorted symbol names.
+        """
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(self.path(name, interval)))
+
+    def open(self, symbol, interval):
+        """
+        Memory-map the columns of a series without reading them into RAM.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+            interval (str): Candle interval (e.g., "1hour").
+
+        Returns:
+            dict: Mapping of column name to read-only array.
+
+        Raises:
+            FileNotFoundError: If the series is not archived.
+        """
+        directory = self.path(symbol, interval)
+        if not os.path.isdir(directory):
+            raise FileNotFoundError(f"No archived candles for {symbol} {interval} in {self.root}")
+
+        columns = {}
+        for name, dtype in ARCHIVE_COLUMNS:
+            file_path = os.path.join(directory, f"{name}.{dtype[-2:]}")
+            if os.path.getsize(file_path) == 0:
+                columns[name] = np.zeros(0, dtype=dtype)
+            else:
+                columns[name] = np.memmap(file_path, dtype=dtype, mode="r")
+        return columns
+
+    def last_timestamp(self, symbol, interval):
+        """
+        Return the open time of the newest archived candle.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+            interval (str): Candle interval (e.g., "1hour").
+
+        Returns:
+            int: Unix time, or None if nothing is archived.
+        """
+        file_path = os.path.join(self.path(symbol, interval), "time.i8")
+        if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+            return None
+        with open(file_path, "rb") as f:
+            f.seek(-8, os.SEEK_END)
+            return int(np.frombuffer(f.read(8), dtype="<i8")[0])
+
+    def append(self, symbol, interval, candles):
+        """
+        Append candles newer than the newest archived one.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+            interval (str): Candle interval (e.g., "1hour").
+            candles (np.ndarray): (n, 6) array of candles (time, open, high, low, close, volume)
+                sorted by time.
+
+        Returns:
+            int: Number of candles written.
+        """
+        candles = np.asarray(candles, dtype=float).reshape(-1, len(ARCHIVE_COLUMNS))
+        last = self.last_timestamp(symbol, interval)
+        if last is not None:
+            candles = candles[candles[:, 0] > last]
+        if not len(candles):
+            return 0
+
+        directory = self.path(symbol, interval)
+        os.makedirs(directory, exist_ok=True)
+        for column, (name, dtype) in enumerate(ARCHIVE_COLUMNS):
+            with open(os.path.join(directory, f"{name}.{dtype[-2:]}"), "ab") as f:
+                f.write(candles[:, column].astype(dtype).tobytes())
+        return len(candles)
+
+    def __repr__(self):
+        return f"<CandleArchive(root={self.root})>"
+
+
+def record_candles(archive, symbol, interval, limit=1000):
+    """
+    Fetch the latest candles from CoinEx and append the new ones to an archive.
+
+    Running this periodically grows the archive over time.
+
+    Args:
+        archive (CandleArchive): Target archive.
+        symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+        interval (str): Candle interval (e.g., "1hour").
+        limit (int): Number of candles to request.
+
+    Returns:
+        int: Number of candles written.
+    """
+    params = {"market": symbol, "type": interval, "limit": limit}
+    response = get_http_client().get(upstream_url("COINEX_KLINE_URL"), params=params)
+    response.raise_for_status()
+    # The newest candle is still forming; only archive closed ones
+    return archive.append(symbol, interval, parse_ohlcv(response.content)[:-1])
+
+
+def windowed_highpass_last(close, start, stop, window, alpha1=ALPHA1):
+    """
+    Compute the last filter output of every `window`-long series ending in [start, stop).
+
+    This is the value `check_signals` reads as `[-1]` when it filters the latest
+    `window` candles. Column `i` of all windows is one contiguous slice of `close`,
+    so each recursion step is a single vector operation over every window.
+
+    Args:
+        close (np.ndarray): Closing prices.
+        start (int): First window end index; must be at least `window - 1`.
+        stop (int): One past the last window end index.
+        window (int): Number of candles per window.
+        alpha1 (float): Filter coefficient.
+
+    Returns:
+        np.ndarray: Filter output of each window's last candle.
+    """
+    count = stop - start
+    base = start - window + 1
+    hp1 = np.zeros(count)
+    hp2 = np.zeros(count)
+    a, b, c = highpass_coefficients(alpha1)
+    for i in range(2, window):
+        c0 = close[base + i:base + i + count]
+        c1 = close[base + i - 1:base + i - 1 + count]
+        c2 = close[base + i - 2:base + i - 2 + count]
+        hp0 = a * (c0 - 2 * c1 + c2) + b * hp1 - c * hp2
+        hp2, hp1 = hp1, hp0
+    return hp1
+
+
+def signal_events(close, window=50, alpha1=ALPHA1, k1=K1, trigger=TRIGGER, chunk_size=1 << 16):
+    """
+    Replay the `check_signals` decisions, including the suppression of repeated signals.
+
+    At every candle the latest `window` closes are filtered exactly as the live bot
+    does, and a signal is emitted only when it differs from the last one emitted.
+
+    Args:
+        close (np.ndarray): Closing prices, possibly memory-mapped.
+        window (int): Number of candles the live bot filters per decision.
+        alpha1 (float): Filter coefficient.
+        k1 (float): Quotient constant 1.
+        trigger (float): Buy/sell threshold for q1.
+        chunk_size (int): Number of decisions evaluated per vectorized chunk.
+
+    Returns:
+        tuple: (candle indices, sides) of emitted signals; side is 1 for buy, -1 for sell.
+    """
+    indices = []
+    sides = []
+    state = 0  # 1 after a buy, -1 after a sell, 0 before any signal
+    for start in range(window - 1, len(close), chunk_size):
+        stop = min(start + chunk_size, len(close))
+        hp = windowed_highpass_last(close, start, stop, window, alpha1)
+        q1 = (hp + k1) / (k1 * hp + 1)
+        code = np.where(q1 < trigger, 1, np.where(q1 > trigger, -1, 0)).astype(np.int8)
+
+        # State after each candle is the most recent non-zero code so far
+        positions = np.where(code != 0, np.arange(len(code)), -1)
+        np.maximum.accumulate(positions, out=positions)
+        after = np.where(positions >= 0, code[np.maximum(positions, 0)], state).astype(np.int8)
+        before = np.concatenate(([state], after[:-1]))
+        fired = np.flatnonzero((code != 0) & (code != before))
+
+        indices.append(fired + start)
+        sides.append(code[fired])
+        state = after[-1]
+
+    if not indices:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int8)
+    return np.concatenate(indices), np.concatenate(sides)
+
+
+def _block_extremes(high, low, block=32):
+    """
+    Build sparse tables of the highest high and lowest low over runs of `block`-candle blocks.
+
+    Level `k` holds, for each block `i`, the extremes of blocks `i` to `i + 2**k - 1`, so
+    whether any of 2**k blocks can touch a level is answered with one lookup.
+
+    Returns:
+        tuple: (list of high levels, list of low levels, block size).
+    """
+    starts = np.arange(0, len(high), block)
+    highs, lows = [np.maximum.reduceat(high, starts)], [np.minimum.reduceat(low, starts)]
+    width = 1
+    while 2 * width <= len(starts):
+        highs.append(np.maximum(highs[-1][:-width], highs[-1][width:]))
+        lows.append(np.minimum(lows[-1][:-width], lows[-1][width:]))
+        width *= 2
+    return highs, lows, block
+
+
+def _first_hits(high, low, extremes, begin, up, down):
+    """
+    Find, for many trades at once, the first candle at or after `begin` whose high reaches
+    `up` or whose low reaches `down`.
+
+    The rest of each trade's starting block is scanned candle by candle, the first later
+    block that can contain a hit is found by binary lifting over the sparse tables, and
+    that block is scanned. Every step is vectorized across the trades, so the cost grows
+    with the block size and the log of the archive length, not with the trades' durations.
+
+    Args:
+        high (np.ndarray): Candle highs.
+        low (np.ndarray): Candle lows.
+        extremes (tuple): Sparse tables from `_block_extremes`.
+        begin (np.ndarray): First candle index to check per trade.
+        up (np.ndarray): Level hit when a high reaches it, per trade.
+        down (np.ndarray): Level hit when a low reaches it, per trade.
+
+    Returns:
+        tuple: (candle index or -1 where neither level is hit, whether `up` was hit there,
+            whether `down` was hit there).
+    """
+    highs, lows, block = extremes
+    count, blocks = len(high), len(highs[0])
+    index = np.full(len(begin), -1, dtype=np.int64)
+    up_hit = np.zeros(len(begin), dtype=bool)
+    down_hit = np.zeros(len(begin), dtype=bool)
+
+    def scan(rows, start, stop):
+        for offset in range(block):
+            candle = start + offset
+            keep = candle < stop
+            rows, candle, start, stop = rows[keep], candle[keep], start[keep], stop[keep]
+            if not len(rows):
+                return
+            reached_up, reached_down = high[candle] >= up[rows], low[candle] <= down[rows]
+            hit = reached_up | reached_down
+            index[rows[hit]] = candle[hit]
+            up_hit[rows[hit]], down_hit[rows[hit]] = reached_up[hit], reached_down[hit]
+            rows, start, stop = rows[~hit], start[~hit], stop[~hit]
+
+    begin = np.asarray(begin, dtype=np.int64)
+    block_end = np.minimum((begin // block + 1) * block, count)
+    scan(np.arange(len(begin)), begin, block_end)
+
+    rows = np.flatnonzero((index < 0) & (block_end < count))
+    first = block_end[rows] // block
+    for level in range(len(highs) - 1, -1, -1):
+        width = 1 << level
+        valid = np.flatnonzero(first + width <= blocks)
+        at = first[valid]
+        miss = (highs[level][at] < up[rows[valid]]) & (lows[level][at] > down[rows[valid]])
+        first[valid[miss]] += width
+    inside = first < blocks
+    rows, first = rows[inside], first[inside]
+    scan(rows, first * block, np.minimum((first + 1) * block, count))
+    return index, up_hit, down_hit
+
+
+def resolve_trades(columns, indices, sides, take_profit_percentage=2, stop_loss_percentage=1, scan=64):
+    """
+    Simulate each signal as a trade entered at its candle close.
+
+    Risk levels follow `calculate_risk_levels`: buys use +tp/-sl percent, sells use the
+    mirrored -tp/+sl percent. All trades are first advanced together one candle at a
+    time for `scan` candles; those still open after that are resolved together by a
+    block-indexed search (`_first_hits`). When one candle touches both levels, the
+    stop-loss is assumed first.
+
+    Args:
+        columns (dict): Archive columns as returned by `CandleArchive.open`.
+        indices (np.ndarray): Candle indices of the signals.
+        sides (np.ndarray): 1 for buy, -1 for sell.
+        take_profit_percentage (float): Take-profit percentage.
+        stop_loss_percentage (float): Stop-loss percentage.
+        scan (int): Candles checked one at a time before the block-indexed search.
+
+    Returns:
+        np.ndarray: Trade records of dtype `TRADE_DTYPE`.
+    """
+    times, high, low, close = columns["time"], columns["high"], columns["low"], columns["close"]
+    count = len(close)
+    trades = np.zeros(len(indices), dtype=TRADE_DTYPE)
+    if not len(indices):
+        return trades
+
+    entry = np.asarray(close[indices], dtype=float)
+    longs = sides > 0
+    take_profit = entry * (1 + sides * take_profit_percentage / 100)
+    stop_loss = entry * (1 - sides * stop_loss_percentage / 100)
+    exit_index = np.full(len(indices), count - 1, dtype=np.int64)
+    outcome = np.full(len(indices), "open", dtype="U4")
+
+    pending = np.arange(len(indices))
+    for offset in range(1, scan + 1):
+        pending = pending[indices[pending] + offset < count]
+        if not len(pending):
+            break
+        candle = indices[pending] + offset
+        h, l = high[candle], low[candle]
+        is_long = longs[pending]
+        stop_hit = np.where(is_long, l <= stop_loss[pending], h >= stop_loss[pending])
+        target_hit = np.where(is_long, h >= take_profit[pending], l <= take_profit[pending])
+        hit = stop_hit | target_hit
+        exit_index[pending[hit]] = candle[hit]
+        outcome[pending[hit]] = np.where(stop_hit[hit], "sl", "tp")
+        pending = pending[~hit]
+
+    if len(pending):
+        # Longs stop out on lows and take profit on highs; shorts the other way round
+        up = np.where(longs[pending], take_profit[pending], stop_loss[pending])
+        down = np.where(longs[pending], stop_loss[pending], take_profit[pending])
+        found, up_hit, down_hit = _first_hits(high, low, _block_extremes(high, low), indices[pending] + scan + 1, up, down)
+        hit = found >= 0
+        stop_hit = np.where(longs[pending], down_hit, up_hit)
+        exit_index[pending[hit]] = found[hit]
+        outcome[pending[hit]] = np.where(stop_hit[hit], "sl", "tp")
+
+    exit_price = np.where(outcome == "tp", take_profit, np.where(outcome == "sl", stop_loss, close[exit_index]))
+    pnl = np.where(
+        outcome == "tp",
+        take_profit_percentage,
+        np.where(outcome == "sl", -stop_loss_percentage, sides * (exit_price / entry - 1) * 100),
+    )
+
+    trades["time"] = times[indices]
+    trades["side"] = sides
+    trades["entry"] = entry
+    trades["take_profit"] = take_profit
+    trades["stop_loss"] = stop_loss
+    trades["exit_time"] = times[exit_index]
+    trades["exit"] = exit_price
+    trades["outcome"] = outcome
+    trades["pnl"] = pnl
+    return trades
+
+
+class BacktestResult:
+    """
+    Trades and summary statistics of one backtest run.
+    """
+
+    def __init__(self, symbol, interval, candles, trades, elapsed):
+        """
+        Initialize the BacktestResult.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+            interval (str): Candle interval (e.g., "1hour").
+            candles (int): Number of candles replayed.
+            trades (np.ndarray): Trade records of dtype `TRADE_DTYPE`.
+            elapsed (float): Wall-clock seconds the run took.
+        """
+        self.symbol = symbol
+        self.interval = interval
+        self.candles = candles
+        self.trades = trades
+        self.elapsed = elapsed
+
+    def summary(self):
+        """
+        Summarize fills, take-profit/stop-loss hits and PnL.
+
+        Returns:
+            dict: Summary statistics.
+        """
+        outcomes = self.trades["outcome"]
+        closed = outcomes != "open"
+        return {
+            "symbol": self.symbol,
+            "interval": self.interval,
+            "candles": self.candles,
+            "signals": len(self.trades),
+            "buys": int((self.trades["side"] > 0).sum()),
+            "sells": int((self.trades["side"] < 0).sum()),
+            "take_profits": int((outcomes == "tp").sum()),
+            "stop_losses": int((outcomes == "sl").sum()),
+            "open": int((~closed).sum()),
+            "win_rate": float((outcomes == "tp").sum() / closed.sum()) if closed.any() else 0.0,
+            "total_pnl": float(self.trades["pnl"].sum()),
+            "candles_per_second": self.candles / self.elapsed if self.elapsed else 0.0,
+        }
+
+    def __repr__(self):
+        return f"<BacktestResult(symbol={self.symbol}, interval={self.interval}, signals={len(self.trades)})>"
+
+
+def run_backtest(archive, symbol, interval, window=50, alpha1=ALPHA1, k1=K1, trigger=TRIGGER,
+                 take_profit_percentage=2, stop_loss_percentage=1, start=None, end=None):
+    """
+    Backtest the signal pipeline on an archived series.
+
+    Args:
+        archive (CandleArchive): Source archive.
+        symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+        interval (str): Candle interval (e.g., "1hour").
+        window (int): Number of candles the live bot filters per decision.
+        alpha1 (float): Filter coefficient.
+        k1 (float): Quotient constant 1.
+        trigger (float): Buy/sell threshold for q1.
+        take_profit_percentage (float): Take-profit percentage.
+        stop_loss_percentage (float): Stop-loss percentage.
+        start (int, optional): Unix time of the first candle to replay.
+        end (int, optional): Unix time after which candles are ignored.
+
+    Returns:
+        BacktestResult: Trades and summary of the run.
+    """
+    started = time.perf_counter()
+    columns = archive.open(symbol, interval)
+    first = 0 if start is None else int(np.searchsorted(columns["time"], start, side="left"))
+    last = len(columns["time"]) if end is None else int(np.searchsorted(columns["time"], end, side="right"))
+    columns = {name: values[first:last] for name, values in columns.items()}
+
+    indices, sides = signal_events(columns["close"], window, alpha1, k1, trigger)
+    trades = resolve_trades(columns, indices, sides, take_profit_percentage, stop_loss_percentage)
+    return BacktestResult(symbol, interval, last - first, trades, time.perf_counter() - started)
+
+
+def main():
+    """
+    Command-line entry point: backtest archived symbols and print their summaries.
+    """
+    parser = argparse.ArgumentParser(description="Backtest crypto signals on archived candles.")
+    parser.add_argument("symbols", nargs="*", help="Symbols to backtest (default: every archived symbol).")
+    parser.add_argument("--archive", default="data/candles", help="Candle archive directory.")
+    parser.add_argument("--interval", default="1hour", help="Candle interval.")
+    parser.add_argument("--window", type=int, default=50, help="Candles filtered per decision.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s: %(message)s")
+    archive = CandleArchive(args.archive)
+    for symbol in args.symbols or archive.symbols(args.interval):
+        summary = run_backtest(archive, symbol, args.interval, window=args.window).summary()
+        logging.info(", ".join(f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+                               for key, value in summary.items()))
+
+
+if __name__ == "__main__":
+    main()
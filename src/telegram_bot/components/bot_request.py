@@ -0,0 +1,97 @@
+import asyncio
+
+from telegram.error import NetworkError, TimedOut
+from telegram.request import BaseRequest
+
+
+class AiohttpRequest(BaseRequest):
+    """
+    python-telegram-bot request backend on aiohttp.
+
+    Bot API calls are the hot path of command handling; httpx's connection pool spends
+    most of a call's CPU time scheduling connections once many requests are in flight,
+    while aiohttp's connector does not. Timeouts and errors map onto the library's
+    `TimedOut` and `NetworkError` like the default `HTTPXRequest`.
+    """
+
+    def __init__(self, connection_pool_size=256, read_timeout=5.0, write_timeout=5.0, connect_timeout=5.0,
+                 pool_timeout=1.0):
+        """
+        Initialize the AiohttpRequest.
+
+        Args:
+            connection_pool_size (int): Maximum simultaneous connections.
+            read_timeout (float): Seconds to wait for response data.
+            write_timeout (float): Seconds to wait for the request to be sent.
+            connect_timeout (float): Seconds to establish a connection.
+            pool_timeout (float): Seconds to wait for a free connection.
+        """
+        self.connection_pool_size = int(connection_pool_size)
+        self._timeouts = {
+            "read": read_timeout,
+            "write": write_timeout,
+            "connect": connect_timeout,
+            "pool": pool_timeout,
+        }
+        self._session = None
+
+    @property
+    def read_timeout(self):
+        return self._timeouts["read"]
+
+    async def initialize(self):
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.connection_pool_size))
+
+    async def shutdown(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def do_request(self, url, method, request_data=None, read_timeout=BaseRequest.DEFAULT_NONE,
+                         write_timeout=BaseRequest.DEFAULT_NONE, connect_timeout=BaseRequest.DEFAULT_NONE,
+                         pool_timeout=BaseRequest.DEFAULT_NONE):
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            raise RuntimeError("This AiohttpRequest is not initialized!")
+
+        def resolve(value, name):
+            return self._timeouts[name] if value is BaseRequest.DEFAULT_NONE else value
+
+        read_timeout = resolve(read_timeout, "read")
+        write_timeout = resolve(write_timeout, "write")
+        connect_timeout = resolve(connect_timeout, "connect")
+        pool_timeout = resolve(pool_timeout, "pool")
+        # aiohttp has no separate write timeout; it bounds the whole request instead
+        total = None if None in (read_timeout, write_timeout, connect_timeout, pool_timeout) else (
+            read_timeout + write_timeout + connect_timeout + pool_timeout
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=total,
+            connect=None if pool_timeout is None or connect_timeout is None else pool_timeout + connect_timeout,
+            sock_connect=connect_timeout,
+            sock_read=read_timeout,
+        )
+
+        data = None
+        if request_data is not None:
+            if request_data.contains_files:
+                data = aiohttp.FormData()
+                for name, value in request_data.json_parameters.items():
+                    data.add_field(name, value)
+                for name, (filename, content, mime_type) in request_data.multipart_data.items():
+                    data.add_field(name, content, filename=filename, content_type=mime_type)
+            else:
+                data = request_data.json_parameters
+
+        try:
+            async with self._session.request(method, url, data=data, headers={"User-Agent": self.USER_AGENT},
+                                             timeout=timeout) as response:
+                return response.status, await response.read()
+        except asyncio.TimeoutError as err:
+            raise TimedOut from err
+        except aiohttp.ClientError as err:
+            raise NetworkError(f"aiohttp.{err.__class__.__name__}: {err}") from err
@@ -0,0 +1,325 @@
+import logging
+import mmap
+import os
+import time
+
+import numpy as np
+
+# Candle duration in seconds for each CoinEx kline type
+INTERVAL_SECONDS = {
+    "1min": 60,
+    "3min": 180,
+    "5min": 300,
+    "15min": 900,
+    "30min": 1800,
+    "1hour": 3600,
+    "2hour": 7200,
+    "4hour": 14400,
+    "6hour": 21600,
+    "12hour": 43200,
+    "1day": 86400,
+    "3day": 259200,
+    "1week": 604800,
+}
+
+# Candle snapshot layout: header (magic, entry count), index, then per entry its
+# time (int64), close (float64) and volume (float64) columns back to back
+SNAPSHOT_MAGIC = b"TBCANDL1"
+SNAPSHOT_HEADER = np.dtype([("magic", "S8"), ("count", "<u8")])
+SNAPSHOT_INDEX = np.dtype([("symbol", "S32"), ("interval", "S8"), ("rows", "<u8"), ("offset", "<u8")])
+
+
+class CandleBuffer:
+    """
+    A preallocated ring buffer of (time, close price, volume) candles.
+
+    Every row is written twice, at `i` and `i + capacity`, so the live window is
+    always one contiguous slice of the backing array and can be handed out as a
+    view without copying.
+    """
+
+    def __init__(self, capacity=50):
+        """
+        Initialize the CandleBuffer.
+
+        Args:
+            capacity (int): Maximum number of candles kept.
+        """
+        self.capacity = int(capacity)
+        self._data = np.zeros((2 * self.capacity, 3))
+        self._start = 0
+        self.size = 0
+
+    @property
+    def candles(self):
+        """np.ndarray: Zero-copy (size, 3) view of the stored candles, oldest first."""
+        return self._data[self._start:self._start + self.size]
+
+    @property
+    def times(self):
+        """np.ndarray: Zero-copy view of the candle open times."""
+        return self.candles[:, 0]
+
+    @property
+    def close(self):
+        """np.ndarray: Zero-copy view of the close prices."""
+        return self.candles[:, 1]
+
+    @property
+    def volume(self):
+        """np.ndarray: Zero-copy view of the volumes."""
+        return self.candles[:, 2]
+
+    @property
+    def last_timestamp(self):
+        """float: Open time of the newest candle, or None when the buffer is empty."""
+        if not self.size:
+            return None
+        return self._data[self._start + self.size - 1, 0]
+
+    def extend(self, candles):
+        """
+        Merge freshly fetched candles into the buffer.
+
+        Candles older than the newest stored one are ignored, a candle with the same
+        open time replaces the still-forming last candle in place, and newer candles
+        are appended, overwriting the oldest ones once the buffer is full.
+
+        Args:
+            candles (np.ndarray): (n, 3) array of candles sorted by time.
+
+        Returns:
+            int: Number of candles appended.
+        """
+        if len(candles) == 0:
+            return 0
+
+        last = self.last_timestamp
+        if last is not None:
+            times = candles[:, 0]
+            current = candles[times == last]
+            if len(current):
+                self._write(np.array([(self._start + self.size - 1) % self.capacity]), current[-1:])
+            candles = candles[times > last]
+
+        candles = candles[-self.capacity:]
+        count = len(candles)
+        if count:
+            positions = (self._start + self.size + np.arange(count)) % self.capacity
+            self._write(positions, candles)
+            self.size += count
+            if self.size > self.capacity:
+                self._start = (self._start + self.size - self.capacity) % self.capacity
+                self.size = self.capacity
+        return count
+
+    def restore(self, times, close, volume):
+        """
+        Replace the buffer's contents with candle columns, e.g., views of a snapshot.
+
+        The columns are copied straight into the ring, keeping the newest `capacity` candles.
+
+        Args:
+            times (np.ndarray): Candle open times, oldest first.
+            close (np.ndarray): Close prices.
+            volume (np.ndarray): Volumes.
+
+        Returns:
+            None
+        """
+        count = min(len(times), self.capacity)
+        for column, values in enumerate((times, close, volume)):
+            self._data[:count, column] = values[len(values) - count:]
+            self._data[self.capacity:self.capacity + count, column] = self._data[:count, column]
+        self._start = 0
+        self.size = count
+
+    def _write(self, positions, rows):
+        """
+        Write rows to ring positions and their mirrors.
+        """
+        self._data[positions] = rows
+        self._data[positions + self.capacity] = rows
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"<CandleBuffer(size={self.size}, capacity={self.capacity})>"
+
+
+class CandleStore:
+    """
+    Candle buffers keyed by (symbol, interval), warmed once and then updated incrementally.
+
+    The buffers can be saved to a binary snapshot and loaded back on the next start, so a
+    warm start only fetches the candles opened since the snapshot. A loaded snapshot is
+    memory-mapped and each pair's columns are copied into its buffer when it is first used.
+    """
+
+    def __init__(self, capacity=50):
+        """
+        Initialize the CandleStore.
+
+        Args:
+            capacity (int): Number of candles kept per (symbol, interval).
+        """
+        self.capacity = int(capacity)
+        self._buffers = {}
+        self._snapshot = {}  # (symbol, interval) -> snapshot columns not restored yet
+
+    def buffer(self, symbol, interval):
+        """
+        Return the buffer for a symbol and interval, creating it on first use.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+            interval (str): Candle interval (e.g., "1hour").
+
+        Returns:
+            CandleBuffer: The buffer for the pair.
+        """
+        key = (symbol, interval)
+        if key not in self._buffers:
+            self._buffers[key] = CandleBuffer(self.capacity)
+            if key in self._snapshot:
+                self._buffers[key].restore(*self._snapshot.pop(key))
+        return self._buffers[key]
+
+    def fetch_limit(self, symbol, interval, now=None, max_limit=None):
+        """
+        Compute how many candles must be requested to catch up with the exchange.
+
+        A cold buffer needs a full warm-up. A warm buffer only needs the candles opened
+        since its newest one, including that one so the still-forming candle is refreshed.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+            interval (str): Candle interval (e.g., "1hour").
+            now (float, optional): Current Unix time; defaults to `time.time()`.
+            max_limit (int, optional): Most candles one request returns. A buffer holding
+                that many is warm, even if the capacity is larger.
+
+        Returns:
+            int: Number of candles to request.
+        """
+        full = self.capacity if max_limit is None else min(self.capacity, int(max_limit))
+        buffer = self.buffer(symbol, interval)
+        if buffer.size < full or interval not in INTERVAL_SECONDS:
+            return full
+        now = time.time() if now is None else now
+        missing = int((now - buffer.last_timestamp) // INTERVAL_SECONDS[interval]) + 1
+        return max(2, min(missing, full))
+
+    def update(self, symbol, interval, candles):
+        """
+        Merge fetched candles and return the current window.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+            interval (str): Candle interval (e.g., "1hour").
+            candles (np.ndarray): (n, 3) array of candles sorted by time.
+
+        Returns:
+            np.ndarray: Zero-copy view of the stored candles.
+        """
+        buffer = self.buffer(symbol, interval)
+        buffer.extend(candles)
+        return buffer.candles
+
+    def retain(self, symbols):
+        """
+        Drop the buffers of symbols that are no longer monitored.
+
+        Args:
+            symbols (list): Symbols to keep.
+
+        Returns:
+            None
+        """
+        keep = set(symbols)
+        for pairs in (self._buffers, self._snapshot):
+            for key in [key for key in pairs if key[0] not in keep]:
+                del pairs[key]
+
+    def save(self, path):
+        """
+        Write the candles to a binary snapshot.
+
+        Pairs loaded from a previous snapshot but not used since are carried over. Symbols
+        longer than the index's 32 bytes are skipped with a warning. The file is written
+        next to `path` and renamed over it, so a reader never sees a partial snapshot.
+
+        Args:
+            path (str): Snapshot file.
+
+        Returns:
+            int: Number of (symbol, interval) pairs written.
+        """
+        columns = {key: (buffer.times, buffer.close, buffer.volume) for key, buffer in self._buffers.items() if buffer.size}
+        columns.update((key, value) for key, value in self._snapshot.items() if key not in columns)
+        too_long = sorted({symbol for symbol, _ in columns if len(symbol.encode()) > SNAPSHOT_INDEX["symbol"].itemsize})
+        if too_long:
+            logging.warning(f"Not saving the candles of symbols too long for the snapshot index: {', '.join(too_long)}")
+            columns = {key: value for key, value in columns.items() if key[0] not in too_long}
+
+        index = np.zeros(len(columns), dtype=SNAPSHOT_INDEX)
+        offset = SNAPSHOT_HEADER.itemsize + index.nbytes
+        for entry, ((symbol, interval), (times, _, _)) in zip(index, columns.items()):
+            entry["symbol"], entry["interval"] = symbol.encode(), interval.encode()
+            entry["rows"], entry["offset"] = len(times), offset
+            offset += 24 * len(times)
+        header = np.array([(SNAPSHOT_MAGIC, len(columns))], dtype=SNAPSHOT_HEADER)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(header.tobytes())
+            file.write(index.tobytes())
+            for times, close, volume in columns.values():
+                file.write(np.ascontiguousarray(times, dtype="<i8").tobytes())
+                file.write(np.ascontiguousarray(close, dtype="<f8").tobytes())
+                file.write(np.ascontiguousarray(volume, dtype="<f8").tobytes())
+        os.replace(temporary, path)
+        return len(columns)
+
+    def load(self, path):
+        """
+        Memory-map a snapshot written by `save`; its pairs are restored as their buffers are first used.
+
+        The columns are read in place as NumPy views of the mapping, without parsing.
+        A missing, truncated or foreign file is ignored.
+
+        Args:
+            path (str): Snapshot file.
+
+        Returns:
+            int: Number of (symbol, interval) pairs loaded.
+        """
+        try:
+            with open(path, "rb") as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return 0
+        if len(data) < SNAPSHOT_HEADER.itemsize:
+            return 0
+        header = np.frombuffer(data, SNAPSHOT_HEADER, 1)[0]
+        count = int(header["count"])
+        if header["magic"] != SNAPSHOT_MAGIC or len(data) < SNAPSHOT_HEADER.itemsize + count * SNAPSHOT_INDEX.itemsize:
+            return 0
+        index = np.frombuffer(data, SNAPSHOT_INDEX, count, SNAPSHOT_HEADER.itemsize)
+        if count and int((index["offset"] + 24 * index["rows"]).max()) > len(data):
+            return 0
+        for symbol, interval, rows, offset in index.tolist():
+            key = (symbol.decode(), interval.decode())
+            if key not in self._buffers:
+                self._snapshot[key] = tuple(
+                    np.frombuffer(data, dtype, rows, offset + 8 * rows * column)
+                    for column, dtype in enumerate(("<i8", "<f8", "<f8"))
+                )
+        return count
+
+    def __repr__(self):
+        return f"<CandleStore(pairs={len(self._buffers)}, snapshot={len(self._snapshot)}, capacity={self.capacity})>"
@@ -1,15 +1,52 @@
-from telegram import Update
-from telegram.ext import CallbackContext
-from telegram_bot.components.utils import fetch_crypto_price
-from telegram_bot.config.configuration import ConfigurationManager
+from __future__ import annotations
 
-# Load configuration dynamically
-config_manager = ConfigurationManager()
-symbols = config_manager.get("bot.symbols", [])
-COIN_REFERENCES = {symbol.split("USDT")[0]: f"https://coinmarketcap.com/currencies/{symbol.split('USDT')[0].lower()}/" for symbol in symbols}
+import asyncio
+from typing import TYPE_CHECKING
 
+from telegram_bot.components.alerts import get_alert_engine
+from telegram_bot.components.metrics import instrumented
+from telegram_bot.components.price_cache import get_price_cache
+from telegram_bot.config.configuration import get_configuration_manager
 
-def start_command(update: Update, context: CallbackContext) -> None:
+if TYPE_CHECKING:  # only needed for annotations; python-telegram-bot is slow to import
+    from telegram import Update
+    from telegram.ext import CallbackContext
+
+
+_coin_references = None
+
+
+def coin_references():
+    """
+    Return the supported coins and their CoinMarketCap pages.
+
+    The table is built from `bot.symbols` on first use and rebuilt whenever that key
+    changes in the configuration.
+
+    Returns:
+        dict: Mapping of base asset (e.g., "BTC") to its CoinMarketCap URL.
+    """
+    if _coin_references is None:
+        get_configuration_manager().subscribe(_refresh_coin_references, "bot.symbols")
+        _refresh_coin_references()
+    return _coin_references
+
+
+def _refresh_coin_references(changed=None):
+    global _coin_references
+    symbols = get_configuration_manager().get("bot.symbols", [])
+    _coin_references = {symbol.split("USDT")[0]: f"https://coinmarketcap.com/currencies/{symbol.split('USDT')[0].lower()}/" for symbol in symbols}
+
+
+def __getattr__(name):
+    # COIN_REFERENCES remains importable, resolved lazily
+    if name == "COIN_REFERENCES":
+        return coin_references()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@instrumented("start_command")
+async def start_command(update: Update, context: CallbackContext) -> None:
     """
     Handle the /start command to introduce the bot and provide help instructions.
 
@@ -20,19 +57,24 @@ def start_command(update: Update, context: CallbackContext) -> None:
     Returns:
         None
     """
+    references = coin_references()
     message = (
         "👋 Welcome to Crypto Signals Bot! 🚀\n\n"
         "Here are the available commands:\n"
         "1. `/start` - View this help message.\n"
-        "2. `/price [symbol]` - Get the current price of a cryptocurrency.\n\n"
+        "2. `/price [symbol]` - Get the current price of a cryptocurrency.\n"
+        "3. `/alert [symbol] [above|below] [price]` - Get notified when a price is crossed.\n"
+        "4. `/alerts` - List your alerts.\n"
+        "5. `/unalert [id|all]` - Delete an alert.\n\n"
         "Supported cryptocurrencies:\n"
-        + "\n".join([f"- {symbol} ({symbol.lower().capitalize()})" for symbol in COIN_REFERENCES.keys()])
-        + "\n\nExample: `/price BTC`"
+        + "\n".join([f"- {symbol} ({symbol.lower().capitalize()})" for symbol in references.keys()])
+        + "\n\nExamples: `/price BTC`, `/alert BTC above 70000`"
     )
-    update.message.reply_text(message)
+    await update.message.reply_text(message)
 
 
-def get_crypto_price(update: Update, context: CallbackContext) -> None:
+@instrumented("price_command")
+async def get_crypto_price(update: Update, context: CallbackContext) -> None:
     """
     Handle the /price command to fetch cryptocurrency prices.
 
@@ -45,29 +87,142 @@ def get_crypto_price(update: Update, context: CallbackContext) -> None:
     """
     args = context.args
     if not args:
-        update.message.reply_text("❗ Please specify a cryptocurrency symbol (e.g., BTC, ETH).")
+        await update.message.reply_text("❗ Please specify a cryptocurrency symbol (e.g., BTC, ETH).")
         return
 
     symbol = args[0].upper()
-    if symbol not in COIN_REFERENCES:
-        update.message.reply_text(
-            f"❌ '{symbol}' is not supported. Try one of the following: {', '.join(COIN_REFERENCES.keys())}."
+    references = coin_references()
+    if symbol not in references:
+        await update.message.reply_text(
+            f"❌ '{symbol}' is not supported. Try one of the following: {', '.join(references.keys())}."
         )
         return
 
-    # Fetch the price using the utility function
-    price, error = fetch_crypto_price(symbol)
+    # Serve the price from the shared quote cache without blocking the event loop
+    price, error = await asyncio.to_thread(get_price_cache().get, symbol)
     if error:
         if "Invalid API Key" in error:
-            update.message.reply_text("❌ The API key for CoinMarketCap is invalid. Please check your configuration.")
+            await update.message.reply_text("❌ The API key for CoinMarketCap is invalid. Please check your configuration.")
         else:
-            update.message.reply_text(f"⚠️ Error fetching price for {symbol}: {error}")
+            await update.message.reply_text(f"⚠️ Error fetching price for {symbol}: {error}")
         return
 
     # Format the response with the price and reference link
-    reference_link = COIN_REFERENCES[symbol]
+    reference_link = references[symbol]
     message = (
         f"💰 *{symbol} Price*: ${price:.2f}\n"
         f"🔗 [View on CoinMarketCap]({reference_link})"
     )
-    update.message.reply_text(message, parse_mode="Markdown")
+    await update.message.reply_text(message, parse_mode="Markdown")
+
+
+# Accepted spellings of the alert directions
+ALERT_DIRECTIONS = {"above": "above", ">": "above", ">=": "above", "below": "below", "<": "below", "<=": "below"}
+
+
+@instrumented("alert_command")
+async def alert_command(update: Update, context: CallbackContext) -> None:
+    """
+    Handle the /alert command to create a one-shot price alert for the chat.
+
+    Without a direction, the alert fires when the price crosses the threshold from
+    where it is now.
+
+    Args:
+        update (Update): Incoming Telegram update.
+        context (CallbackContext): Callback context for the command.
+
+    Returns:
+        None
+    """
+    args = context.args or []
+    if len(args) not in (2, 3):
+        await update.message.reply_text("❗ Usage: `/alert BTC above 70000` or `/alert BTC 70000`.")
+        return
+
+    symbol = args[0].upper()
+    references = coin_references()
+    if symbol not in references:
+        await update.message.reply_text(
+            f"❌ '{symbol}' is not supported. Try one of the following: {', '.join(references.keys())}."
+        )
+        return
+    try:
+        threshold = float(args[-1].replace(",", ""))
+    except ValueError:
+        await update.message.reply_text(f"❌ '{args[-1]}' is not a price.")
+        return
+    if len(args) == 3:
+        direction = ALERT_DIRECTIONS.get(args[1].lower())
+        if direction is None:
+            await update.message.reply_text("❌ The direction must be `above` or `below`.")
+            return
+    else:
+        price, error = await asyncio.to_thread(get_price_cache().get, symbol)
+        if error:
+            await update.message.reply_text(f"⚠️ Error fetching price for {symbol}: {error}")
+            return
+        direction = "above" if threshold > price else "below"
+
+    try:
+        alert_id, _, _, direction, threshold = await asyncio.to_thread(
+            get_alert_engine().add, update.effective_chat.id, symbol, direction, threshold
+        )
+    except ValueError as e:
+        await update.message.reply_text(f"❌ {e}.")
+        return
+    await update.message.reply_text(f"🔔 Alert #{alert_id} set: {symbol} {direction} {threshold:g} USD.")
+
+
+@instrumented("alerts_command")
+async def alerts_command(update: Update, context: CallbackContext) -> None:
+    """
+    Handle the /alerts command to list the chat's active alerts.
+
+    Args:
+        update (Update): Incoming Telegram update.
+        context (CallbackContext): Callback context for the command.
+
+    Returns:
+        None
+    """
+    alerts = await asyncio.to_thread(get_alert_engine().alerts, update.effective_chat.id)
+    if not alerts:
+        await update.message.reply_text("You have no active alerts. Create one with `/alert BTC above 70000`.")
+        return
+    lines = [f"#{alert_id}: {symbol} {direction} {threshold:g} USD" for alert_id, _, symbol, direction, threshold in alerts]
+    await update.message.reply_text("🔔 Your alerts:\n" + "\n".join(lines))
+
+
+@instrumented("unalert_command")
+async def unalert_command(update: Update, context: CallbackContext) -> None:
+    """
+    Handle the /unalert command to delete one or all of the chat's alerts.
+
+    Args:
+        update (Update): Incoming Telegram update.
+        context (CallbackContext): Callback context for the command.
+
+    Returns:
+        None
+    """
+    args = context.args or []
+    if len(args) != 1:
+        await update.message.reply_text("❗ Usage: `/unalert 12` or `/unalert all`.")
+        return
+    chat_id = update.effective_chat.id
+    engine = get_alert_engine()
+    if args[0].lower() == "all":
+        count = await asyncio.to_thread(engine.remove_chat, chat_id)
+        await update.message.reply_text(f"🗑 Deleted {count} alert(s).")
+        return
+    try:
+        alert_id = int(args[0].lstrip("#"))
+    except ValueError:
+        await update.message.reply_text(f"❌ '{args[0]}' is not an alert id.")
+        return
+    if await asyncio.to_thread(engine.remove, chat_id, alert_id):
+        await update.message.reply_text(f"🗑 Alert #{alert_id} deleted.")
+    else:
+        await update.message.reply_text(f"❌ You have no alert #{alert_id}. See `/alerts`.")
+
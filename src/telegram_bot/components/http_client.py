@@ -0,0 +1,403 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+# Status codes worth retrying: rate limiting and transient upstream failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised when a request is refused because the host's circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+
+    After `threshold` consecutive failures the circuit opens and requests fail fast.
+    Once `reset_timeout` seconds have passed, one trial request is let through: success
+    closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, threshold=5, reset_timeout=30):
+        """
+        Initialize the CircuitBreaker.
+
+        Args:
+            threshold (int): Consecutive failures that open the circuit.
+            reset_timeout (float): Seconds the circuit stays open before a trial request.
+        """
+        self.threshold = int(threshold)
+        self.reset_timeout = float(reset_timeout)
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """str: "closed", "open" or "half-open"."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """
+        Check whether a request may be sent now.
+
+        Returns:
+            bool: False while the circuit is open or a half-open trial is in flight.
+        """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release(self):
+        """
+        Free the half-open trial slot of a request that ended without an outcome, e.g., cancelled.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class LatencyStats:
+    """
+    Request latency and error counters for one host, over a bounded sample window.
+    """
+
+    def __init__(self, window=1024):
+        """
+        Initialize the LatencyStats.
+
+        Args:
+            window (int): Number of most recent latencies kept for percentiles.
+        """
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self._samples = deque(maxlen=int(window))
+        self._lock = threading.Lock()
+
+    def record(self, seconds, error=False):
+        with self._lock:
+            self.requests += 1
+            self.errors += int(error)
+            self._samples.append(seconds)
+
+    def snapshot(self):
+        """
+        Summarize the recorded requests.
+
+        Returns:
+            dict: Counters and latency percentiles in milliseconds.
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+            summary = {"requests": self.requests, "errors": self.errors, "retries": self.retries}
+        for name, fraction in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+            summary[name] = samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000 if samples else 0.0
+        summary["mean_ms"] = sum(samples) / len(samples) * 1000 if samples else 0.0
+        return summary
+
+
+class _ClientBase:
+    """
+    Retry, backoff, circuit breaking and latency bookkeeping shared by the sync and async clients.
+    """
+
+    def __init__(self, connect_timeout=5, read_timeout=10, max_retries=3, backoff_base=0.5, backoff_max=10,
+                 pool_size=10, breaker_threshold=5, breaker_reset=30, record=None):
+        """
+        Initialize the client.
+
+        Args:
+            connect_timeout (float): Seconds to establish a connection.
+            read_timeout (float): Seconds to wait for response data.
+            max_retries (int): Retries after the first attempt.
+            backoff_base (float): Base delay in seconds of the exponential backoff.
+            backoff_max (float): Upper bound of a single backoff delay.
+            pool_size (int): Keep-alive connections kept per host.
+            breaker_threshold (int): Consecutive failures that open a host's circuit.
+            breaker_reset (float): Seconds a host's circuit stays open.
+            record (str, optional): Cassette file every response is appended to, for replay
+                by `telegram_bot.components.replay`.
+        """
+        self.connect_timeout = float(connect_timeout)
+        self.read_timeout = float(read_timeout)
+        self.max_retries = int(max_retries)
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self.pool_size = int(pool_size)
+        self.breaker_threshold = int(breaker_threshold)
+        self.breaker_reset = float(breaker_reset)
+        self.cassette = None
+        if record:
+            from telegram_bot.components.replay import Cassette
+
+            self.cassette = Cassette(record)
+        self._breakers = {}
+        self._stats = {}
+        self._hosts_lock = threading.Lock()
+
+    def _host(self, url):
+        """
+        Return the host of a URL, creating its breaker and stats on first use.
+        """
+        host = urlsplit(url).netloc
+        if host not in self._breakers:
+            with self._hosts_lock:
+                self._breakers.setdefault(host, CircuitBreaker(self.breaker_threshold, self.breaker_reset))
+                self._stats.setdefault(host, LatencyStats())
+        return host
+
+    def _check_circuit(self, host):
+        if not self._breakers[host].allow():
+            raise CircuitOpenError(f"Circuit open for {host}; failing fast")
+
+    def _backoff(self, attempt, retry_after=None):
+        """
+        Return the delay before retry `attempt`: full-jitter exponential backoff,
+        or the server's Retry-After hint when it is larger.
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.backoff_max))
+            except ValueError:
+                pass
+        return delay
+
+    def _record(self, host, started, failed):
+        self._stats[host].record(time.monotonic() - started, error=failed)
+        if failed:
+            self._breakers[host].record_failure()
+        else:
+            self._breakers[host].record_success()
+
+    def stats(self):
+        """
+        Return per-host request statistics.
+
+        Returns:
+            dict: Mapping of host to counters, latency percentiles and circuit state.
+        """
+        return {
+            host: {**self._stats[host].snapshot(), "circuit": self._breakers[host].state}
+            for host in list(self._stats)
+        }
+
+
+class HttpClient(_ClientBase):
+    """
+    Blocking HTTP client with per-host keep-alive pools, timeouts, retries and circuit breaking.
+    """
+
+    def __init__(self, **settings):
+        # requests is imported with the first client so importing this module stays cheap
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        super().__init__(**settings)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url, params=None, headers=None):
+        """
+        Send a GET request, retrying transient failures.
+
+        Args:
+            url (str): Request URL.
+            params (dict, optional): Query parameters.
+            headers (dict, optional): Request headers.
+
+        Returns:
+            requests.Response: The final response; callers check its status.
+
+        Raises:
+            CircuitOpenError: If the host's circuit is open.
+            requests.RequestException: If every attempt failed at the transport level.
+        """
+        import requests
+
+        host = self._host(url)
+        for attempt in range(self.max_retries + 1):
+            self._check_circuit(host)
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, params=params, headers=headers,
+                                            timeout=(self.connect_timeout, self.read_timeout))
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(host, started, failed=True)
+                if attempt == self.max_retries:
+                    raise
+                logging.warning(f"Request to {host} failed ({e}); retrying")
+                retry_after = None
+            except BaseException:
+                # Cancelled or failed outside the transport: let the next request be the trial
+                self._breakers[host].release()
+                raise
+            else:
+                failed = response.status_code in RETRY_STATUSES
+                self._record(host, started, failed=failed)
+                if self.cassette is not None:
+                    self.cassette.record("GET", url, params, response.status_code, response.text, time.monotonic() - started)
+                if not failed or attempt == self.max_retries:
+                    return response
+                retry_after = response.headers.get("Retry-After")
+            self._stats[host].retries += 1
+            time.sleep(self._backoff(attempt, retry_after))
+
+    def close(self):
+        self.session.close()
+        if self.cassette is not None:
+            self.cassette.close()
+
+    def __repr__(self):
+        return f"<HttpClient(hosts={list(self._stats)})>"
+
+
+class AsyncHttpClient(_ClientBase):
+    """
+    Asyncio HTTP client with the same pooling, timeout, retry and circuit breaking policy.
+    """
+
+    def __init__(self, **settings):
+        import httpx
+
+        super().__init__(**settings)
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(max_keepalive_connections=self.pool_size),
+        )
+
+    async def get(self, url, params=None, headers=None):
+        """
+        Send a GET request, retrying transient failures.
+
+        Args:
+            url (str): Request URL.
+            params (dict, optional): Query parameters.
+            headers (dict, optional): Request headers.
+
+        Returns:
+            httpx.Response: The final response; callers check its status.
+
+        Raises:
+            CircuitOpenError: If the host's circuit is open.
+            httpx.TransportError: If every attempt failed at the transport level.
+        """
+        import asyncio
+
+        import httpx
+
+        host = self._host(url)
+        for attempt in range(self.max_retries + 1):
+            self._check_circuit(host)
+            started = time.monotonic()
+            try:
+                response = await self.client.get(url, params=params, headers=headers)
+            except httpx.TransportError as e:
+                self._record(host, started, failed=True)
+                if attempt == self.max_retries:
+                    raise
+                logging.warning(f"Request to {host} failed ({e}); retrying")
+                retry_after = None
+            except BaseException:
+                # Cancelled or failed outside the transport: let the next request be the trial
+                self._breakers[host].release()
+                raise
+            else:
+                failed = response.status_code in RETRY_STATUSES
+                self._record(host, started, failed=failed)
+                if self.cassette is not None:
+                    self.cassette.record("GET", url, params, response.status_code, response.text, time.monotonic() - started)
+                if not failed or attempt == self.max_retries:
+                    return response
+                retry_after = response.headers.get("Retry-After")
+            self._stats[host].retries += 1
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+
+    async def close(self):
+        await self.client.aclose()
+        if self.cassette is not None:
+            self.cassette.close()
+
+    def __repr__(self):
+        return f"<AsyncHttpClient(hosts={list(self._stats)})>"
+
+
+def http_settings(config_manager):
+    """
+    Read the `http.*` client settings.
+
+    Args:
+        config_manager (ConfigurationManager): The configuration manager to load settings from.
+
+    Returns:
+        dict: Keyword arguments for `HttpClient` and `AsyncHttpClient`.
+    """
+    defaults = {
+        "connect_timeout": 5,
+        "read_timeout": 10,
+        "max_retries": 3,
+        "backoff_base": 0.5,
+        "backoff_max": 10,
+        "pool_size": 10,
+        "breaker_threshold": 5,
+        "breaker_reset": 30,
+        "record": None,
+    }
+    return {name: config_manager.get(f"http.{name}", default) for name, default in defaults.items()}
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_http_client(config_manager=None):
+    """
+    Return the process-wide blocking HTTP client used for all upstream calls.
+
+    Args:
+        config_manager (ConfigurationManager, optional): Source of the `http.*` settings,
+            used only when the client is first created.
+
+    Returns:
+        HttpClient: The shared client instance.
+    """
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            settings = http_settings(config_manager) if config_manager is not None else {}
+            _shared_client = HttpClient(**settings)
+        return _shared_client
@@ -0,0 +1,293 @@
+import numpy as np
+
+from telegram_bot.components.metrics import REGISTRY
+from telegram_bot.components.utils import ALPHA1, K1, TRIGGER, highpass_filter
+
+# Candle columns nodes can read; (time, close price, volume) as stored by the CandleStore
+SOURCES = {"time": 0, "close": 1, "volume": 2}
+
+# Nodes the signal is read from: the last value of each is the latest (buy, sell) state
+OUTPUTS = ("buy", "sell")
+
+NODE_EVALUATIONS = {
+    result: REGISTRY.counter("telegram_bot_indicator_nodes_total", "Indicator node evaluations by result.", result=result)
+    for result in ("computed", "memoized")
+}
+
+
+def _recurrence(values, alpha, first):
+    """
+    Run y[i] = y[i-1] + alpha * (x[i] - y[i-1]) from y[0] = `first` on plain floats.
+    """
+    out = []
+    y = first
+    for x in values:
+        y += alpha * (x - y)
+        out.append(y)
+    return out
+
+
+def ema(x, period):
+    """
+    Exponential moving average with smoothing 2 / (period + 1), seeded with the first value.
+
+    Args:
+        x (np.ndarray): Input series.
+        period (int): Averaging period.
+
+    Returns:
+        np.ndarray: The average.
+    """
+    x = np.asarray(x, dtype=float)
+    if not len(x):
+        return x.copy()
+    return np.array(_recurrence(x.tolist(), 2.0 / (float(period) + 1), x[0]))
+
+
+def sma(x, period):
+    """
+    Simple moving average; the first `period - 1` values are NaN.
+
+    Args:
+        x (np.ndarray): Input series.
+        period (int): Window length.
+
+    Returns:
+        np.ndarray: The average.
+    """
+    x = np.asarray(x, dtype=float)
+    period = int(period)
+    out = np.full(len(x), np.nan)
+    if len(x) >= period:
+        sums = np.cumsum(np.concatenate(([0.0], x)))
+        out[period - 1:] = (sums[period:] - sums[:-period]) / period
+    return out
+
+
+def rsi(x, period=14):
+    """
+    Relative strength index with Wilder's smoothing; values before the first full period are NaN.
+
+    Args:
+        x (np.ndarray): Input series, e.g., closing prices.
+        period (int): Smoothing period.
+
+    Returns:
+        np.ndarray: RSI between 0 and 100.
+    """
+    x = np.asarray(x, dtype=float)
+    period = int(period)
+    out = np.full(len(x), np.nan)
+    if len(x) <= period:
+        return out
+    change = np.diff(x)
+    gain, loss = np.maximum(change, 0.0), np.maximum(-change, 0.0)
+    alpha = 1.0 / period
+    avg_gain = np.array(_recurrence(gain[period:].tolist(), alpha, gain[:period].mean()))
+    avg_loss = np.array(_recurrence(loss[period:].tolist(), alpha, loss[:period].mean()))
+    avg_gain = np.concatenate(([gain[:period].mean()], avg_gain))
+    avg_loss = np.concatenate(([loss[:period].mean()], avg_loss))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[period:] = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+    return out
+
+
+def _compare(compare):
+    def operator(x, other=None, threshold=0.0, factor=1.0):
+        return compare(x, threshold if other is None else factor * other)
+    return operator
+
+
+# Operator name -> vectorized function of the input series and the node's parameters
+OPERATORS = {
+    "highpass": lambda x, alpha1=ALPHA1: highpass_filter(x, float(alpha1)),
+    "quotient": lambda x, k=K1: (x + float(k)) / (float(k) * x + 1),
+    "ema": ema,
+    "sma": sma,
+    "rsi": rsi,
+    "above": _compare(np.greater),
+    "below": _compare(np.less),
+    "all": lambda *inputs: np.logical_and.reduce(inputs),
+    "any": lambda *inputs: np.logical_or.reduce(inputs),
+}
+
+
+def default_graph(alpha1=ALPHA1, k1=K1, trigger=TRIGGER, **_):
+    """
+    Return the node definitions of the built-in signal: high-pass filter, quotient, threshold.
+
+    The filter runs over the window the graph is given, so a window's states are those
+    `StreamingSignal.update` and `evaluate_signal_matrix` return for the same window.
+
+    Args:
+        alpha1 (float): Filter coefficient.
+        k1 (float): Quotient constant of q1.
+        trigger (float): Buy/sell threshold for q1.
+
+    Returns:
+        dict: Node definitions as read from the `indicators` setting.
+    """
+    return {
+        "hp": {"op": "highpass", "inputs": ["close"], "alpha1": alpha1},
+        "q1": {"op": "quotient", "inputs": ["hp"], "k": k1},
+        "buy": {"op": "below", "inputs": ["q1"], "threshold": trigger},
+        "sell": {"op": "above", "inputs": ["q1"], "threshold": trigger},
+    }
+
+
+class IndicatorGraph:
+    """
+    A declarative graph of vectorized indicator operators evaluated per symbol.
+
+    Each node applies an operator from `OPERATORS` to candle columns or other nodes, so
+    an intermediate such as the high-pass output is computed once for all nodes that
+    read it. Only nodes the `buy` and `sell` outputs depend on are evaluated.
+
+    Results are memoized per (symbol, interval) and node. An entry stays valid while the
+    candle columns the node depends on keep the same last timestamp and last value, so a
+    pass only recomputes the nodes downstream of new or revised data; e.g., a forming
+    candle whose volume did not change leaves the volume nodes untouched. Entries are
+    keyed by the node's definition, not its name, so they survive reloading the graph.
+    """
+
+    def __init__(self, nodes, memo=None):
+        """
+        Initialize the IndicatorGraph.
+
+        Args:
+            nodes (dict): Mapping of node name to its definition: `op`, `inputs` (a name or
+                list of candle columns and nodes) and the operator's parameters.
+            memo (dict, optional): Memoized results of a previous graph to reuse.
+
+        Raises:
+            ValueError: If an operator or input is unknown, a node is named like a candle
+                column, an output is missing, or the graph has a cycle.
+        """
+        self.nodes = {}
+        for name, spec in dict(nodes).items():
+            spec = dict(spec)
+            op = spec.pop("op", None)
+            if op not in OPERATORS:
+                raise ValueError(f"Unknown operator for indicator {name}: {op}")
+            if name in SOURCES:
+                raise ValueError(f"Indicator {name} shadows a candle column")
+            inputs = spec.pop("inputs", spec.pop("input", None)) or []
+            inputs = [inputs] if isinstance(inputs, str) else list(inputs)
+            self.nodes[name] = (op, inputs, spec)
+        for output in OUTPUTS:
+            if output not in self.nodes:
+                raise ValueError(f"Indicator graph has no {output} node")
+
+        self.order = []  # nodes the outputs depend on, inputs first
+        self.signatures = {name: ("source", name) for name in SOURCES}
+        self.sources = {name: (name,) for name in SOURCES}  # node -> candle columns it depends on
+        visiting = set()
+
+        def visit(name):
+            if name in self.signatures:
+                return
+            if name not in self.nodes:
+                raise ValueError(f"Unknown indicator input: {name}")
+            if name in visiting:
+                raise ValueError(f"Indicator graph has a cycle through {name}")
+            visiting.add(name)
+            op, inputs, params = self.nodes[name]
+            for input_name in inputs:
+                visit(input_name)
+            visiting.discard(name)
+            self.signatures[name] = (op, tuple(self.signatures[i] for i in inputs), tuple(sorted(params.items())))
+            self.sources[name] = tuple(sorted({source for i in inputs for source in self.sources[i]}))
+            self.order.append(name)
+
+        for output in OUTPUTS:
+            visit(output)
+        self._memo = {} if memo is None else memo  # (symbol, interval) -> {signature: (stamp, value)}
+
+    @classmethod
+    def from_config(cls, config_manager, signal_params, memo=None):
+        """
+        Build the graph of the `indicators` setting, or the built-in signal when it is empty.
+
+        Args:
+            config_manager (ConfigurationManager): The configuration manager to load settings from.
+            signal_params (dict): `signals.*` parameters of the built-in signal.
+            memo (dict, optional): Memoized results of a previous graph to reuse.
+
+        Returns:
+            IndicatorGraph: The graph.
+        """
+        return cls(config_manager.get("indicators") or default_graph(**signal_params), memo)
+
+    @property
+    def memo(self):
+        """dict: Memoized results, to hand to a rebuilt graph."""
+        return self._memo
+
+    def evaluate(self, candles, symbol=None, interval=None):
+        """
+        Evaluate the graph on a symbol's candles, reusing memoized nodes whose inputs did not change.
+
+        Args:
+            candles (np.ndarray): Candle data (time, close price, volume), oldest first.
+            symbol (str, optional): Symbol the candles belong to; results are not memoized without it.
+            interval (str, optional): Candle interval of the window.
+
+        Returns:
+            dict: Mapping of node name to its output series.
+        """
+        memo = self._memo.setdefault((symbol, interval), {}) if symbol is not None else {}
+        length = len(candles)
+        stamps = {
+            source: (length, candles[-1, 0], candles[-1, column]) if length else (0,)
+            for source, column in SOURCES.items()
+        }
+        values = {source: candles[:, column] for source, column in SOURCES.items()}
+        computed = reused = 0
+        for name in self.order:
+            signature = self.signatures[name]
+            stamp = tuple(stamps[source] for source in self.sources[name])
+            entry = memo.get(signature)
+            if entry is not None and entry[0] == stamp:
+                values[name] = entry[1]
+                reused += 1
+                continue
+            op, inputs, params = self.nodes[name]
+            values[name] = OPERATORS[op](*(values[i] for i in inputs), **params)
+            memo[signature] = (stamp, values[name])
+            computed += 1
+        if REGISTRY.enabled:
+            NODE_EVALUATIONS["computed"].inc(computed)
+            NODE_EVALUATIONS["memoized"].inc(reused)
+        return values
+
+    def signal(self, candles, symbol=None, interval=None):
+        """
+        Return the latest (buy, sell) state of a symbol.
+
+        Args:
+            candles (np.ndarray): Candle data (time, close price, volume), oldest first.
+            symbol (str, optional): Symbol the candles belong to.
+            interval (str, optional): Candle interval of the window.
+
+        Returns:
+            tuple: Latest (buy, sell) signal state.
+        """
+        values = self.evaluate(candles, symbol, interval)
+        return tuple(bool(values[output][-1]) if len(values[output]) else False for output in OUTPUTS)
+
+    def retain(self, symbols):
+        """
+        Drop the memoized results of symbols that are no longer monitored.
+
+        Args:
+            symbols (list): Symbols to keep.
+
+        Returns:
+            None
+        """
+        keep = set(symbols)
+        for key in [key for key in self._memo if key[0] not in keep]:
+            del self._memo[key]
+
+    def __repr__(self):
+        return f"<IndicatorGraph(nodes={len(self.order)}, memoized={len(self._memo)})>"
@@ -0,0 +1,460 @@
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import time
+
+import numpy as np
+
+from telegram_bot.components.candle_store import INTERVAL_SECONDS
+from telegram_bot.components.klines import decode_klines, loads
+from telegram_bot.components.metrics import REGISTRY
+from telegram_bot.components.price_source import resolve_prices
+
+# Public CoinEx WebSocket endpoint (JSON-RPC, protocol v1)
+COINEX_WS_URL = "wss://socket.coinex.com/"
+
+STREAM_MESSAGES = REGISTRY.counter("telegram_bot_stream_messages_total", "Kline updates received over WebSocket.")
+STREAM_EVALUATIONS = REGISTRY.counter("telegram_bot_stream_evaluations_total", "Signal evaluations triggered by a changed candle.")
+STREAM_RECONNECTS = REGISTRY.counter("telegram_bot_stream_reconnects_total", "WebSocket reconnections.")
+STREAM_BACKFILLS = REGISTRY.counter("telegram_bot_stream_backfills_total", "REST backfills after (re)connecting.")
+
+
+def parse_kline_update(params, symbol=None):
+    """
+    Convert the params of a CoinEx `kline.update` message into candles.
+
+    Args:
+        params (list): Kline items [time, open, close, high, low, volume, amount, market].
+        symbol (str, optional): Keep only the items of this market.
+
+    Returns:
+        np.ndarray: (n, 3) array of candles (time, close price, volume) sorted by time.
+    """
+    if symbol is not None:
+        params = [item for item in params if len(item) < 8 or item[7] == symbol]
+    candles = decode_klines(params)
+    return candles[np.argsort(candles[:, 0], kind="stable")]
+
+
+class KlineStream:
+    """
+    Event-driven ingestion: one WebSocket kline subscription per symbol feeding the monitor.
+
+    Every update is merged into the monitor's candle store, and the symbol's streaming
+    filter runs only when the update changed the newest candle or opened a new one.
+    After every (re)connect the candles missed while disconnected are backfilled over
+    REST before the stream's own updates are applied, so no candle is skipped.
+
+    The CoinEx v1 protocol keeps a single kline subscription per connection, so each
+    symbol gets its own connection; all of them share one aiohttp session.
+    """
+
+    def __init__(self, monitor, url=COINEX_WS_URL, ping_interval=30, idle_timeout=90, reconnect_base=0.5,
+                 reconnect_max=30):
+        """
+        Initialize the KlineStream.
+
+        Args:
+            monitor (SignalMonitor): Monitor owning the candles, filters, signal store and outbox.
+            url (str): WebSocket endpoint.
+            ping_interval (float): Seconds between application-level `server.ping` requests.
+            idle_timeout (float): Seconds without any message before the connection is
+                considered dead and reopened.
+            reconnect_base (float): Base delay of the jittered exponential reconnect backoff.
+            reconnect_max (float): Upper bound of a single reconnect delay.
+        """
+        self.monitor = monitor
+        self.url = url
+        self.ping_interval = float(ping_interval)
+        self.idle_timeout = float(idle_timeout)
+        self.reconnect_base = float(reconnect_base)
+        self.reconnect_max = float(reconnect_max)
+        self.interval = monitor.base_interval
+        self._tasks = {}  # symbol -> asyncio.Task following the symbol
+        self._session = None
+        self._ids = itertools.count(1)
+
+    @classmethod
+    def from_config(cls, monitor):
+        """
+        Build a stream from the `stream.*` and `exchange.ws_url` settings.
+
+        Args:
+            monitor (SignalMonitor): Monitor the stream feeds.
+
+        Returns:
+            KlineStream: The configured stream, not yet started.
+        """
+        config_manager = monitor.config_manager
+        return cls(
+            monitor,
+            url=config_manager.get("exchange.ws_url", COINEX_WS_URL),
+            ping_interval=config_manager.get("stream.ping_interval", 30),
+            idle_timeout=config_manager.get("stream.idle_timeout", 90),
+            reconnect_base=config_manager.get("stream.reconnect_base", 0.5),
+            reconnect_max=config_manager.get("stream.reconnect_max", 30),
+        )
+
+    async def start(self):
+        """
+        Open the shared session and subscribe to every monitored symbol.
+
+        Returns:
+            None
+        """
+        import aiohttp
+
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        self.monitor.open_client()
+        self.sync_symbols()
+
+    def sync_symbols(self):
+        """
+        Follow the monitor's current symbols: subscribe new ones and drop removed ones.
+
+        Returns:
+            None
+        """
+        wanted = set(self.monitor.symbols)
+        for symbol in set(self._tasks) - wanted:
+            self._tasks.pop(symbol).cancel()
+        for symbol in sorted(wanted - set(self._tasks)):
+            self._tasks[symbol] = asyncio.create_task(self._follow(symbol), name=f"kline-stream-{symbol}")
+
+    def on_config_change(self, changed):
+        """
+        Configuration subscriber: apply new monitor settings and resubscribe as needed.
+
+        Must run on the event loop, e.g., from the job queue's reload job.
+
+        Args:
+            changed (set): Dotted keys that changed.
+
+        Returns:
+            None
+        """
+        self.monitor.configure()
+        if self.monitor.base_interval != self.interval:
+            # Subscriptions are per interval; reopen all of them
+            self.interval = self.monitor.base_interval
+            for task in self._tasks.values():
+                task.cancel()
+            self._tasks = {}
+        self.sync_symbols()
+        logging.info(f"Kline stream reconfigured: {self!r}")
+
+    async def stop(self):
+        """
+        Close every subscription and the shared session.
+
+        Returns:
+            None
+        """
+        tasks = list(self._tasks.values())
+        self._tasks = {}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.reconnect_max, self.reconnect_base * 2 ** attempt))
+
+    async def _follow(self, symbol):
+        """
+        Keep one symbol subscribed, reconnecting with backoff until cancelled.
+        """
+        attempt = 0
+        while True:
+            try:
+                if await self._connection(symbol):
+                    attempt = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"Kline stream for {symbol} failed: {e!r}")
+            delay = self._backoff(attempt)
+            attempt += 1
+            STREAM_RECONNECTS.inc()
+            logging.info(f"Reconnecting the kline stream for {symbol} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _connection(self, symbol):
+        """
+        Run one connection: subscribe, backfill the gap, then apply updates until it drops.
+
+        Returns:
+            bool: Whether the connection got as far as streaming updates.
+        """
+        import aiohttp
+
+        period = INTERVAL_SECONDS[self.interval]
+        async with self._session.ws_connect(self.url, autoping=True) as ws:
+            await ws.send_json({"id": next(self._ids), "method": "kline.subscribe", "params": [symbol, period]})
+            # Subscribe first: updates arriving during the backfill queue up and are merged after it
+            await self.backfill(symbol)
+            pinger = asyncio.create_task(self._ping(ws))
+            try:
+                while True:
+                    message = await ws.receive(timeout=self.idle_timeout)
+                    if message.type == aiohttp.WSMsgType.TEXT:
+                        await self.handle(symbol, loads(message.data))
+                    elif message.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED,
+                                          aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.ERROR):
+                        logging.info(f"Kline stream for {symbol} closed by the server")
+                        return True
+            except (asyncio.TimeoutError, aiohttp.ClientError, ValueError) as e:
+                logging.warning(f"Kline stream for {symbol} interrupted: {e!r}")
+                return True
+            finally:
+                pinger.cancel()
+
+    async def _ping(self, ws):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            await ws.send_json({"id": next(self._ids), "method": "server.ping", "params": []})
+
+    async def backfill(self, symbol):
+        """
+        Fetch the candles missed while disconnected over REST and evaluate the symbol.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+
+        Returns:
+            None
+        """
+        STREAM_BACKFILLS.inc()
+        window = await self.monitor.fetch_candles(symbol)
+        await self.evaluate(symbol, window)
+
+    async def handle(self, symbol, payload):
+        """
+        Apply one decoded WebSocket message.
+
+        Args:
+            symbol (str): Symbol the connection is subscribed to.
+            payload (dict): Decoded JSON-RPC message.
+
+        Returns:
+            bool: Whether the message changed the symbol's candles and was evaluated.
+
+        Raises:
+            ConnectionError: If the server rejected a request.
+        """
+        if payload.get("error"):
+            raise ConnectionError(f"Kline subscription for {symbol} rejected: {payload['error']}")
+        if payload.get("method") != "kline.update":
+            return False
+        STREAM_MESSAGES.inc()
+        candles = parse_kline_update(payload.get("params") or [], symbol)
+        if not len(candles):
+            return False
+
+        monitor = self.monitor
+        buffer = monitor.candle_store.buffer(symbol, monitor.base_interval)
+        newest = tuple(buffer.candles[-1]) if len(buffer) else None
+        window = monitor.candle_store.update(symbol, monitor.base_interval, candles)
+        if len(window) and newest == tuple(window[-1]):
+            # Repeated update of an unchanged candle
+            return False
+        await self.evaluate(symbol, window)
+        return True
+
+    async def evaluate(self, symbol, window):
+        """
+        Advance the symbol's streaming filters on every timeframe and dispatch the signals
+        whose side changed.
+
+        The entry price is the close of the newest candle, i.e., the last traded price,
+        unless `prices.sources` prefers another source.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+            window (np.ndarray): Current base interval candle window of the symbol.
+
+        Returns:
+            None
+        """
+        if not len(window):
+            return
+        STREAM_EVALUATIONS.inc()
+        monitor = self.monitor
+        states = monitor.evaluate({symbol: window}, mode="streaming")
+        entry_prices = await resolve_prices(
+            [symbol], candle_prices={symbol: (window[-1, 1], time.time())}, fetch_quotes=monitor.fetch_quotes,
+            price_cache=monitor.price_cache, **monitor.price_settings
+        )
+        prices = dict.fromkeys(states, entry_prices[symbol]) if symbol in entry_prices else {}
+        store = monitor.signal_store
+        signal_states = await asyncio.to_thread(lambda: {key: store.get(key) for key in states})
+        await monitor.dispatch(states, prices, signal_states)
+        monitor.snapshot_due()
+
+    def __repr__(self):
+        return f"<KlineStream(url={self.url}, symbols={len(self._tasks)}, interval={self.interval})>"
+
+
+class StandInKlineServer:
+    """
+    Local stand-in for the exchange: a WebSocket endpoint speaking the CoinEx kline
+    subscription protocol and a REST kline endpoint serving the same candles.
+
+    Candles are pushed with `push`; `drop_connections` simulates a network failure.
+    Point `exchange.ws_url` at `ws_url` and `exchange.kline_url` at `kline_url`.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0):
+        """
+        Initialize the StandInKlineServer.
+
+        Args:
+            host (str): Interface to listen on.
+            port (int): TCP port; 0 picks a free port.
+        """
+        self.host = host
+        self.port = int(port)
+        self.candles = {}  # market -> {open time: kline item}
+        self.subscribers = {}  # WebSocketResponse -> (market, period)
+        self._runner = None
+
+    @property
+    def ws_url(self):
+        return f"ws://{self.host}:{self.port}/"
+
+    @property
+    def kline_url(self):
+        return f"http://{self.host}:{self.port}/v1/market/kline"
+
+    async def start(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/", self._websocket)
+        app.router.add_get("/v1/market/kline", self._rest_kline)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        logging.info(f"Stand-in kline server on {self.ws_url} and {self.kline_url}")
+
+    async def stop(self):
+        await self.drop_connections()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def push(self, market, open_time, close, volume=1.0):
+        """
+        Record a candle update and broadcast it to the market's subscribers.
+
+        Args:
+            market (str): Market symbol (e.g., "BTCUSDT").
+            open_time (float): Open time of the candle in Unix seconds.
+            close (float): Latest close price.
+            volume (float): Volume so far.
+
+        Returns:
+            int: Number of connections notified.
+        """
+        item = [int(open_time), str(close), str(close), str(close), str(close), str(volume), str(close * volume), market]
+        self.candles.setdefault(market, {})[int(open_time)] = item
+        message = {"method": "kline.update", "params": [item], "id": None}
+        notified = 0
+        for ws, (subscribed, _) in list(self.subscribers.items()):
+            if subscribed == market and not ws.closed:
+                await ws.send_json(message)
+                notified += 1
+        return notified
+
+    async def drop_connections(self):
+        for ws in list(self.subscribers):
+            await ws.close()
+        self.subscribers.clear()
+
+    async def _websocket(self, request):
+        from aiohttp import WSMsgType, web
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                payload = json.loads(message.data)
+                method, request_id = payload.get("method"), payload.get("id")
+                if method == "kline.subscribe":
+                    market, period = payload["params"]
+                    self.subscribers[ws] = (market, int(period))
+                    await ws.send_json({"error": None, "result": {"status": "success"}, "id": request_id})
+                elif method == "server.ping":
+                    await ws.send_json({"error": None, "result": "pong", "id": request_id})
+                else:
+                    await ws.send_json({"error": {"code": 1, "message": "invalid argument"}, "result": None, "id": request_id})
+        finally:
+            self.subscribers.pop(ws, None)
+        return ws
+
+    async def _rest_kline(self, request):
+        from aiohttp import web
+
+        market = request.query.get("market")
+        limit = int(request.query.get("limit", 100))
+        items = [self.candles[market][key] for key in sorted(self.candles.get(market, {}))][-limit:]
+        return web.json_response({"code": 0, "data": items, "message": "OK"})
+
+
+async def _serve(args):
+    """
+    Run the stand-in server with random-walk candles for the given markets.
+    """
+    server = StandInKlineServer(args.host, args.port)
+    await server.start()
+    period = INTERVAL_SECONDS[args.interval]
+    prices = {market: 100.0 for market in args.markets}
+    now = time.time()
+    for market in args.markets:
+        # History for the REST warm-up
+        for step in range(args.history, 0, -1):
+            prices[market] *= 1 + random.gauss(0, 0.01)
+            await server.push(market, (now // period - step) * period, round(prices[market], 4))
+    print(f"Serving {', '.join(args.markets)} on {server.ws_url} (REST {server.kline_url})", flush=True)
+    try:
+        while True:
+            await asyncio.sleep(args.tick)
+            open_time = time.time() // period * period
+            for market in args.markets:
+                prices[market] *= 1 + random.gauss(0, 0.002)
+                await server.push(market, open_time, round(prices[market], 4))
+    finally:
+        await server.stop()
+
+
+def main(argv=None):
+    """
+    Command line entry point: run the stand-in exchange for manual runs of the stream mode.
+    """
+    parser = argparse.ArgumentParser(description="Serve random-walk klines over a local CoinEx-compatible WebSocket.")
+    parser.add_argument("markets", nargs="*", default=["BTCUSDT", "ETHUSDT"], help="Markets to serve")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port")
+    parser.add_argument("--interval", default="1min", choices=sorted(INTERVAL_SECONDS), help="Candle interval")
+    parser.add_argument("--history", type=int, default=100, help="Closed candles served to the REST warm-up")
+    parser.add_argument("--tick", type=float, default=1.0, help="Seconds between updates")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s: %(message)s")
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
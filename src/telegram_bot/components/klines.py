@@ -0,0 +1,103 @@
+import functools
+import json
+from operator import itemgetter
+
+import numpy as np
+
+# Position of each field in a CoinEx kline item: [time, open, close, high, low, volume, amount, market]
+KLINE_FIELDS = {"time": 0, "open": 1, "close": 2, "high": 3, "low": 4, "volume": 5, "amount": 6}
+
+# Columns kept by the candle store and the signal pipeline, and full OHLCV as used by backtests
+CANDLE_FIELDS = ("time", "close", "volume")
+OHLCV_FIELDS = ("time", "open", "high", "low", "close", "volume")
+
+# Up to this many items, e.g., the two candles of a warm fetch, one conversion of the row
+# tuples is faster than a pass per column
+ROW_DECODE_MAX_ITEMS = 16
+
+
+@functools.lru_cache(maxsize=None)
+def json_backend():
+    """
+    Pick the JSON decoder for upstream payloads: orjson when it is installed, else the standard library.
+
+    Returns:
+        tuple: (name, loads function).
+    """
+    try:
+        import orjson
+    except ImportError:
+        return "json", json.loads
+    return "orjson", orjson.loads
+
+
+def loads(data):
+    """
+    Decode a JSON document with the backend of `json_backend`.
+
+    Args:
+        data (bytes | str): JSON text, e.g., a raw response body.
+
+    Returns:
+        object: The decoded document.
+    """
+    return json_backend()[1](data)
+
+
+@functools.lru_cache(maxsize=None)
+def _getters(fields):
+    """
+    Return the row getter and the column getters of a field tuple, validated once.
+    """
+    for field in fields:
+        if field not in KLINE_FIELDS:
+            raise ValueError(f"Unknown kline field: {field}")
+    indices = [KLINE_FIELDS[field] for field in fields]
+    return (itemgetter(*indices) if indices else None), [itemgetter(index) for index in indices]
+
+
+def decode_klines(items, fields=CANDLE_FIELDS):
+    """
+    Decode CoinEx kline items column by column into one preallocated float64 array.
+
+    Each column is gathered with a C-level `itemgetter` pass and converted from the
+    exchange's decimal strings by NumPy, so no Python float is created per field. Short
+    responses (`ROW_DECODE_MAX_ITEMS`) are converted row by row in one call instead, as
+    the per-column passes cost more than they save there. Open times are exact as
+    float64, like everywhere else candles are stored.
+
+    Args:
+        items (list): Kline items [time, open, close, high, low, volume, amount, market].
+        fields (tuple): Names from `KLINE_FIELDS` to extract, in column order.
+
+    Returns:
+        np.ndarray: (n, len(fields)) array; `out[:, j]` is the column of `fields[j]`.
+
+    Raises:
+        ValueError: If a field is unknown or a value is not a number.
+    """
+    items = items or []
+    row, columns = _getters(tuple(fields))
+    if row is not None and 0 < len(items) <= ROW_DECODE_MAX_ITEMS:
+        return np.array(list(map(row, items)), dtype=float).reshape(len(items), len(columns))
+    out = np.empty((len(items), len(columns)))
+    if len(items):
+        for column, getter in enumerate(columns):
+            out[:, column] = list(map(getter, items))
+    return out
+
+
+def decode_kline_response(payload, fields=CANDLE_FIELDS):
+    """
+    Decode a CoinEx kline response into candle columns.
+
+    Args:
+        payload (bytes | str | dict): Raw response body, or the already decoded response.
+        fields (tuple): Names from `KLINE_FIELDS` to extract, in column order.
+
+    Returns:
+        np.ndarray: (n, len(fields)) array of candles, oldest first.
+    """
+    if isinstance(payload, (bytes, bytearray, str)):
+        payload = loads(payload)
+    return decode_klines(payload["data"], fields)
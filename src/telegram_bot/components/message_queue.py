@@ -0,0 +1,286 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import timedelta
+
+from telegram.error import RetryAfter
+
+from telegram_bot.components.metrics import REGISTRY, instrumented
+
+# Telegram rejects messages longer than this many characters
+MAX_MESSAGE_LENGTH = 4096
+
+# Delivery outcomes exported as telegram_bot_messages_total{result=...}
+DELIVERIES = {
+    result: REGISTRY.counter("telegram_bot_messages_total", "Outbound message deliveries by result.", result=result)
+    for result in ("sent", "rate_limited", "error", "dropped")
+}
+
+
+class TokenBucket:
+    """
+    A token bucket rate limiter: `rate` tokens per second, holding at most `burst`.
+    """
+
+    def __init__(self, rate, burst=1, clock=time.monotonic):
+        """
+        Initialize the TokenBucket.
+
+        Args:
+            rate (float): Tokens added per second.
+            burst (float): Maximum number of tokens.
+            clock (callable): Monotonic clock the tokens are refilled by.
+        """
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+
+    def wait_time(self):
+        """
+        Return the seconds until one token is available, without taking it.
+
+        Returns:
+            float: 0 when a token is available now.
+        """
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class MessageQueue:
+    """
+    Outbound Telegram message queue drained by a background sender.
+
+    Producers enqueue without awaiting anything, so analysis never blocks on delivery.
+    The sender respects a global and a per-chat rate limit, keeps per-chat ordering,
+    optionally merges everything pending for a chat into one digest message, and
+    retries 429 responses after Telegram's `retry_after` hint.
+    """
+
+    def __init__(self, bot, global_rate=30, chat_rate=1, chat_burst=3, digest=True, max_attempts=5, max_queue=1000,
+                 clock=time.monotonic):
+        """
+        Initialize the MessageQueue.
+
+        Args:
+            bot (telegram.Bot): Bot used to send messages.
+            global_rate (float): Messages per second across all chats.
+            chat_rate (float): Messages per second to a single chat.
+            chat_burst (int): Messages a chat may receive back to back before `chat_rate` applies.
+            digest (bool): Merge all pending messages of a chat into one message.
+            max_attempts (int): Delivery attempts before a message is dropped.
+            max_queue (int): Pending messages per chat before the oldest are dropped.
+            clock (callable): Monotonic clock the rate limits and retry delays are kept on.
+        """
+        self.bot = bot
+        self.clock = clock
+        self.global_bucket = TokenBucket(global_rate, global_rate, clock)
+        self.chat_rate = float(chat_rate)
+        self.chat_burst = float(chat_burst)
+        self.digest = bool(digest)
+        self.max_attempts = int(max_attempts)
+        self.max_queue = int(max_queue)
+        self._pending = {}  # chat_id -> deque of (text, attempts)
+        self._buckets = {}  # chat_id -> TokenBucket
+        self._blocked_until = {}  # chat_id -> monotonic time a 429 lifts
+        self._in_flight = set()  # chat ids with a send in progress
+        self._tasks = set()
+        self._wakeup = asyncio.Event()
+        self._sender = None
+        self.sent = 0
+        self.dropped = 0
+
+    def enqueue(self, chat_id, text):
+        """
+        Queue a message for delivery. Never blocks.
+
+        Args:
+            chat_id (str): Telegram chat/channel ID.
+            text (str): The message to send.
+
+        Returns:
+            None
+        """
+        queue = self._pending.setdefault(chat_id, deque())
+        if len(queue) >= self.max_queue:
+            queue.popleft()
+            self.dropped += 1
+            DELIVERIES["dropped"].inc()
+            logging.warning(f"Outbound queue for {chat_id} is full; dropped the oldest message")
+        queue.append((text, 0))
+        self._wakeup.set()
+
+    def pending(self):
+        """
+        Return the number of queued messages.
+
+        Returns:
+            int: Messages waiting across all chats.
+        """
+        return sum(len(queue) for queue in self._pending.values())
+
+    def start(self):
+        """
+        Start the background sender on the running event loop.
+
+        Returns:
+            None
+        """
+        if self._sender is None:
+            self._sender = asyncio.create_task(self._run())
+
+    async def stop(self, timeout=10):
+        """
+        Deliver what is still queued, then stop the sender.
+
+        Args:
+            timeout (float): Seconds to wait for the queue to drain.
+
+        Returns:
+            None
+        """
+        deadline = time.monotonic() + timeout
+        while (self._pending or self._tasks) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._sender is not None:
+            self._sender.cancel()
+            self._sender = None
+        if self._pending:
+            logging.warning(f"Outbound queue stopped with {self.pending()} undelivered messages")
+
+    async def _run(self):
+        """
+        Sender loop: repeatedly send to the chat that may receive a message soonest.
+        """
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            chat_id, wait = self._next_send()
+            if chat_id is None or wait > 0:
+                # Sleep until a chat is ready, waking early when messages arrive or a send finishes
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            text, attempts = self._take(chat_id)
+            task = asyncio.create_task(self._deliver(chat_id, text, attempts))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _next_send(self):
+        """
+        Pick the chat to send to next and how long the rate limits hold it back.
+
+        Returns:
+            tuple: (chat_id, seconds to wait), or (None, None) if every chat has a send in flight.
+        """
+        chat_id, wait = self._next_chat()
+        if chat_id is not None:
+            wait = max(wait, self.global_bucket.wait_time())
+        return chat_id, wait
+
+    def _next_chat(self):
+        """
+        Pick the chat whose next message may be sent soonest.
+
+        Returns:
+            tuple: (chat_id, seconds to wait), or (None, None) if every chat has a send in flight.
+        """
+        now = self.clock()
+        best, best_wait = None, None
+        for chat_id in self._pending:
+            if chat_id in self._in_flight:
+                continue
+            bucket = self._buckets.setdefault(chat_id, TokenBucket(self.chat_rate, self.chat_burst, self.clock))
+            wait = max(bucket.wait_time(), self._blocked_until.get(chat_id, 0) - now)
+            if best_wait is None or wait < best_wait:
+                best, best_wait = chat_id, wait
+        return best, best_wait
+
+    def _take(self, chat_id):
+        """
+        Pop the next message of a ready chat, merging everything pending into a digest if enabled.
+
+        The rate limit tokens are taken and the chat is marked in flight until `_deliver` finishes.
+        """
+        self.global_bucket.take()
+        self._buckets[chat_id].take()
+        self._in_flight.add(chat_id)
+        queue = self._pending[chat_id]
+        text, attempts = queue.popleft()
+        if self.digest:
+            while queue and len(text) + 2 + len(queue[0][0]) <= MAX_MESSAGE_LENGTH:
+                text = f"{text}\n\n{queue.popleft()[0]}"
+        if not queue:
+            del self._pending[chat_id]
+        return text, attempts
+
+    @instrumented("telegram_deliver")
+    async def _deliver(self, chat_id, text, attempts):
+        """
+        Send one message, requeueing it at the front of its chat on failure.
+        """
+        try:
+            await self.bot.send_message(chat_id, text)
+            self.sent += 1
+            DELIVERIES["sent"].inc()
+            logging.info(f"Message sent: {text}")
+        except RetryAfter as e:
+            retry_after = e.retry_after.total_seconds() if isinstance(e.retry_after, timedelta) else e.retry_after
+            logging.warning(f"Telegram rate limit hit for {chat_id}; retrying in {retry_after}s")
+            self._blocked_until[chat_id] = self.clock() + float(retry_after)
+            DELIVERIES["rate_limited"].inc()
+            self._requeue(chat_id, text, attempts)
+        except Exception as e:
+            logging.error(f"Error sending message: {e}")
+            self._blocked_until[chat_id] = self.clock() + min(60, 2 ** attempts)
+            DELIVERIES["error"].inc()
+            self._requeue(chat_id, text, attempts)
+        finally:
+            self._in_flight.discard(chat_id)
+            self._wakeup.set()
+
+    def _requeue(self, chat_id, text, attempts):
+        if attempts + 1 >= self.max_attempts:
+            self.dropped += 1
+            DELIVERIES["dropped"].inc()
+            logging.error(f"Dropping message to {chat_id} after {attempts + 1} attempts")
+            return
+        self._pending.setdefault(chat_id, deque()).appendleft((text, attempts + 1))
+
+    def __repr__(self):
+        return f"<MessageQueue(pending={self.pending()}, sent={self.sent}, dropped={self.dropped})>"
+
+
+def message_queue_settings(config_manager):
+    """
+    Read the `telegram.*` delivery settings.
+
+    Args:
+        config_manager (ConfigurationManager): The configuration manager to load settings from.
+
+    Returns:
+        dict: Keyword arguments for `MessageQueue`.
+    """
+    defaults = {
+        "global_rate": 30,
+        "chat_rate": 1,
+        "chat_burst": 3,
+        "digest": True,
+        "max_attempts": 5,
+        "max_queue": 1000,
+    }
+    return {name: config_manager.get(f"telegram.{name}", default) for name, default in defaults.items()}
@@ -0,0 +1,311 @@
+import argparse
+import bisect
+import functools
+import inspect
+import logging
+import threading
+import time
+
+# Latency histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in items) + "}"
+
+
+class Counter:
+    """
+    Monotonically increasing counter.
+    """
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def samples(self, name, labels):
+        yield f"{name}{_format_labels(labels)} {self.value}"
+
+
+class Gauge:
+    """
+    Value that can go up and down.
+    """
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = float(value)
+
+    def samples(self, name, labels):
+        yield f"{name}{_format_labels(labels)} {self.value}"
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram: one bisect and two increments per observation.
+
+    Updates take no lock. Almost every observation happens on the event loop thread, and
+    a lock would cost more than the observation itself; an increment lost to a thread
+    switch only skews a sample count by one.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Initialize the Histogram.
+
+        Args:
+            buckets (tuple): Sorted bucket upper bounds in seconds.
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def samples(self, name, labels):
+        counts, total = list(self.counts), self.sum
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(float(bound))
+            yield f"{name}_bucket{_format_labels(labels, ('le', le))} {cumulative}"
+        yield f"{name}_sum{_format_labels(labels)} {total}"
+        yield f"{name}_count{_format_labels(labels)} {cumulative}"
+
+
+class MetricsRegistry:
+    """
+    Named metric families with optional labels, rendered in the Prometheus text format.
+
+    Setting `enabled` to False turns every instrumented call into a plain call.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._families = {}  # name -> (type, help, {labels: metric})
+        self._lock = threading.Lock()
+
+    def _metric(self, kind, factory, name, help_text, labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._families.setdefault(name, (kind, help_text, {}))
+            if family[0] != kind:
+                raise ValueError(f"Metric {name} is already registered as a {family[0]}")
+            return family[2].setdefault(key, factory())
+
+    def counter(self, name, help_text="", **labels):
+        return self._metric("counter", Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text="", **labels):
+        return self._metric("gauge", Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text="", buckets=DEFAULT_BUCKETS, **labels):
+        return self._metric("histogram", lambda: Histogram(buckets), name, help_text, labels)
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text.
+        """
+        lines = []
+        with self._lock:
+            families = [(name, kind, help_text, dict(metrics)) for name, (kind, help_text, metrics) in self._families.items()]
+        for name, kind, help_text, metrics in sorted(families):
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, metric in sorted(metrics.items()):
+                lines.extend(metric.samples(name, labels))
+        return "\n".join(lines) + "\n"
+
+    def __repr__(self):
+        return f"<MetricsRegistry(families={len(self._families)}, enabled={self.enabled})>"
+
+
+# Process-wide registry used by all instrumented code
+REGISTRY = MetricsRegistry()
+
+
+def instrumented(name):
+    """
+    Decorator recording the latency and errors of a sync or async function.
+
+    Observations go to `telegram_bot_call_seconds{function=name}` and failures to
+    `telegram_bot_call_errors_total{function=name}`. A cancelled task, KeyboardInterrupt
+    or SystemExit is timed but not counted as a failure.
+
+    Args:
+        name (str): Label identifying the function.
+
+    Returns:
+        callable: The decorator.
+    """
+
+    def decorator(func):
+        observe = REGISTRY.histogram("telegram_bot_call_seconds", "Latency of instrumented calls.", function=name).observe
+        errors = REGISTRY.counter("telegram_bot_call_errors_total", "Instrumented calls that raised.", function=name)
+        registry, clock = REGISTRY, time.perf_counter
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not registry.enabled:
+                    return await func(*args, **kwargs)
+                started = clock()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    errors.inc()
+                    raise
+                finally:
+                    observe(clock() - started)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            started = clock()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                observe(clock() - started)
+
+        return wrapper
+
+    return decorator
+
+
+def start_metrics_server(host="127.0.0.1", port=9108):
+    """
+    Serve `/metrics` from a background thread.
+
+    Args:
+        host (str): Interface to listen on.
+        port (int): TCP port; 0 picks a free port.
+
+    Returns:
+        ThreadingHTTPServer: The running server; call `shutdown()` to stop it.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = REGISTRY.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, int(port)), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    logging.info(f"Metrics exposed on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def configure_metrics(config_manager, port=None):
+    """
+    Apply the `metrics.*` settings: enable or disable instrumentation and start the endpoint.
+
+    Args:
+        config_manager (ConfigurationManager): The configuration manager to load settings from.
+        port (int, optional): Port overriding `metrics.port`.
+
+    Returns:
+        ThreadingHTTPServer: The metrics server, or None if metrics are disabled.
+    """
+    REGISTRY.enabled = bool(config_manager.get("metrics.enabled", True))
+    if not REGISTRY.enabled:
+        logging.info("Metrics are disabled.")
+        return None
+    if port is None:
+        port = config_manager.get("metrics.port", 9108)
+    return start_metrics_server(config_manager.get("metrics.host", "127.0.0.1"), port)
+
+
+def measure_overhead(func=None, args=(), calls=100000):
+    """
+    Measure the per-call cost of instrumentation.
+
+    Args:
+        func (callable, optional): An `instrumented` function; an empty function by default.
+        args (tuple): Positional arguments passed on every call.
+        calls (int): Calls per measurement.
+
+    Returns:
+        dict: Nanoseconds per call for the bare, instrumented and disabled cases.
+    """
+    if func is None:
+        def noop():
+            pass
+
+        func = instrumented("overhead_benchmark")(noop)
+    bare = func.__wrapped__
+    enabled = REGISTRY.enabled
+
+    def per_call(target):
+        started = time.perf_counter()
+        for _ in range(calls):
+            target(*args)
+        return (time.perf_counter() - started) / calls * 1e9
+
+    try:
+        REGISTRY.enabled = True
+        results = {"bare_ns": per_call(bare), "instrumented_ns": per_call(func)}
+        REGISTRY.enabled = False
+        results["disabled_ns"] = per_call(func)
+    finally:
+        REGISTRY.enabled = enabled
+    return results
+
+
+def main(argv=None):
+    """
+    Command line entry point: print the instrumentation overhead on an empty function
+    and on the per-symbol high-pass filter.
+    """
+    import numpy as np
+
+    from telegram_bot.components.utils import ALPHA1, highpass_filter
+
+    parser = argparse.ArgumentParser(description="Measure the per-call overhead of the metrics instrumentation.")
+    parser.add_argument("--calls", type=int, default=100000, help="Calls per measurement")
+    args = parser.parse_args(argv)
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(size=50))
+    cases = [("empty function", None, ()), ("highpass_filter(50 closes)", highpass_filter, (close, ALPHA1))]
+    for label, func, func_args in cases:
+        results = measure_overhead(func, func_args, args.calls)
+        overhead = results["instrumented_ns"] - results["bare_ns"]
+        print(f"{label}: bare {results['bare_ns']:.0f} ns, instrumented {results['instrumented_ns']:.0f} ns "
+              f"(+{overhead:.0f} ns, {overhead / results['bare_ns']:.1%}), disabled {results['disabled_ns']:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,599 @@
+import asyncio
+import logging
+import os
+import time
+
+import numpy as np
+
+from telegram_bot.components.candle_store import INTERVAL_SECONDS, CandleStore
+from telegram_bot.components.http_client import AsyncHttpClient, http_settings
+from telegram_bot.components.indicators import IndicatorGraph
+from telegram_bot.components.metrics import REGISTRY, instrumented
+from telegram_bot.components.price_cache import get_price_cache
+from telegram_bot.components.price_source import price_settings, resolve_prices
+from telegram_bot.components.resample import finest_interval, interval_ratio, resample
+from telegram_bot.components.signal_store import get_signal_store
+from telegram_bot.components.signal_filter import StreamingSignal, evaluate_signal_matrix, stack_closes
+from telegram_bot.components.utils import (
+    ALPHA1,
+    COINEX_KLINE_URL,
+    COINMARKETCAP_QUOTES_URL,
+    K1,
+    K2,
+    TRIGGER,
+    env_setting,
+    parse_candles,
+    parse_quotes,
+    signal_message,
+    signal_side,
+)
+
+# The high-pass filter produces no output until its third close
+MIN_SIGNAL_CANDLES = 3
+
+CYCLE_SECONDS = REGISTRY.histogram("telegram_bot_cycle_seconds", "Duration of monitoring cycles.")
+CYCLE_LAG = REGISTRY.gauge("telegram_bot_cycle_lag_seconds", "Delay of the last cycle start behind its schedule.")
+CYCLE_SYMBOLS = REGISTRY.gauge("telegram_bot_cycle_symbols", "Symbols evaluated in the last cycle.")
+PASS_STAGE_SECONDS = {
+    stage: REGISTRY.histogram("telegram_bot_pass_stage_seconds", "Duration of the stages of monitoring passes.", stage=stage)
+    for stage in ("fetch", "evaluate", "price", "dispatch")
+}
+
+
+class SignalMonitor:
+    """
+    Asyncio signal monitoring engine driven by the python-telegram-bot job queue.
+
+    Each cycle fetches the candles of every configured symbol concurrently over one
+    shared HTTP client, then evaluates and sends the signals. Entry prices come from the
+    candles, with batched quotes and cached quotes as fallbacks (`prices.sources`).
+
+    Only the finest of the configured timeframes is fetched; coarser timeframes are
+    resampled from it locally, so upstream calls per symbol do not grow with them.
+
+    With `monitor.snapshot_path` set, the candles are saved to a binary snapshot every
+    `monitor.snapshot_interval` seconds and on close, and loaded from it on start, so a
+    restart only fetches the candles opened while the bot was down.
+    """
+
+    def __init__(self, config_manager, outbox=None, symbols=None, snapshot_suffix=None):
+        """
+        Initialize the SignalMonitor.
+
+        Args:
+            config_manager (ConfigurationManager): The configuration manager to load bot settings.
+            outbox (MessageQueue, optional): Queue signals are handed to for delivery. Without
+                one, signals are sent directly from the cycle.
+            symbols (list, optional): Symbols to monitor instead of `bot.symbols`; changes to
+                `bot.symbols` are then ignored and `set_symbols` controls the list.
+            snapshot_suffix (str, optional): Appended to the candle snapshot file name, so
+                processes monitoring different symbols keep separate snapshots.
+        """
+        self.config_manager = config_manager
+        self.outbox = outbox
+        self.follow_symbols = symbols is None
+        self.symbols = [] if symbols is None else list(symbols)
+        self.price_cache = get_price_cache(config_manager)
+        self.signal_store = get_signal_store(config_manager)
+        self.signal_filters = {}  # symbol -> StreamingSignal
+        self._evaluated = {}  # symbol -> newest candle at its last evaluation
+        self._fetched_at = {}  # symbol -> Unix time its candles were last fetched
+        self.last_pass = {}  # stage -> seconds it took in the last pass
+        self.signal_params = None
+        self.indicators = None
+        self.indicator_graph = None
+        self.interval = None
+        self.timeframes = []
+        self.base_interval = None
+        self.candle_store = None
+        self.snapshot_suffix = snapshot_suffix
+        self.snapshot_path = None
+        self._snapshot_saved = time.monotonic()
+        self._client = None
+        self._semaphore = None
+        self._scheduled = None  # monotonic time the next cycle is due
+        self._reconfigure = False
+        self.configure()
+
+    def configure(self):
+        """
+        Read the settings from the current configuration.
+
+        State that depends on a changed setting is dropped: candles when the interval or
+        candle limit changed, streaming filters when the interval or signal parameters changed.
+        All settings are read and validated before any state changes, so a configuration
+        that is rejected leaves the monitor as it was.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If a timeframe cannot be resampled from the finest one, the base
+                candles it needs do not fit in one kline request, the indicator graph is invalid,
+                or a price source is unknown.
+        """
+        config_manager = self.config_manager
+        interval = config_manager.get("bot.interval", "1hour")
+        timeframes = list(dict.fromkeys([interval] + list(config_manager.get("bot.timeframes") or [])))
+        base_interval = finest_interval(timeframes)
+        # Enough base candles to build candle_limit candles of the coarsest timeframe
+        ratio = max(interval_ratio(base_interval, timeframe) for timeframe in timeframes)
+        candle_limit = int(config_manager.get("monitor.candle_limit", 50))
+        capacity = candle_limit if ratio == 1 else (candle_limit + 1) * ratio
+        kline_limit = int(config_manager.get("exchange.kline_limit", 1000))
+        if capacity > kline_limit:
+            raise ValueError(
+                f"{candle_limit} candles of {timeframes} need {capacity} {base_interval} candles, more than one "
+                f"kline request returns ({kline_limit}); lower monitor.candle_limit or drop the finest timeframe"
+            )
+        signal_params = {
+            "alpha1": float(config_manager.get("signals.alpha1", ALPHA1)),
+            "k1": float(config_manager.get("signals.k1", K1)),
+            "k2": float(config_manager.get("signals.k2", K2)),
+            "trigger": float(config_manager.get("signals.trigger", TRIGGER)),
+        }
+        snapshot_path = config_manager.get("monitor.snapshot_path") or None
+        if snapshot_path and self.snapshot_suffix:
+            root, extension = os.path.splitext(snapshot_path)
+            snapshot_path = f"{root}-{self.snapshot_suffix}{extension}"
+        snapshot_interval = float(config_manager.get("monitor.snapshot_interval", 300))
+        indicators = config_manager.get("indicators")
+        # Results of nodes whose definition did not change stay memoized across reloads
+        indicator_graph = IndicatorGraph.from_config(
+            config_manager, signal_params, self.indicator_graph.memo if self.indicator_graph is not None else None
+        )
+        monitoring_interval = float(config_manager.get("bot.monitoring_interval", 60))
+        settings = price_settings(config_manager)
+        concurrency = int(config_manager.get("monitor.concurrency", 10))
+
+        # Everything is validated; nothing was touched until here, so a rejected reload keeps the old settings
+        if base_interval != self.base_interval or self.candle_store is None or capacity != self.candle_store.capacity:
+            if self.candle_store is not None:
+                self.save_snapshot()
+            self.candle_store = CandleStore(capacity)
+            if snapshot_path:
+                loaded = self.candle_store.load(snapshot_path)
+                logging.info(f"Loaded {loaded} candle series from {snapshot_path}")
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        if timeframes != self.timeframes or signal_params != self.signal_params or indicators != self.indicators:
+            self.signal_filters = {}
+            self._evaluated = {}
+        self.indicator_graph = indicator_graph
+        self.indicators = indicators
+        self.interval = interval
+        self.timeframes = timeframes
+        self.base_interval = base_interval
+        self.candle_limit = candle_limit
+        self.signal_params = signal_params
+        self.chat_id = config_manager.get("bot.chat_id")
+        self.kline_url = config_manager.get("exchange.kline_url", COINEX_KLINE_URL)
+        self.kline_limit = kline_limit
+        self.quotes_url = config_manager.get("api.coinmarketcap.quotes_url", COINMARKETCAP_QUOTES_URL)
+        self.monitoring_interval = monitoring_interval
+        self.signal_mode = config_manager.get("monitor.signal_mode", "streaming")
+        self.price_settings = settings
+        if self._semaphore is not None and concurrency != self.concurrency:
+            self._semaphore = asyncio.Semaphore(concurrency)
+        self.concurrency = concurrency
+        self.set_symbols(config_manager.get("bot.symbols", []) if self.follow_symbols else self.symbols)
+
+    def on_config_change(self, changed):
+        """
+        Configuration subscriber: apply the new settings at the start of the next cycle.
+
+        Args:
+            changed (set): Dotted keys that changed.
+
+        Returns:
+            None
+        """
+        self._reconfigure = True
+
+    async def run_cycle(self, context):
+        """
+        Run one monitoring pass over all symbols. Used as a job queue callback.
+
+        Args:
+            context (CallbackContext): Callback context of the job.
+
+        Returns:
+            None
+        """
+        started = time.monotonic()
+        self.apply_config()
+        if self._scheduled is None:
+            self._scheduled = started
+        # Skip slots the job queue missed while a previous cycle overran
+        while self._scheduled + self.monitoring_interval <= started:
+            self._scheduled += self.monitoring_interval
+        CYCLE_LAG.set(max(0.0, started - self._scheduled))
+        self._scheduled += self.monitoring_interval
+        await self.run_symbols(self.symbols, context.bot if context is not None else None)
+
+    def apply_config(self):
+        """
+        Apply configuration changes received since the last pass.
+
+        Returns:
+            None
+        """
+        if self._reconfigure:
+            self._reconfigure = False
+            self.configure()
+            logging.info(f"Monitor reconfigured: {self!r}")
+
+    async def run_symbols(self, symbols, bot=None):
+        """
+        Fetch, evaluate and dispatch the signals of some of the symbols.
+
+        Candles are fetched per symbol, concurrently, and their newest close is the entry
+        price by default (`prices.sources`), so a pass costs one upstream request per
+        symbol. Symbols whose newest candle did not change since the last pass are not
+        re-evaluated.
+
+        Args:
+            symbols (list): Monitored symbols to update.
+            bot (telegram.Bot, optional): Bot used when there is no outbox.
+
+        Returns:
+            set: Symbols whose candles changed.
+        """
+        started = time.monotonic()
+        self.open_client()
+
+        results = await asyncio.gather(*(self.fetch_candles(symbol) for symbol in symbols), return_exceptions=True)
+        fetched = time.monotonic()
+
+        windows, candle_prices = {}, {}
+        for symbol, candles in zip(symbols, results):
+            if isinstance(candles, Exception):
+                logging.error(f"Error fetching candles for {symbol}: {candles}")
+                continue
+            newest = self.newest_candle(symbol)
+            if newest is not None and newest != self._evaluated.get(symbol):
+                windows[symbol] = candles
+                candle_prices[symbol] = (newest[1], self.candle_observed_at(symbol, newest[0]))
+                self._evaluated[symbol] = newest
+
+        states = self.evaluate(windows)
+        evaluated = time.monotonic()
+        entry_prices = await resolve_prices(
+            list(candle_prices), candle_prices=candle_prices, fetch_quotes=self.fetch_quotes,
+            price_cache=self.price_cache, **self.price_settings
+        )
+        prices = {key: entry_prices[self.key_symbol(key)] for key in states if self.key_symbol(key) in entry_prices}
+        priced = time.monotonic()
+        # The SQLite store can wait on other workers' transactions, so it runs off the event loop
+        await self.dispatch(states, prices, await asyncio.to_thread(self.signal_store.load), bot)
+
+        finished = time.monotonic()
+        duration = finished - started
+        self.last_pass = {
+            "fetch": fetched - started,
+            "evaluate": evaluated - fetched,
+            "price": priced - evaluated,
+            "dispatch": finished - priced,
+        }
+        if REGISTRY.enabled:
+            CYCLE_SECONDS.observe(duration)
+            CYCLE_SYMBOLS.set(len(symbols))
+            for stage, seconds in self.last_pass.items():
+                PASS_STAGE_SECONDS[stage].observe(seconds)
+        logging.info(f"Signal pass for {len(symbols)} symbols ({len(windows)} changed) finished in {duration:.2f}s")
+        for host, stats in self._client.stats().items():
+            logging.debug(f"{host}: {stats}")
+        self.snapshot_due()
+        return set(windows)
+
+    def save_snapshot(self):
+        """
+        Save the candles to `monitor.snapshot_path`, if set.
+
+        Returns:
+            int: Number of (symbol, interval) series saved.
+        """
+        self._snapshot_saved = time.monotonic()
+        if not self.snapshot_path:
+            return 0
+        try:
+            started = time.monotonic()
+            saved = self.candle_store.save(self.snapshot_path)
+            logging.info(f"Saved {saved} candle series to {self.snapshot_path} in {time.monotonic() - started:.3f}s")
+            return saved
+        except OSError as e:
+            logging.error(f"Error saving the candle snapshot: {e}")
+            return 0
+
+    def snapshot_due(self):
+        """
+        Save the candles if `monitor.snapshot_interval` seconds passed since the last snapshot.
+
+        Returns:
+            None
+        """
+        if self.snapshot_path and time.monotonic() - self._snapshot_saved >= self.snapshot_interval:
+            self.save_snapshot()
+
+    def newest_candle(self, symbol):
+        """
+        Return the newest stored base interval candle of a symbol.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+
+        Returns:
+            tuple: (time, close price, volume), or None before the first fetch.
+        """
+        candles = self.candle_store.buffer(symbol, self.base_interval).candles
+        return tuple(candles[-1]) if len(candles) else None
+
+    def candle_observed_at(self, symbol, open_time):
+        """
+        Return when the close of a symbol's newest candle was last current.
+
+        A still-forming candle's close is the last traded price at the time it was
+        fetched; a closed candle's close dates from its end.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+            open_time (float): Open time of the candle.
+
+        Returns:
+            float: Unix time.
+        """
+        fetched_at = self._fetched_at.get(symbol, time.time())
+        return min(fetched_at, open_time + INTERVAL_SECONDS[self.base_interval])
+
+    def open_client(self):
+        """
+        Create the shared HTTP client and request semaphore on first use.
+
+        Returns:
+            None
+        """
+        if self._client is None:
+            self._client = AsyncHttpClient(**http_settings(self.config_manager))
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def dispatch(self, states, prices, signal_states, bot=None):
+        """
+        Commit every new signal against the stored states in one batch and deliver the winners.
+
+        Args:
+            states (dict): Mapping of signal key to its latest (buy, sell) state.
+            prices (dict): Mapping of signal key to the (price, source, age) of the entry price
+                quoted in its message; keys without a price are not signalled.
+            signal_states (dict): Mapping of signal key to its stored side.
+            bot (telegram.Bot, optional): Bot used when there is no outbox.
+
+        Returns:
+            set: Signal keys whose signal was committed.
+        """
+        proposals = []
+        for symbol, (buy, sell) in states.items():
+            side = signal_side(buy, sell)
+            if side is None or side == signal_states.get(symbol) or symbol not in prices:
+                continue
+            proposals.append((symbol, signal_states.get(symbol), side))
+        committed = await asyncio.to_thread(self.signal_store.compare_and_set_many, proposals) if proposals else set()
+
+        for symbol, _, side in proposals:
+            if symbol not in committed:
+                # Another worker already sent this signal
+                continue
+            message = signal_message(symbol, side, *prices[symbol])
+            if self.outbox is not None:
+                self.outbox.enqueue(self.chat_id, message)
+            else:
+                await self.send(bot, message)
+        return committed
+
+    def set_symbols(self, symbols):
+        """
+        Replace the monitored symbols, dropping the state of symbols that were removed.
+
+        Args:
+            symbols (list): Cryptocurrency pair symbols (e.g., ["BTCUSDT", "ETHUSDT"]).
+
+        Returns:
+            None
+        """
+        self.symbols = list(symbols)
+        self.candle_store.retain(self.symbols)
+        self.indicator_graph.retain(self.symbols)
+        keep = set(self.symbols)
+        for key in [key for key in self.signal_filters if self.key_symbol(key) not in keep]:
+            del self.signal_filters[key]
+        for state in (self._evaluated, self._fetched_at):
+            for symbol in [symbol for symbol in state if symbol not in keep]:
+                del state[symbol]
+
+    def signal_key(self, symbol, timeframe):
+        """
+        Return the key a symbol's signal on a timeframe is filtered, stored and reported under.
+
+        The primary interval keeps the bare symbol, so its stored states stay valid when
+        timeframes are added; others are suffixed (e.g., "BTCUSDT@4hour").
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+            timeframe (str): Candle interval (e.g., "4hour").
+
+        Returns:
+            str: The signal key.
+        """
+        return symbol if timeframe == self.interval else f"{symbol}@{timeframe}"
+
+    @staticmethod
+    def key_symbol(key):
+        return key.partition("@")[0]
+
+    def evaluate(self, windows, mode=None):
+        """
+        Evaluate every configured timeframe of each symbol from its base candles.
+
+        Args:
+            windows (dict): Mapping of symbol to its base interval candle data.
+            mode (str, optional): "streaming", "batch" or "graph"; `monitor.signal_mode` by default.
+
+        Returns:
+            dict: Mapping of signal key to its latest (buy, sell) state; keys with fewer
+            than `MIN_SIGNAL_CANDLES` candles are left out.
+        """
+        mode = mode or self.signal_mode
+        states = {}
+        for timeframe in self.timeframes:
+            frames = {}
+            for symbol, candles in windows.items():
+                try:
+                    frame = resample(candles, self.base_interval, timeframe)[-self.candle_limit:]
+                except Exception as e:
+                    logging.error(f"Error resampling {symbol} to {timeframe}: {e}")
+                    continue
+                # A window shorter than one complete bucket resamples to nothing
+                if len(frame) < MIN_SIGNAL_CANDLES:
+                    logging.debug(f"Skipping {symbol} on {timeframe}: {len(frame)} candles")
+                    continue
+                frames[self.signal_key(symbol, timeframe)] = frame
+            # Batches are per timeframe so their newest candles line up
+            if mode == "graph":
+                states.update(self.evaluate_graph(frames, timeframe))
+            else:
+                states.update(self.evaluate_batch(frames) if mode == "batch" else self.evaluate_streaming(frames))
+        return states
+
+    def evaluate_streaming(self, windows):
+        """
+        Advance each symbol's streaming filter with its new candles.
+
+        Args:
+            windows (dict): Mapping of signal key to candle data (time, close price, volume).
+
+        Returns:
+            dict: Mapping of signal key to its latest (buy, sell) state.
+        """
+        states = {}
+        for symbol, candles in windows.items():
+            try:
+                # Only candles newer than the filter state are processed
+                signal_filter = self.signal_filters.setdefault(symbol, StreamingSignal(**self.signal_params))
+                states[symbol] = signal_filter.update(candles)
+            except Exception as e:
+                logging.error(f"Error during signal analysis for {symbol}: {e}")
+        return states
+
+    def evaluate_graph(self, windows, timeframe):
+        """
+        Evaluate the configured indicator graph on each symbol's candles.
+
+        Args:
+            windows (dict): Mapping of signal key to candle data (time, close price, volume).
+            timeframe (str): Candle interval of the windows.
+
+        Returns:
+            dict: Mapping of signal key to its latest (buy, sell) state.
+        """
+        states = {}
+        for key, candles in windows.items():
+            try:
+                states[key] = self.indicator_graph.signal(candles, self.key_symbol(key), timeframe)
+            except Exception as e:
+                logging.error(f"Error during signal analysis for {key}: {e}")
+        return states
+
+    def evaluate_batch(self, windows):
+        """
+        Evaluate all symbols at once over a symbols x time close matrix.
+
+        Symbols whose newest candle is not aligned with the others are skipped this cycle.
+
+        Args:
+            windows (dict): Mapping of signal key to candle data (time, close price, volume).
+
+        Returns:
+            dict: Mapping of signal key to its latest (buy, sell) state.
+        """
+        symbols = list(windows)
+        if not symbols:
+            return {}
+        closes, usable = stack_closes([windows[symbol] for symbol in symbols], self.candle_limit)
+        buy, sell = evaluate_signal_matrix(closes, **self.signal_params)
+        for symbol in np.asarray(symbols)[~usable]:
+            logging.warning(f"Skipping {symbol}: candles are not aligned with the other symbols")
+        return {symbol: (buy[row], sell[row]) for row, symbol in enumerate(symbols) if usable[row]}
+
+    @instrumented("fetch_quotes")
+    async def fetch_quotes(self, symbols):
+        """
+        Fetch the latest prices for several cryptocurrencies in one request.
+
+        Args:
+            symbols (list): Cryptocurrency symbols (e.g., ["BTC", "ETH"]).
+
+        Returns:
+            dict: Mapping of symbol to price.
+        """
+        symbols = sorted({symbol.upper() for symbol in symbols})
+        if not symbols:
+            return {}
+        headers = {"X-CMC_PRO_API_KEY": env_setting("COINMARKETCAP_API_KEY")}
+        params = {"symbol": ",".join(symbols), "convert": "USD", "skip_invalid": "true"}
+        async with self._semaphore:
+            response = await self._client.get(self.quotes_url, headers=headers, params=params)
+        response.raise_for_status()
+        return parse_quotes(response.json(), symbols)
+
+    @instrumented("fetch_candles")
+    async def fetch_candles(self, symbol):
+        """
+        Bring the stored base interval candles of a cryptocurrency up to date.
+
+        The first call warms the candle store; later calls only request the candles
+        opened since the newest stored one.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+
+        Returns:
+            np.ndarray: Zero-copy view of the candle data (time, close price, volume).
+        """
+        limit = self.candle_store.fetch_limit(symbol, self.base_interval, max_limit=self.kline_limit)
+        params = {"market": symbol, "type": self.base_interval, "limit": limit}
+        async with self._semaphore:
+            response = await self._client.get(self.kline_url, params=params)
+        response.raise_for_status()
+        self._fetched_at[symbol] = time.time()
+        return self.candle_store.update(symbol, self.base_interval, parse_candles(response.content))
+
+    async def send(self, bot, message):
+        """
+        Send a signal message to the configured Telegram chat/channel.
+
+        Args:
+            bot (telegram.Bot): Bot of the running Application.
+            message (str): The message to send.
+
+        Returns:
+            None
+        """
+        try:
+            await bot.send_message(self.chat_id, message)
+            logging.info(f"Message sent: {message}")
+        except Exception as e:
+            logging.error(f"Error sending message: {e}")
+
+    async def close(self):
+        """
+        Save the candle snapshot and close the shared HTTP client and its connection pools.
+
+        Returns:
+            None
+        """
+        self.save_snapshot()
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def __repr__(self):
+        return f"<SignalMonitor(symbols={len(self.symbols)}, timeframes={self.timeframes}, concurrency={self.concurrency})>"
@@ -0,0 +1,248 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from telegram_bot.components.utils import fetch_crypto_price, fetch_crypto_prices
+
+
+class _InFlight:
+    """
+    A pending upstream fetch that concurrent callers for the same symbol wait on.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.price = None
+        self.error = None
+
+
+class PriceCache:
+    """
+    A size-bounded, thread-safe TTL cache for cryptocurrency quotes.
+
+    Fresh entries are served directly. Entries older than `ttl` but younger than
+    `ttl + stale_ttl` are served immediately while a single background refresh
+    updates them. Concurrent misses for the same symbol share one upstream fetch.
+    """
+
+    def __init__(self, loader, ttl=30, stale_ttl=120, max_size=1024, batch_loader=None, clock=time.monotonic):
+        """
+        Initialize the PriceCache.
+
+        Args:
+            loader (callable): Function taking a symbol and returning (price, error).
+            ttl (float): Seconds an entry is considered fresh.
+            stale_ttl (float): Extra seconds a stale entry may be served while revalidating.
+            max_size (int): Maximum number of symbols kept; least recently used are evicted.
+            batch_loader (callable, optional): Function taking a list of symbols and returning
+                (dict of prices, error), used by `get_many`.
+            clock (callable): Monotonic clock entry ages are measured on.
+        """
+        self.loader = loader
+        self.batch_loader = batch_loader
+        self.ttl = float(ttl)
+        self.stale_ttl = float(stale_ttl)
+        self.max_size = int(max_size)
+        self.clock = clock
+        self._entries = OrderedDict()  # symbol -> (price, fetched_at)
+        self._in_flight = {}  # symbol -> _InFlight
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0  # Misses that joined an in-flight fetch instead of issuing one
+
+    def get(self, symbol):
+        """
+        Return the price for a symbol, fetching it upstream only when needed.
+
+        Args:
+            symbol (str): Cryptocurrency symbol (e.g., "BTC").
+
+        Returns:
+            tuple: (float, str) - Price of the cryptocurrency, or an error message.
+        """
+        symbol = symbol.upper()
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is not None:
+                price, fetched_at = entry
+                age = now - fetched_at
+                if age < self.ttl:
+                    self._entries.move_to_end(symbol)
+                    self.hits += 1
+                    return price, None
+                if age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(symbol)
+                    self.stale_hits += 1
+                    if symbol not in self._in_flight:
+                        self._in_flight[symbol] = _InFlight()
+                        threading.Thread(target=self._load, args=(symbol,), daemon=True).start()
+                    return price, None
+
+            self.misses += 1
+            flight = self._in_flight.get(symbol)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[symbol] = _InFlight()
+            else:
+                self.coalesced += 1
+
+        if leader:
+            self._load(symbol)
+        else:
+            flight.done.wait()
+        return flight.price, flight.error
+
+    def get_many(self, symbols):
+        """
+        Return the prices of several symbols, fetching every expired one in one batched request.
+
+        Stale entries are served if the batched request fails.
+
+        Args:
+            symbols (list): Cryptocurrency symbols (e.g., ["BTC", "ETH"]).
+
+        Returns:
+            dict: Mapping of symbol to price for the symbols a price is known for.
+        """
+        if self.batch_loader is None:
+            prices = {}
+            for symbol in symbols:
+                price, error = self.get(symbol)
+                if error is None:
+                    prices[symbol.upper()] = price
+            return prices
+
+        now = self.clock()
+        prices, expired = {}, []
+        with self._lock:
+            for symbol in {symbol.upper() for symbol in symbols}:
+                entry = self._entries.get(symbol)
+                if entry is not None and now - entry[1] < self.ttl:
+                    self._entries.move_to_end(symbol)
+                    self.hits += 1
+                    prices[symbol] = entry[0]
+                    continue
+                self.misses += 1
+                expired.append(symbol)
+                if entry is not None and now - entry[1] < self.ttl + self.stale_ttl:
+                    prices[symbol] = entry[0]
+        if expired:
+            fetched, error = self.batch_loader(expired)
+            if error:
+                logging.error(f"Error refreshing cached prices for {', '.join(expired)}: {error}")
+            self.update(fetched)
+            prices.update(fetched)
+        return prices
+
+    def peek(self, symbol):
+        """
+        Return the cached price of a symbol however old it is, without fetching it.
+
+        Args:
+            symbol (str): Cryptocurrency symbol (e.g., "BTC").
+
+        Returns:
+            tuple: (price, age in seconds), or None if the symbol is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(symbol.upper())
+        if entry is None:
+            return None
+        return entry[0], self.clock() - entry[1]
+
+    def update(self, prices):
+        """
+        Store freshly fetched prices, e.g. the batched quotes of a monitoring cycle.
+
+        Args:
+            prices (dict): Mapping of symbol to price.
+
+        Returns:
+            None
+        """
+        now = self.clock()
+        with self._lock:
+            for symbol, price in prices.items():
+                self._store(symbol.upper(), price, now)
+
+    def stats(self):
+        """
+        Return cache hit/miss counters.
+
+        Returns:
+            dict: Counters and current number of cached symbols.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "size": len(self._entries),
+            }
+
+    def _load(self, symbol):
+        """
+        Fetch a symbol upstream and release every caller waiting on it.
+
+        Args:
+            symbol (str): Cryptocurrency symbol (e.g., "BTC").
+        """
+        flight = self._in_flight[symbol]
+        try:
+            flight.price, flight.error = self.loader(symbol)
+        except Exception as e:
+            logging.error(f"Error refreshing cached price for {symbol}: {e}")
+            flight.price, flight.error = None, str(e)
+
+        with self._lock:
+            if flight.error is None:
+                self._store(symbol, flight.price, self.clock())
+            self._in_flight.pop(symbol, None)
+        flight.done.set()
+
+    def _store(self, symbol, price, fetched_at):
+        """
+        Insert an entry and evict the least recently used ones beyond `max_size`.
+        Must be called with the lock held.
+        """
+        self._entries[symbol] = (price, fetched_at)
+        self._entries.move_to_end(symbol)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __repr__(self):
+        return f"<PriceCache(ttl={self.ttl}, stale_ttl={self.stale_ttl}, max_size={self.max_size})>"
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_price_cache(config_manager=None):
+    """
+    Return the process-wide quote cache shared by commands and the signal monitor.
+
+    Args:
+        config_manager (ConfigurationManager, optional): Source of the `cache.*` settings,
+            used only when the cache is first created.
+
+    Returns:
+        PriceCache: The shared cache instance.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            settings = {}
+            if config_manager is not None:
+                settings = {
+                    "ttl": config_manager.get("cache.ttl", 30),
+                    "stale_ttl": config_manager.get("cache.stale_ttl", 120),
+                    "max_size": config_manager.get("cache.max_size", 1024),
+                }
+            _shared_cache = PriceCache(fetch_crypto_price, batch_loader=fetch_crypto_prices, **settings)
+        return _shared_cache
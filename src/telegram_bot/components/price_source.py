@@ -0,0 +1,99 @@
+import logging
+import time
+
+from telegram_bot.components.metrics import REGISTRY
+from telegram_bot.components.utils import base_asset
+
+# Where a signal's entry price can come from, in the default priority
+PRICE_SOURCES = ("candle", "quote", "cache")
+
+PRICES_RESOLVED = {
+    source: REGISTRY.counter("telegram_bot_entry_prices_total", "Signal entry prices by source.", source=source)
+    for source in PRICE_SOURCES + ("missing",)
+}
+
+
+def price_settings(config_manager):
+    """
+    Read the `prices.*` settings.
+
+    Args:
+        config_manager (ConfigurationManager): The configuration manager to load settings from.
+
+    Returns:
+        dict: `sources` in priority order and `max_age` in seconds (None for no limit).
+
+    Raises:
+        ValueError: If a source is unknown.
+    """
+    sources = list(config_manager.get("prices.sources") or PRICE_SOURCES)
+    for source in sources:
+        if source not in PRICE_SOURCES:
+            raise ValueError(f"Unknown price source: {source}")
+    max_age = config_manager.get("prices.max_age", 300)
+    return {"sources": sources, "max_age": None if max_age is None else float(max_age)}
+
+
+async def resolve_prices(symbols, sources=PRICE_SOURCES, candle_prices=None, fetch_quotes=None, price_cache=None,
+                         max_age=None, now=None):
+    """
+    Find an entry price for each symbol, trying the sources in priority order.
+
+    A source only covers the symbols the sources before it could not price, so the
+    quote provider is only called, once for all of them, when a candle close is
+    missing or too old. A price older than `max_age` is passed over; an outage of one
+    source falls through to the next.
+
+    Args:
+        symbols (list): Cryptocurrency pair symbols (e.g., ["BTCUSDT"]).
+        sources (list): Source names from `PRICE_SOURCES` in priority order.
+        candle_prices (dict, optional): Mapping of symbol to (close price, Unix time it was observed).
+        fetch_quotes (callable, optional): Coroutine function taking base assets and returning
+            a mapping of asset to price.
+        price_cache (PriceCache, optional): Cache of the last known quotes.
+        max_age (float, optional): Oldest acceptable price in seconds.
+        now (float, optional): Current Unix time; defaults to `time.time()`.
+
+    Returns:
+        dict: Mapping of symbol to (price, source, age in seconds) for the symbols priced.
+    """
+    now = time.time() if now is None else now
+    candle_prices = candle_prices or {}
+    resolved = {}
+
+    def usable(age):
+        return max_age is None or age <= max_age
+
+    for source in sources:
+        pending = [symbol for symbol in symbols if symbol not in resolved]
+        if not pending:
+            break
+        if source == "candle":
+            for symbol in pending:
+                if symbol in candle_prices:
+                    price, observed_at = candle_prices[symbol]
+                    age = max(0.0, now - observed_at)
+                    if usable(age):
+                        resolved[symbol] = (float(price), "candle", age)
+        elif source == "quote" and fetch_quotes is not None:
+            try:
+                quotes = await fetch_quotes(sorted({base_asset(symbol) for symbol in pending}))
+            except Exception as e:
+                logging.error(f"Error fetching quotes for entry prices: {e}")
+                continue
+            if price_cache is not None:
+                price_cache.update(quotes)
+            for symbol in pending:
+                if base_asset(symbol) in quotes:
+                    resolved[symbol] = (quotes[base_asset(symbol)], "quote", 0.0)
+        elif source == "cache" and price_cache is not None:
+            for symbol in pending:
+                entry = price_cache.peek(base_asset(symbol))
+                if entry is not None and usable(entry[1]):
+                    resolved[symbol] = (entry[0], "cache", entry[1])
+
+    if REGISTRY.enabled:
+        for _, source, _ in resolved.values():
+            PRICES_RESOLVED[source].inc()
+        PRICES_RESOLVED["missing"].inc(len(symbols) - len(resolved))
+    return resolved
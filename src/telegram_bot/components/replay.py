@@ -0,0 +1,589 @@
+import argparse
+import asyncio
+import bisect
+import json
+import logging
+import os
+import random
+import time
+import zlib
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from telegram_bot.components.candle_store import INTERVAL_SECONDS
+
+KLINE_PATH = "/v1/market/kline"
+QUOTES_PATH = "/v1/cryptocurrency/quotes/latest"
+
+# Injected fault kinds: an error status, a dropped connection, or no answer in time
+FAULTS = ("status", "disconnect", "timeout")
+
+
+class Cassette:
+    """
+    Append-only JSON Lines file of upstream responses, written by the HTTP clients
+    when `http.record` is set and served again by `ReplayServer`.
+
+    Request headers are not recorded, so API keys stay out of the file. Each entry is
+    written with a single `write` on an `O_APPEND` descriptor, so several clients of one
+    process can record to the same file.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the Cassette.
+
+        Args:
+            path (str): File the responses are appended to.
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def record(self, method, url, params, status, body, elapsed):
+        """
+        Append one response.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request URL without the query string.
+            params (dict): Query parameters.
+            status (int): Response status.
+            body (str): Response body.
+            elapsed (float): Seconds the request took.
+
+        Returns:
+            None
+        """
+        if self._fd is None:
+            return
+        parts = urlsplit(url)
+        entry = {
+            "time": time.time(),
+            "method": method,
+            "host": parts.netloc,
+            "path": parts.path,
+            "params": {name: str(value) for name, value in (params or {}).items()},
+            "status": status,
+            "elapsed": round(elapsed, 6),
+            "body": body,
+        }
+        os.write(self._fd, (json.dumps(entry) + "\n").encode())
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    @staticmethod
+    def load(path):
+        """
+        Read the entries of a cassette file.
+
+        Args:
+            path (str): Cassette file.
+
+        Returns:
+            list: Entries sorted by recording time.
+        """
+        with open(path) as file:
+            entries = [json.loads(line) for line in file if line.strip()]
+        return sorted(entries, key=lambda entry: entry["time"])
+
+    def __repr__(self):
+        return f"<Cassette(path={self.path})>"
+
+
+def _timeline():
+    return ([], [])  # recording times, entries
+
+
+def _at(timeline, at):
+    """
+    Return the latest entry recorded at or before `at`, or the first one.
+    """
+    times, entries = timeline
+    return entries[max(0, bisect.bisect_right(times, at) - 1)]
+
+
+class Recordings:
+    """
+    Recorded responses indexed for replay.
+
+    Klines are indexed per (market, interval) and quotes per symbol, so a batched quote
+    request is answered whatever symbols it combines. Other requests are matched on
+    their path and parameters.
+    """
+
+    def __init__(self, entries=()):
+        """
+        Initialize the Recordings.
+
+        Args:
+            entries (list): Cassette entries sorted by time.
+        """
+        self.klines = defaultdict(_timeline)  # (market, interval) -> timeline of entries
+        self.quotes = defaultdict(_timeline)  # symbol -> timeline of (quote, elapsed)
+        self.other = defaultdict(_timeline)  # (path, params) -> timeline of entries
+        self.start = None
+        for entry in entries:
+            self.add(entry)
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(Cassette.load(path))
+
+    def add(self, entry):
+        """
+        Index one cassette entry.
+
+        Args:
+            entry (dict): Entry as written by `Cassette.record`.
+
+        Returns:
+            None
+        """
+        at = entry["time"]
+        self.start = at if self.start is None else min(self.start, at)
+        params = entry.get("params", {})
+        if entry["path"].endswith(KLINE_PATH):
+            timeline = self.klines[(params.get("market"), params.get("type"))]
+        elif entry["path"].endswith(QUOTES_PATH) and entry["status"] == 200:
+            for symbol, quote in json.loads(entry["body"]).get("data", {}).items():
+                times, values = self.quotes[symbol]
+                times.append(at)
+                values.append((quote, entry["elapsed"]))
+            return
+        else:
+            timeline = self.other[(entry["path"], tuple(sorted(params.items())))]
+        timeline[0].append(at)
+        timeline[1].append(entry)
+
+    def kline(self, market, interval, at):
+        timeline = self.klines.get((market, interval))
+        return _at(timeline, at) if timeline else None
+
+    def quote(self, symbol, at):
+        timeline = self.quotes.get(symbol)
+        return _at(timeline, at) if timeline else None
+
+    def request(self, path, params, at):
+        timeline = self.other.get((path, tuple(sorted(params.items()))))
+        return _at(timeline, at) if timeline else None
+
+    def __len__(self):
+        return sum(len(timeline[0]) for index in (self.klines, self.quotes, self.other) for timeline in index.values())
+
+    def __repr__(self):
+        return f"<Recordings(klines={len(self.klines)}, quotes={len(self.quotes)}, other={len(self.other)})>"
+
+
+class SyntheticMarket:
+    """
+    Deterministic random walk of one market's candles, extended as time advances.
+    """
+
+    HISTORY = 2000  # Candles generated before the first one requested
+
+    def __init__(self, market, interval, seed=0):
+        """
+        Initialize the SyntheticMarket.
+
+        Args:
+            market (str): Market name; seeds the walk together with `seed`.
+            interval (str): Candle interval.
+            seed (int): Seed shared by all markets of a run.
+        """
+        self.market = market
+        self.period = INTERVAL_SECONDS[interval]
+        self._rng = np.random.default_rng([seed, zlib.crc32(f"{market}:{interval}".encode())])
+        self._first = None  # candle number of closes[0]
+        self._closes = np.empty(0)
+        self._volumes = np.empty(0)
+        self._start_price = 10.0 ** self._rng.uniform(-1, 4)
+
+    def _extend(self, last):
+        count = last - self._first + 1 - len(self._closes)
+        if count <= 0:
+            return
+        previous = self._closes[-1] if len(self._closes) else self._start_price
+        self._closes = np.concatenate((self._closes, previous * np.exp(np.cumsum(self._rng.normal(0, 0.003, count)))))
+        self._volumes = np.concatenate((self._volumes, self._rng.lognormal(3, 1, count)))
+
+    def rows(self, at, limit):
+        """
+        Return the newest `limit` candles at time `at` as CoinEx kline items.
+
+        Args:
+            at (float): Unix time; the candle containing it is still forming.
+            limit (int): Number of candles.
+
+        Returns:
+            list: Kline items [time, open, close, high, low, volume, amount, market].
+        """
+        last = int(at // self.period)
+        if self._first is None:
+            self._first = last - max(self.HISTORY, limit)
+        self._extend(last)
+        end = last - self._first + 1
+        start = max(1, end - int(limit))
+        closes, volumes = self._closes, self._volumes
+        return [
+            [
+                (self._first + i) * self.period,
+                f"{closes[i - 1]:.8g}",
+                f"{closes[i]:.8g}",
+                f"{max(closes[i - 1], closes[i]):.8g}",
+                f"{min(closes[i - 1], closes[i]):.8g}",
+                f"{volumes[i]:.6g}",
+                f"{volumes[i] * closes[i]:.6g}",
+                self.market,
+            ]
+            for i in range(start, end)
+        ]
+
+
+class ReplayServer:
+    """
+    Local stand-in for the upstream APIs serving recorded or synthetic responses.
+
+    Serves `GET /v1/market/kline` (CoinEx), `GET /v1/cryptocurrency/quotes/latest`
+    (CoinMarketCap) and every Bot API method under `/bot<token>/` (Telegram). The replay
+    clock starts at the first recording, or the current time without recordings, and
+    runs `speed` times faster than real time; each request is answered with the newest
+    response recorded before the replay time. `POST /_replay/advance?seconds=N` moves the
+    clock forward and `GET /_replay/stats` reports request counts.
+    """
+
+    def __init__(self, recordings=None, host="127.0.0.1", port=0, speed=1.0, latency=0.0, jitter=0.0, fault_rate=0.0,
+                 fault="status", replay_latency=True, synthetic=True, seed=0):
+        """
+        Initialize the ReplayServer.
+
+        Args:
+            recordings (Recordings, optional): Recorded responses; synthetic data only by default.
+            host (str): Interface to listen on.
+            port (int): TCP port; 0 picks a free port.
+            speed (float): Replay clock speed relative to real time; also divides recorded latencies.
+            latency (float): Seconds added to every response.
+            jitter (float): Upper bound of a random extra delay per response.
+            fault_rate (float): Fraction of requests answered with a fault.
+            fault (str): Kind of injected fault, one of `FAULTS`.
+            replay_latency (bool): Whether recorded responses are delayed by their recorded duration.
+            synthetic (bool): Whether unrecorded markets and symbols are served synthetic data.
+            seed (int): Seed of the synthetic markets and of the fault and jitter draws.
+
+        Raises:
+            ValueError: If `fault` is unknown.
+        """
+        if fault not in FAULTS:
+            raise ValueError(f"Unknown fault: {fault}")
+        self.recordings = recordings or Recordings()
+        self.host = host
+        self.port = int(port)
+        self.speed = float(speed)
+        self.latency = float(latency)
+        self.jitter = float(jitter)
+        self.fault_rate = float(fault_rate)
+        self.fault = fault
+        self.replay_latency = replay_latency
+        self.synthetic = synthetic
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._markets = {}  # (market, interval) -> SyntheticMarket
+        self._epoch = self.recordings.start if self.recordings.start is not None else time.time()
+        self._started = time.monotonic()
+        self._advanced = 0.0
+        self.counts = defaultdict(int)  # kind -> requests
+        self.faults = 0
+        self.messages = 0
+        self._runner = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def kline_url(self):
+        return self.base_url + KLINE_PATH
+
+    @property
+    def quotes_url(self):
+        return self.base_url + QUOTES_PATH
+
+    @property
+    def telegram_url(self):
+        """str: Value for `telegram.api_url`."""
+        return self.base_url + "/bot"
+
+    def now(self):
+        """
+        Return the replay clock.
+
+        Returns:
+            float: Unix time being replayed.
+        """
+        return self._epoch + (time.monotonic() - self._started) * self.speed + self._advanced
+
+    def advance(self, seconds):
+        """
+        Move the replay clock forward, e.g., by one candle between benchmark cycles.
+
+        Args:
+            seconds (float): Replay seconds to skip.
+
+        Returns:
+            float: The new replay time.
+        """
+        self._advanced += float(seconds)
+        return self.now()
+
+    async def start(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get(KLINE_PATH, self._kline)
+        app.router.add_get(QUOTES_PATH, self._quotes)
+        app.router.add_route("*", "/bot{token}/{method}", self._telegram)
+        app.router.add_post("/_replay/advance", self._advance)
+        app.router.add_get("/_replay/stats", self._stats)
+        app.router.add_get("/{path:.*}", self._other)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _delay(self, kind, elapsed=0.0):
+        """
+        Count a request, wait out the configured latency and decide on a fault.
+
+        Returns:
+            bool: Whether the request is answered with a fault.
+        """
+        self.counts[kind] += 1
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if self.replay_latency:
+            delay += elapsed / self.speed
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.fault_rate and self._random.random() < self.fault_rate:
+            self.faults += 1
+            return True
+        return False
+
+    async def _fault(self, request):
+        from aiohttp import web
+
+        if self.fault == "disconnect":
+            request.transport.close()
+            return web.Response(status=503)
+        if self.fault == "timeout":
+            await asyncio.sleep(3600)
+        return web.json_response({"code": 503, "message": "injected fault"}, status=503, headers={"Retry-After": "1"})
+
+    async def _kline(self, request):
+        from aiohttp import web
+
+        market, interval = request.query.get("market"), request.query.get("type", "1min")
+        limit = int(request.query.get("limit", 100))
+        recorded = self.recordings.kline(market, interval, self.now())
+        if await self._delay("kline", recorded["elapsed"] if recorded else 0.0):
+            return await self._fault(request)
+        if recorded is not None:
+            body = json.loads(recorded["body"])
+            if isinstance(body.get("data"), list):
+                body["data"] = body["data"][-limit:]
+            return web.json_response(body, status=recorded["status"])
+        if not self.synthetic or interval not in INTERVAL_SECONDS:
+            return web.json_response({"code": 2, "message": "not recorded", "data": {}}, status=404)
+        key = (market, interval)
+        if key not in self._markets:
+            self._markets[key] = SyntheticMarket(market, interval, self.seed)
+        return web.json_response({"code": 0, "message": "OK", "data": self._markets[key].rows(self.now(), limit)})
+
+    async def _quotes(self, request):
+        from aiohttp import web
+
+        symbols = [symbol for symbol in request.query.get("symbol", "").split(",") if symbol]
+        at = self.now()
+        quotes = {symbol: self.recordings.quote(symbol, at) for symbol in symbols}
+        elapsed = max((quote[1] for quote in quotes.values() if quote), default=0.0)
+        if await self._delay("quotes", elapsed):
+            return await self._fault(request)
+        data = {}
+        for symbol, quote in quotes.items():
+            if quote is not None:
+                data[symbol] = quote[0]
+            elif self.synthetic:
+                rows = self._synthetic_quote(symbol, at)
+                data[symbol] = {"symbol": symbol, "quote": {"USD": {"price": float(rows[-1][2])}}}
+        return web.json_response({"status": {"error_code": 0}, "data": data})
+
+    def _synthetic_quote(self, symbol, at):
+        key = (f"{symbol}USDT", "1min")
+        if key not in self._markets:
+            self._markets[key] = SyntheticMarket(*key, self.seed)
+        return self._markets[key].rows(at, 1)
+
+    async def _telegram(self, request):
+        from aiohttp import web
+
+        if await self._delay("telegram"):
+            return await self._fault(request)
+        method = request.match_info["method"]
+        params = dict(request.query)
+        if request.can_read_body:
+            if request.content_type == "application/json":
+                params.update(await request.json())
+            else:
+                params.update(await request.post())
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Replay", "username": "replay_bot"}
+        elif method == "sendMessage":
+            self.messages += 1
+            chat_id = params.get("chat_id", 0)
+            result = {
+                "message_id": self.messages,
+                "date": int(time.time()),
+                "chat": {"id": int(chat_id) if str(chat_id).lstrip("-").isdigit() else 0, "type": "channel",
+                         "username": str(chat_id).lstrip("@")},
+                "text": params.get("text", ""),
+            }
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    async def _other(self, request):
+        from aiohttp import web
+
+        recorded = self.recordings.request(request.path, dict(request.query), self.now())
+        if await self._delay("other", recorded["elapsed"] if recorded else 0.0):
+            return await self._fault(request)
+        if recorded is None:
+            return web.json_response({"message": "not recorded"}, status=404)
+        return web.Response(text=recorded["body"], status=recorded["status"], content_type="application/json")
+
+    async def _advance(self, request):
+        from aiohttp import web
+
+        return web.json_response({"now": self.advance(float(request.query.get("seconds", 0)))})
+
+    async def _stats(self, request):
+        from aiohttp import web
+
+        return web.json_response({"requests": dict(self.counts), "faults": self.faults, "messages": self.messages,
+                                  "now": self.now()})
+
+    def __repr__(self):
+        return (f"<ReplayServer(url={self.base_url}, recordings={len(self.recordings)}, speed={self.speed}, "
+                f"latency={self.latency}, fault_rate={self.fault_rate})>")
+
+
+def record(path, symbols, interval="1hour", limit=50, repeat=1, every=60.0):
+    """
+    Record the kline and quote responses of some symbols from the real upstream APIs.
+
+    Args:
+        path (str): Cassette file the responses are appended to.
+        symbols (list): Cryptocurrency pair symbols (e.g., ["BTCUSDT"]).
+        interval (str): Candle interval.
+        limit (int): Candles per kline request.
+        repeat (int): Number of recording rounds.
+        every (float): Seconds between rounds.
+
+    Returns:
+        None
+    """
+    from telegram_bot.components.http_client import HttpClient
+    from telegram_bot.components.utils import base_asset, env_setting, upstream_url
+
+    client = HttpClient(record=path)
+    try:
+        for round_number in range(repeat):
+            if round_number:
+                time.sleep(every)
+            for symbol in symbols:
+                client.get(upstream_url("COINEX_KLINE_URL"), params={"market": symbol, "type": interval, "limit": limit})
+            assets = sorted({base_asset(symbol) for symbol in symbols})
+            try:
+                headers = {"X-CMC_PRO_API_KEY": env_setting("COINMARKETCAP_API_KEY")}
+            except Exception as e:
+                logging.warning(f"Not recording quotes: {e}")
+            else:
+                params = {"symbol": ",".join(assets), "convert": "USD", "skip_invalid": "true"}
+                client.get(upstream_url("COINMARKETCAP_QUOTES_URL"), params=params, headers=headers)
+            logging.info(f"Recorded round {round_number + 1}/{repeat} to {path}")
+    finally:
+        client.close()
+
+
+async def serve(server):
+    await server.start()
+    print(f"Replay server listening on {server.base_url}", flush=True)
+    print(f"  exchange.kline_url: {server.kline_url}\n  api.coinmarketcap.quotes_url: {server.quotes_url}\n"
+          f"  telegram.api_url: {server.telegram_url}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main(argv=None):
+    """
+    Command line entry point: `record` real responses to a cassette, or `serve` them.
+
+    Example:
+        python -m telegram_bot.components.replay record data/upstream.jsonl --symbols BTCUSDT ETHUSDT
+        python -m telegram_bot.components.replay serve data/upstream.jsonl --speed 60 --latency 0.05
+    """
+    parser = argparse.ArgumentParser(description="Record upstream responses or serve them from a local stand-in.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    recorder = commands.add_parser("record", help="Record kline and quote responses to a cassette")
+    recorder.add_argument("cassette", help="Cassette file to append to")
+    recorder.add_argument("--symbols", nargs="+", default=["BTCUSDT", "ETHUSDT"], help="Markets to record")
+    recorder.add_argument("--interval", default="1hour", help="Candle interval")
+    recorder.add_argument("--limit", type=int, default=50, help="Candles per request")
+    recorder.add_argument("--repeat", type=int, default=1, help="Recording rounds")
+    recorder.add_argument("--every", type=float, default=60, help="Seconds between rounds")
+
+    server = commands.add_parser("serve", help="Serve recorded (and synthetic) responses")
+    server.add_argument("cassette", nargs="?", help="Cassette file; synthetic data only when omitted")
+    server.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    server.add_argument("--port", type=int, default=8766, help="Port; 0 picks a free one")
+    server.add_argument("--speed", type=float, default=1.0, help="Replay clock speed relative to real time")
+    server.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    server.add_argument("--jitter", type=float, default=0.0, help="Maximum random extra delay in seconds")
+    server.add_argument("--fault-rate", type=float, default=0.0, help="Fraction of requests answered with a fault")
+    server.add_argument("--fault", choices=FAULTS, default="status", help="Kind of injected fault")
+    server.add_argument("--no-recorded-latency", action="store_true", help="Do not replay recorded response times")
+    server.add_argument("--no-synthetic", action="store_true", help="Answer unrecorded requests with 404")
+    server.add_argument("--seed", type=int, default=0, help="Seed of synthetic data, faults and jitter")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "record":
+        record(args.cassette, args.symbols, args.interval, args.limit, args.repeat, args.every)
+        return
+    recordings = Recordings.from_file(args.cassette) if args.cassette else None
+    try:
+        asyncio.run(serve(ReplayServer(
+            recordings, args.host, args.port, args.speed, args.latency, args.jitter, args.fault_rate, args.fault,
+            not args.no_recorded_latency, not args.no_synthetic, args.seed,
+        )))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import numpy as np
+
+from telegram_bot.components.candle_store import INTERVAL_SECONDS
+
+# Offset of the first bucket from the Unix epoch; weekly candles open on Monday 00:00 UTC
+INTERVAL_ORIGINS = {"1week": 4 * 86400}
+
+
+def interval_ratio(base_interval, interval):
+    """
+    Return how many base candles make up one candle of a coarser interval.
+
+    Args:
+        base_interval (str): Interval that is fetched (e.g., "15min").
+        interval (str): Interval built from it (e.g., "4hour").
+
+    Returns:
+        int: Number of base candles per candle.
+
+    Raises:
+        ValueError: If an interval is unknown or not a whole multiple of the base interval.
+    """
+    for name in (base_interval, interval):
+        if name not in INTERVAL_SECONDS:
+            raise ValueError(f"Unknown interval: {name}")
+    ratio, remainder = divmod(INTERVAL_SECONDS[interval], INTERVAL_SECONDS[base_interval])
+    if ratio < 1 or remainder or (INTERVAL_ORIGINS.get(interval, 0) - INTERVAL_ORIGINS.get(base_interval, 0)) % INTERVAL_SECONDS[base_interval]:
+        raise ValueError(f"{interval} candles cannot be built from {base_interval} candles")
+    return ratio
+
+
+def finest_interval(intervals):
+    """
+    Return the shortest of several intervals, the one to fetch and resample from.
+
+    Args:
+        intervals (list): Interval names.
+
+    Returns:
+        str: The finest interval.
+    """
+    return min(intervals, key=lambda name: INTERVAL_SECONDS[name])
+
+
+def _groups(times, interval):
+    """
+    Split sorted open times into buckets of `interval`.
+
+    Returns:
+        tuple: (bucket open times, index of each bucket's first row, index of its last row).
+        A leading bucket whose first candles are missing from the window is left out.
+    """
+    period = INTERVAL_SECONDS[interval]
+    origin = INTERVAL_ORIGINS.get(interval, 0)
+    # Integer bucket numbers: float modulo is several times slower on these sizes
+    buckets = (times.astype(np.int64) - origin) // period
+    edges = np.flatnonzero(buckets[1:] != buckets[:-1]) + 1
+    first = np.concatenate(([0], edges))
+    last = np.concatenate((edges - 1, [len(times) - 1]))
+    starts = buckets[first] * period + origin
+    if starts[0] != times[0]:
+        # The window begins mid-bucket: that candle would be incomplete
+        first, last, starts = first[1:], last[1:], starts[1:]
+    return starts.astype(float), first, last
+
+
+def resample(candles, base_interval, interval):
+    """
+    Aggregate (time, close price, volume) candles into a coarser interval.
+
+    A candle keeps the close of its last base candle and the summed volume. The last
+    candle is built from whatever base candles exist so far, like the exchange's
+    still-forming candle.
+
+    Args:
+        candles (np.ndarray): (n, 3) base candles sorted by time.
+        base_interval (str): Interval of `candles`.
+        interval (str): Target interval.
+
+    Returns:
+        np.ndarray: (m, 3) resampled candles; `candles` itself when the intervals match.
+    """
+    if interval == base_interval:
+        return candles
+    interval_ratio(base_interval, interval)
+    if not len(candles):
+        return candles.reshape(0, 3)
+    starts, first, last = _groups(candles[:, 0], interval)
+    if not len(first):
+        return np.empty((0, 3))
+    volume = np.add.reduceat(candles[first[0]:, 2], first - first[0])
+    return np.column_stack((starts, candles[last, 1], volume))
+
+
+def resample_ohlcv(candles, base_interval, interval):
+    """
+    Aggregate (time, open, high, low, close, volume) candles into a coarser interval.
+
+    Args:
+        candles (np.ndarray): (n, 6) base candles sorted by time.
+        base_interval (str): Interval of `candles`.
+        interval (str): Target interval.
+
+    Returns:
+        np.ndarray: (m, 6) resampled candles; `candles` itself when the intervals match.
+    """
+    if interval == base_interval:
+        return candles
+    interval_ratio(base_interval, interval)
+    if not len(candles):
+        return candles.reshape(0, 6)
+    starts, first, last = _groups(candles[:, 0], interval)
+    if not len(first):
+        return np.empty((0, 6))
+    rows = candles[first[0]:]
+    offsets = first - first[0]
+    return np.column_stack((
+        starts,
+        candles[first, 1],
+        np.maximum.reduceat(rows[:, 2], offsets),
+        np.minimum.reduceat(rows[:, 3], offsets),
+        candles[last, 4],
+        np.add.reduceat(rows[:, 5], offsets),
+    ))
@@ -0,0 +1,343 @@
+import asyncio
+import heapq
+import logging
+import time
+import zlib
+
+from telegram_bot.components.candle_store import INTERVAL_SECONDS
+from telegram_bot.components.metrics import REGISTRY
+from telegram_bot.components.resample import INTERVAL_ORIGINS
+
+SCHEDULE_LAG = REGISTRY.gauge("telegram_bot_schedule_lag_seconds", "Delay of the last scheduled pass behind its due time.")
+SCHEDULE_RETRIES = REGISTRY.counter(
+    "telegram_bot_schedule_retries_total", "Passes repeated because the exchange had not published a closed candle yet."
+)
+
+
+def next_boundary(interval, now):
+    """
+    Return the wall clock time the current candle of an interval closes.
+
+    Args:
+        interval (str): Candle interval (e.g., "1hour").
+        now (float): Current Unix time.
+
+    Returns:
+        float: Unix time of the next candle open, after `now`.
+    """
+    period = INTERVAL_SECONDS[interval]
+    origin = INTERVAL_ORIGINS.get(interval, 0)
+    return ((now - origin) // period + 1) * period + origin
+
+
+def spread_offset(symbol, spread):
+    """
+    Return a symbol's fixed delay within the spread window.
+
+    The delay is derived from a hash of the symbol, so it is stable across restarts
+    and processes and symbols are spread evenly over the window.
+
+    Args:
+        symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+        spread (float): Width of the window in seconds.
+
+    Returns:
+        float: Delay in seconds, in [0, spread).
+    """
+    return zlib.crc32(symbol.encode()) / 2 ** 32 * spread
+
+
+class CandleScheduler:
+    """
+    Runs a SignalMonitor's passes at candle boundaries instead of a fixed period.
+
+    Every symbol has its own due time on the monotonic clock: the close of its current
+    base interval candle, plus `close_delay` for the exchange to publish it and a fixed
+    per-symbol offset within `spread` so requests do not burst at the boundary. Coarser
+    timeframes close on base interval boundaries too, so these due times cover them.
+    With `check_interval` set, symbols are also checked that often within a candle.
+
+    Due times are recomputed from the wall clock boundaries after every pass, so a
+    slow pass does not shift the schedule. Symbols due within `coalesce` seconds of
+    each other share one pass and its batched quote request. A symbol whose closed
+    candle is not published yet is retried every `retry_delay` seconds, at most
+    `max_retries` times.
+    """
+
+    def __init__(self, monitor, close_delay=2.0, check_interval=0.0, spread=5.0, coalesce=0.5, retry_delay=2.0,
+                 max_retries=5, clock=time.monotonic, wall_clock=time.time):
+        """
+        Initialize the CandleScheduler.
+
+        Args:
+            monitor (SignalMonitor): Monitor whose symbols are updated.
+            close_delay (float): Seconds after a candle boundary before its symbols are fetched.
+            check_interval (float): Seconds between checks within a candle; 0 only checks at close.
+            spread (float): Window in seconds the symbols' passes are spread over.
+            coalesce (float): Symbols due within this many seconds run in one pass.
+            retry_delay (float): Seconds before re-fetching a symbol whose closed candle is missing.
+            max_retries (int): Retries per candle close.
+            clock (callable): Monotonic clock the due times are kept on.
+            wall_clock (callable): Unix time clock candle boundaries are computed from.
+        """
+        self.monitor = monitor
+        self.close_delay = float(close_delay)
+        self.check_interval = float(check_interval)
+        self.spread = float(spread)
+        self.coalesce = float(coalesce)
+        self.retry_delay = float(retry_delay)
+        self.max_retries = int(max_retries)
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.bot = None
+        self._due = {}  # symbol -> (monotonic due time, candle open time expected by then, retries)
+        self._heap = []  # (due time, symbol); entries not matching _due are stale
+        self._wake = asyncio.Event()
+        self._task = None
+        self._reschedule = False
+
+    @classmethod
+    def from_config(cls, monitor):
+        """
+        Create a scheduler from the `schedule.*` settings of the monitor's configuration.
+
+        Args:
+            monitor (SignalMonitor): Monitor whose symbols are updated.
+
+        Returns:
+            CandleScheduler: The configured scheduler.
+        """
+        scheduler = cls(monitor)
+        scheduler.configure()
+        return scheduler
+
+    def configure(self):
+        """
+        Read the `schedule.*` settings from the monitor's configuration.
+
+        Returns:
+            None
+        """
+        config_manager = self.monitor.config_manager
+        self.close_delay = float(config_manager.get("schedule.close_delay", 2))
+        self.check_interval = float(config_manager.get("schedule.check_interval", 0))
+        self.spread = float(config_manager.get("schedule.spread", 5))
+        self.coalesce = float(config_manager.get("schedule.coalesce", 0.5))
+        self.retry_delay = float(config_manager.get("schedule.retry_delay", 2))
+        self.max_retries = int(config_manager.get("schedule.max_retries", 5))
+
+    def on_config_change(self, changed):
+        """
+        Configuration subscriber: reschedule every symbol with the new settings.
+
+        The due times are recomputed at the start of the next pass, once the monitor has
+        applied the change (e.g., a new base interval).
+
+        Args:
+            changed (set): Dotted keys that changed.
+
+        Returns:
+            None
+        """
+        self.monitor.on_config_change(changed)
+        self.configure()
+        self._reschedule = True
+        self.wake()
+
+    def wake(self):
+        """
+        Interrupt the wait for the next due symbol, e.g., after the symbols changed.
+
+        Returns:
+            None
+        """
+        self._wake.set()
+
+    def next_due(self, symbol, now, wall_now):
+        """
+        Compute when a symbol is next due.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+            now (float): Current monotonic time.
+            wall_now (float): Current Unix time.
+
+        Returns:
+            tuple: (monotonic due time, open time of the candle expected by then, or None
+            for a check within the candle).
+        """
+        offset = self.close_delay + spread_offset(symbol, self.spread)
+        # Shift by the offset so a symbol still waiting for its delayed close is not skipped
+        boundary = next_boundary(self.monitor.base_interval, wall_now - offset)
+        due, expected = boundary + offset, boundary
+        if self.check_interval > 0:
+            opened = boundary - INTERVAL_SECONDS[self.monitor.base_interval]
+            check = opened + ((wall_now - offset - opened) // self.check_interval + 1) * self.check_interval + offset
+            if check < due:
+                due, expected = check, None
+        return now + (due - wall_now), expected
+
+    def schedule(self, symbol, due, expected, retries=0):
+        self._due[symbol] = (due, expected, retries)
+        heapq.heappush(self._heap, (due, symbol))
+
+    def reschedule(self):
+        """
+        Recompute the due time of every scheduled symbol with the current settings.
+
+        Symbols that are already due or waiting to retry a missing candle keep their slot.
+
+        Returns:
+            None
+        """
+        now, wall_now = self.clock(), self.wall_clock()
+        for symbol, (due, _, retries) in list(self._due.items()):
+            if due > now and not retries:
+                self.schedule(symbol, *self.next_due(symbol, now, wall_now))
+
+    def sync_symbols(self):
+        """
+        Schedule newly monitored symbols and forget removed ones.
+
+        Returns:
+            None
+        """
+        now = self.clock()
+        symbols = set(self.monitor.symbols)
+        for symbol in [symbol for symbol in self._due if symbol not in symbols]:
+            del self._due[symbol]
+        for symbol in self.monitor.symbols:
+            if symbol not in self._due:
+                # New symbols are fetched right away to warm up, then follow the schedule
+                self.schedule(symbol, now, None)
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._heap = [(due, symbol) for symbol, (due, _, _) in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def due_symbols(self, now):
+        """
+        Pop the symbols due by `now` plus the coalescing window.
+
+        Args:
+            now (float): Current monotonic time.
+
+        Returns:
+            list: Symbols to update in this pass.
+        """
+        symbols = []
+        while self._heap and self._heap[0][0] <= now + self.coalesce:
+            due, symbol = heapq.heappop(self._heap)
+            if symbol in self._due and self._due[symbol][0] == due and symbol not in symbols:
+                symbols.append(symbol)
+        return symbols
+
+    def next_wakeup(self):
+        """
+        Return the earliest due time, dropping stale heap entries.
+
+        Returns:
+            float: Monotonic time of the next pass, or None when nothing is scheduled.
+        """
+        while self._heap:
+            due, symbol = self._heap[0]
+            if symbol in self._due and self._due[symbol][0] == due:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    async def run_once(self):
+        """
+        Wait for the next due symbols and run one pass over them.
+
+        Returns:
+            list: Symbols updated in the pass.
+        """
+        self.monitor.apply_config()
+        if self._reschedule:
+            self._reschedule = False
+            self.reschedule()
+        self.sync_symbols()
+        wakeup = self.next_wakeup()
+        delay = None if wakeup is None else wakeup - self.clock()
+        if delay is None or delay > 0:
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                return []
+            except asyncio.TimeoutError:
+                pass
+
+        now = self.clock()
+        symbols = self.due_symbols(now)
+        if not symbols:
+            return []
+        SCHEDULE_LAG.set(max(0.0, now - min(self._due[symbol][0] for symbol in symbols)))
+        expected = {symbol: self._due[symbol][1:] for symbol in symbols}
+        try:
+            await self.monitor.run_symbols(symbols, self.bot)
+        except Exception as e:
+            logging.error(f"Signal pass failed: {e}")
+
+        now, wall_now = self.clock(), self.wall_clock()
+        for symbol in symbols:
+            if symbol not in self._due:
+                continue
+            opened, retries = expected[symbol]
+            newest = self.monitor.newest_candle(symbol)
+            if opened is not None and (newest is None or newest[0] < opened) and retries < self.max_retries:
+                # The exchange has not published the new candle yet
+                SCHEDULE_RETRIES.inc()
+                self.schedule(symbol, now + self.retry_delay, opened, retries + 1)
+            else:
+                self.schedule(symbol, *self.next_due(symbol, now, wall_now))
+        return symbols
+
+    async def run(self):
+        """
+        Run passes until cancelled.
+
+        Returns:
+            None
+        """
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Scheduler error: {e}")
+                await asyncio.sleep(self.retry_delay)
+
+    def start(self, bot=None):
+        """
+        Start the scheduling task on the running event loop.
+
+        Args:
+            bot (telegram.Bot, optional): Bot used when the monitor has no outbox.
+
+        Returns:
+            None
+        """
+        self.bot = bot
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+        logging.info(f"Signal monitoring scheduled at {self.monitor.base_interval} candle closes: {self!r}")
+
+    async def stop(self):
+        """
+        Stop the scheduling task.
+
+        Returns:
+            None
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def __repr__(self):
+        return (f"<CandleScheduler(symbols={len(self._due)}, close_delay={self.close_delay}, "
+                f"check_interval={self.check_interval}, spread={self.spread})>")
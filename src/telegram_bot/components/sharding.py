@@ -0,0 +1,627 @@
+import argparse
+import asyncio
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from multiprocessing.managers import BaseManager
+
+from telegram import Bot
+
+from telegram_bot.components.http_client import get_http_client
+from telegram_bot.components.message_queue import MessageQueue, message_queue_settings
+from telegram_bot.components.metrics import configure_metrics
+from telegram_bot.components.monitor import SignalMonitor
+from telegram_bot.components.scheduler import CandleScheduler
+from telegram_bot.components.signal_store import get_signal_store
+from telegram_bot.components.utils import is_loopback
+from telegram_bot.config.configuration import get_configuration_manager
+
+# Published in earlier config.yaml files; never accepted on an address other nodes can reach
+DEFAULT_AUTHKEY = b"telegram-bot"
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping symbols to workers.
+
+    Every worker owns `replicas` points on the ring and a symbol belongs to the first point
+    at or after its hash, so adding or removing one of N workers moves only about 1/N of
+    the symbols.
+    """
+
+    def __init__(self, nodes=(), replicas=128):
+        """
+        Initialize the HashRing.
+
+        Args:
+            nodes (iterable): Worker ids to place on the ring.
+            replicas (int): Ring points per worker; more points give a more even split.
+        """
+        self.replicas = int(replicas)
+        self.nodes = set()
+        self._points = []  # sorted point hashes
+        self._owners = []  # worker id of each point
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(key):
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+    def add(self, node):
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for replica in range(self.replicas):
+            point = self._hash(f"{node}#{replica}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node):
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        kept = [(point, owner) for point, owner in zip(self._points, self._owners) if owner != node]
+        self._points = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    def node(self, key):
+        """
+        Return the worker owning a key.
+
+        Args:
+            key (str): Symbol to place (e.g., "BTCUSDT").
+
+        Returns:
+            str: Worker id, or None if the ring is empty.
+        """
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, self._hash(key)) % len(self._points)
+        return self._owners[index]
+
+    def assign(self, keys):
+        """
+        Split keys into per-worker shards.
+
+        Args:
+            keys (list): Symbols to distribute.
+
+        Returns:
+            dict: Mapping of every worker id to its list of symbols.
+        """
+        shards = {node: [] for node in self.nodes}
+        for key in keys:
+            owner = self.node(key)
+            if owner is not None:
+                shards[owner].append(key)
+        return shards
+
+    def __repr__(self):
+        return f"<HashRing(nodes={len(self.nodes)}, replicas={self.replicas})>"
+
+
+class ShardRegistry:
+    """
+    Worker heartbeats and the current shard assignment.
+
+    Heartbeats are timestamped with the registry's own clock, so workers on other nodes
+    need no clock synchronisation.
+    """
+
+    def __init__(self):
+        self._heartbeats = {}  # worker id -> monotonic time of its last heartbeat
+        self._shards = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def heartbeat(self, worker_id):
+        with self._lock:
+            self._heartbeats[worker_id] = time.monotonic()
+
+    def leave(self, worker_id):
+        with self._lock:
+            self._heartbeats.pop(worker_id, None)
+
+    def live_workers(self, timeout):
+        """
+        Return the workers that sent a heartbeat within `timeout` seconds.
+
+        Args:
+            timeout (float): Seconds without a heartbeat after which a worker is dead.
+
+        Returns:
+            list: Sorted worker ids.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return sorted(worker for worker, seen in self._heartbeats.items() if now - seen <= timeout)
+
+    def publish(self, shards):
+        """
+        Replace the assignment.
+
+        Args:
+            shards (dict): Mapping of worker id to its list of symbols.
+
+        Returns:
+            int: The new assignment version.
+        """
+        with self._lock:
+            self._shards = {worker: list(symbols) for worker, symbols in shards.items()}
+            self._version += 1
+            return self._version
+
+    def shard(self, worker_id):
+        """
+        Return a worker's symbols.
+
+        Args:
+            worker_id (str): Worker id.
+
+        Returns:
+            tuple: (assignment version, list of symbols).
+        """
+        with self._lock:
+            return self._version, list(self._shards.get(worker_id, []))
+
+
+class _RegistryClient(BaseManager):
+    pass
+
+
+_RegistryClient.register("registry")
+
+
+class ShardBroker:
+    """
+    Serves a `ShardRegistry` over TCP so worker processes, on this node or others, can join.
+
+    This is also the local stand-in broker used to exercise multi-node setups on one machine.
+    """
+
+    def __init__(self, address=("127.0.0.1", 0), authkey=None, registry=None):
+        """
+        Initialize the ShardBroker.
+
+        Args:
+            address (tuple): (host, port) to listen on; port 0 picks a free port.
+            authkey (bytes, optional): Shared secret workers must present. A random key,
+                handed to local workers only, when omitted.
+            registry (ShardRegistry, optional): Registry to serve; a new one by default.
+
+        Raises:
+            ValueError: If the broker would listen on a non-loopback address without a secret
+                of its own: the connection exchanges pickles, so the key is all that stands
+                between the network and code execution.
+        """
+        if not authkey:
+            if not is_loopback(address[0]):
+                raise ValueError(f"sharding.authkey must be set to listen on {address[0]}")
+            authkey = os.urandom(32)
+        elif authkey == DEFAULT_AUTHKEY and not is_loopback(address[0]):
+            raise ValueError(f"Refusing to listen on {address[0]} with the default sharding.authkey; set your own")
+        self.registry = registry or ShardRegistry()
+        self.authkey = authkey
+        registry = self.registry
+
+        class _RegistryServer(BaseManager):
+            pass
+
+        _RegistryServer.register("registry", callable=lambda: registry)
+        self._server = _RegistryServer(address=address, authkey=authkey).get_server()
+        self.address = self._server.address
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="shard-broker", daemon=True)
+            self._thread.start()
+            logging.info(f"Shard broker listening on {self.address[0]}:{self.address[1]}")
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.stop_event.set()
+            self._thread.join(timeout=5)
+            self._server.listener.close()
+            self._thread = None
+
+    def __repr__(self):
+        return f"<ShardBroker(address={self.address})>"
+
+
+def connect_registry(address, authkey, timeout=30):
+    """
+    Connect to a running `ShardBroker`, retrying until it accepts connections.
+
+    Args:
+        address (tuple): (host, port) of the broker.
+        authkey (bytes): Shared secret of the broker.
+        timeout (float): Seconds to keep retrying.
+
+    Returns:
+        ShardRegistry: Proxy of the broker's registry.
+
+    Raises:
+        ConnectionError: If the broker could not be reached in time.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        client = _RegistryClient(address=tuple(address), authkey=authkey)
+        try:
+            client.connect()
+            return client.registry()
+        except (ConnectionError, OSError) as e:
+            if time.monotonic() >= deadline:
+                raise ConnectionError(f"Shard broker {address[0]}:{address[1]} unreachable: {e}")
+            time.sleep(0.5)
+
+
+class ShardCoordinator:
+    """
+    Splits `bot.symbols` across worker processes with a consistent hash ring.
+
+    The coordinator hosts the broker, starts the local workers and restarts them if they
+    exit. Whenever the set of workers with a recent heartbeat changes (a worker joined,
+    died or left, on any node) the ring is rebuilt and the new assignment published;
+    workers read their shard at the start of every cycle.
+    """
+
+    def __init__(self, symbols, workers=4, address=("127.0.0.1", 0), authkey=None,
+                 heartbeat_interval=5, heartbeat_timeout=15, replicas=128, config_file_path="config/config.yaml",
+                 metrics_port=9108):
+        """
+        Initialize the ShardCoordinator.
+
+        Args:
+            symbols (list): Cryptocurrency pair symbols to distribute.
+            workers (int): Worker processes started on this node.
+            address (tuple): (host, port) the broker listens on.
+            authkey (bytes, optional): Shared secret of the broker; see `ShardBroker`.
+            heartbeat_interval (float): Seconds between heartbeats and assignment checks.
+            heartbeat_timeout (float): Seconds without a heartbeat after which a worker is dead.
+            replicas (int): Ring points per worker.
+            config_file_path (str): Configuration file the workers load.
+            metrics_port (int): Base metrics port; local worker i serves /metrics on `metrics_port + 1 + i`.
+        """
+        self.symbols = list(symbols)
+        self.workers = int(workers)
+        self.heartbeat_interval = float(heartbeat_interval)
+        self.heartbeat_timeout = float(heartbeat_timeout)
+        self.replicas = int(replicas)
+        self.config_file_path = config_file_path
+        self.config_manager = None
+        self.metrics_port = int(metrics_port)
+        self.broker = ShardBroker(address, authkey)
+        self.registry = self.broker.registry
+        self.shards = {}
+        self._live = None
+        self._processes = {}
+        self._stopping = threading.Event()
+        self._supervisor = None
+
+    @classmethod
+    def from_config(cls, config_manager, **overrides):
+        """
+        Build a coordinator from the `sharding.*` settings.
+
+        Args:
+            config_manager (ConfigurationManager): The configuration manager to load settings from.
+            **overrides: Constructor arguments taking precedence over the configuration.
+
+        Returns:
+            ShardCoordinator: The configured coordinator.
+        """
+        settings = {
+            "workers": config_manager.get("sharding.workers", 4),
+            "address": parse_address(config_manager.get("sharding.address", "127.0.0.1:50055")),
+            "authkey": sharding_authkey(config_manager),
+            "heartbeat_interval": config_manager.get("sharding.heartbeat_interval", 5),
+            "heartbeat_timeout": config_manager.get("sharding.heartbeat_timeout", 15),
+            "replicas": config_manager.get("sharding.replicas", 128),
+            "config_file_path": config_manager.config_file_path,
+            "metrics_port": config_manager.get("metrics.port", 9108),
+        }
+        settings.update({name: value for name, value in overrides.items() if value is not None})
+        coordinator = cls(config_manager.get("bot.symbols", []), **settings)
+        coordinator.config_manager = config_manager
+        config_manager.subscribe(coordinator.on_config_change, "bot.symbols")
+        return coordinator
+
+    def start(self):
+        """
+        Start the broker, the local workers and the supervisor thread.
+
+        Returns:
+            None
+        """
+        self.broker.start()
+        for index in range(self.workers):
+            self._spawn(f"worker-{index}", index)
+        self._supervisor = threading.Thread(target=self._supervise, name="shard-coordinator", daemon=True)
+        self._supervisor.start()
+        logging.info(f"Sharded monitoring of {len(self.symbols)} symbols across {self.workers} local workers")
+
+    def stop(self, timeout=15):
+        """
+        Stop the workers, letting them drain their outbound queues, then the broker.
+
+        Args:
+            timeout (float): Seconds to wait for each worker before terminating it.
+
+        Returns:
+            None
+        """
+        self._stopping.set()
+        if self._supervisor is not None:
+            self._supervisor.join()
+        for process, _ in self._processes.values():
+            if process.is_alive():
+                process.terminate()  # SIGTERM: the worker finishes its cleanup and exits
+        for process, _ in self._processes.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.kill()
+        self.broker.stop()
+
+    def set_symbols(self, symbols):
+        """
+        Replace the symbols to distribute; the new assignment is published within one
+        heartbeat interval.
+
+        Args:
+            symbols (list): Cryptocurrency pair symbols.
+
+        Returns:
+            None
+        """
+        self.symbols = list(symbols)
+        self._live = None  # force a rebalance
+
+    def on_config_change(self, changed):
+        """
+        Configuration subscriber for `bot.symbols`.
+        """
+        self.set_symbols(self.config_manager.get("bot.symbols", []))
+
+    def rebalance(self):
+        """
+        Publish a new assignment if the set of live workers changed.
+
+        Returns:
+            bool: True if a new assignment was published.
+        """
+        live = self.registry.live_workers(self.heartbeat_timeout)
+        if live == self._live:
+            return False
+        shards = HashRing(live, self.replicas).assign(self.symbols)
+        previous = {symbol: worker for worker, symbols in self.shards.items() for symbol in symbols}
+        moved = sum(previous.get(symbol) != worker for worker, symbols in shards.items() for symbol in symbols)
+        version = self.registry.publish(shards)
+        self._live, self.shards = live, shards
+        logging.info(f"Shard assignment v{version}: {len(live)} live workers, {moved} of {len(self.symbols)} symbols moved")
+        return True
+
+    def _supervise(self):
+        while True:
+            self.rebalance()
+            if self._stopping.wait(self.heartbeat_interval):
+                return
+            for worker_id, (process, index) in list(self._processes.items()):
+                if not process.is_alive():
+                    logging.warning(f"Shard {worker_id} exited with code {process.exitcode}; restarting it")
+                    self._spawn(worker_id, index)
+
+    def _spawn(self, worker_id, index):
+        process = multiprocessing.get_context("spawn").Process(
+            target=run_worker,
+            args=(worker_id, self.broker.address, self.broker.authkey, self.config_file_path,
+                  self.metrics_port + 1 + index),
+            name=worker_id,
+            daemon=True,
+        )
+        process.start()
+        self._processes[worker_id] = (process, index)
+
+    def __repr__(self):
+        return f"<ShardCoordinator(symbols={len(self.symbols)}, workers={self.workers}, live={self._live})>"
+
+
+def parse_address(address):
+    """
+    Parse a "host:port" broker address.
+
+    Args:
+        address (str): Address such as "127.0.0.1:50055".
+
+    Returns:
+        tuple: (host, port).
+    """
+    host, _, port = str(address).rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def sharding_authkey(config_manager):
+    """
+    Read the broker secret from `sharding.authkey`, or the SHARDING_AUTHKEY environment variable.
+
+    Args:
+        config_manager (ConfigurationManager): The configuration manager to load settings from.
+
+    Returns:
+        bytes: The secret, or None if it is not set.
+    """
+    authkey = config_manager.get("sharding.authkey")
+    return str(authkey).encode() if authkey else None
+
+
+def run_worker(worker_id, address, authkey, config_file_path="config/config.yaml", metrics_port=None):
+    """
+    Worker process entry point: monitor the shard assigned to `worker_id` until stopped.
+
+    Args:
+        worker_id (str): Worker id, unique across all nodes.
+        address (tuple): (host, port) of the broker.
+        authkey (bytes): Shared secret of the broker.
+        config_file_path (str): Configuration file to load.
+        metrics_port (int, optional): Port of the worker's own /metrics endpoint.
+
+    Returns:
+        None
+    """
+    logging.basicConfig(level=logging.INFO, format=f"[%(asctime)s] %(levelname)s [{worker_id}]: %(message)s")
+    config_manager = get_configuration_manager(config_file_path)
+    get_http_client(config_manager)
+    get_signal_store(config_manager)
+    configure_metrics(config_manager, port=metrics_port)
+    registry = connect_registry(address, authkey)
+    # Turn SIGTERM into a clean shutdown so queued signals are delivered
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        asyncio.run(_worker_loop(worker_id, registry, config_manager))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logging.info("Worker stopped.")
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+async def _worker_loop(worker_id, registry, config_manager):
+    """
+    Heartbeat in the background and monitor the current shard at candle closes, or every
+    `bot.monitoring_interval` seconds with `schedule.mode: fixed`, picking up configuration
+    changes between cycles.
+    """
+    heartbeat_interval = float(config_manager.get("sharding.heartbeat_interval", 5))
+    workers = max(1, int(config_manager.get("sharding.workers", 4)))
+
+    stopped = threading.Event()
+
+    def heartbeat():
+        while not stopped.is_set():
+            try:
+                registry.heartbeat(worker_id)
+            except Exception as e:
+                logging.error(f"Heartbeat failed: {e}")
+            stopped.wait(heartbeat_interval)
+
+    threading.Thread(target=heartbeat, name="heartbeat", daemon=True).start()
+
+    # Workers share the Telegram rate limits
+    settings = message_queue_settings(config_manager)
+    settings["global_rate"] = float(settings["global_rate"]) / workers
+    settings["chat_rate"] = float(settings["chat_rate"]) / workers
+    bot = Bot(config_manager.get("bot.token"))
+    outbox = MessageQueue(bot, **settings)
+    outbox.start()
+    monitor = SignalMonitor(config_manager, outbox=outbox, symbols=[], snapshot_suffix=worker_id)
+    scheduler = None
+    if config_manager.get("schedule.mode", "candle") == "candle":
+        scheduler = CandleScheduler.from_config(monitor)
+        config_manager.subscribe(scheduler.on_config_change, "bot", "monitor", "signals", "prices", "indicators", "schedule")
+        scheduler.start()
+    else:
+        config_manager.subscribe(monitor.on_config_change, "bot", "monitor", "signals", "prices", "indicators")
+
+    version = 0
+    next_run = time.monotonic()
+    try:
+        while True:
+            config_manager.check_for_changes()
+            shard_version, shard = await asyncio.to_thread(registry.shard, worker_id)
+            if shard_version != version:
+                logging.info(f"Monitoring {len(shard)} symbols (assignment v{shard_version})")
+                version = shard_version
+                monitor.set_symbols(shard)
+                if scheduler is not None:
+                    scheduler.wake()
+            if scheduler is not None:
+                # The scheduler runs the passes; this loop only follows the assignment
+                next_run += heartbeat_interval
+            else:
+                if monitor.symbols:
+                    try:
+                        await monitor.run_cycle(None)
+                    except Exception as e:
+                        logging.error(f"Signal cycle failed: {e}")
+                next_run += monitor.monitoring_interval
+            await asyncio.sleep(max(0.0, next_run - time.monotonic()))
+    finally:
+        stopped.set()
+        if scheduler is not None:
+            await scheduler.stop()
+        try:
+            registry.leave(worker_id)
+        except Exception:
+            pass
+        await outbox.stop()
+        await monitor.close()
+        monitor.signal_store.close()
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    `coordinator` hosts the broker and runs local workers without the bot's command
+    handling; `worker` joins workers on another node to a running broker.
+    """
+    parser = argparse.ArgumentParser(description="Run sharded signal monitoring.")
+    parser.add_argument("role", choices=["coordinator", "worker"])
+    parser.add_argument("--config", default="config/config.yaml", help="Configuration file")
+    parser.add_argument("--address", help="Broker host:port (default: sharding.address)")
+    parser.add_argument("--workers", type=int, help="Local worker processes (default: sharding.workers)")
+    parser.add_argument("--node", default="node", help="Prefix of the worker ids started by `worker`")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s: %(message)s")
+    config_manager = get_configuration_manager(args.config)
+    address = parse_address(args.address or config_manager.get("sharding.address", "127.0.0.1:50055"))
+    authkey = sharding_authkey(config_manager)
+    workers = args.workers if args.workers is not None else int(config_manager.get("sharding.workers", 4))
+
+    if args.role == "coordinator":
+        coordinator = ShardCoordinator.from_config(config_manager, address=address, workers=workers)
+        coordinator.start()
+        reload_interval = float(config_manager.get("reload.interval", 5))
+        if reload_interval > 0:
+            config_manager.watch(reload_interval)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            coordinator.stop()
+        return
+
+    if authkey is None:
+        parser.error("set sharding.authkey or SHARDING_AUTHKEY to the coordinator's secret to join its broker")
+    context = multiprocessing.get_context("spawn")
+    metrics_port = int(config_manager.get("metrics.port", 9108))
+    processes = [
+        context.Process(
+            target=run_worker,
+            args=(f"{args.node}-{index}", address, authkey, config_manager.config_file_path, metrics_port + 1 + index),
+        )
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
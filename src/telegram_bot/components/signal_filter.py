@@ -0,0 +1,274 @@
+import functools
+
+import numpy as np
+
+from telegram_bot.components.metrics import instrumented
+from telegram_bot.components.utils import (
+    ALPHA1,
+    K1,
+    K2,
+    TRIGGER,
+    highpass_coefficients,
+    highpass_filter,
+    quotient,
+    signal_cross,
+)
+
+
+class StreamingSignal:
+    """
+    Incremental high-pass filter and signal state for one symbol.
+
+    The filter keeps the IIR state (the last three closes and filter outputs), so each
+    new candle costs O(1) instead of refiltering the whole series. Feeding a series
+    sample by sample yields exactly the values `highpass_filter` computes for it.
+
+    `update` reports the filter over the window it is given, as `highpass_filter(window)`
+    would: the filter is linear, so the windowed output is the running output minus the
+    running state at the window start carried forward by a precomputed transition
+    power. Signals therefore match a batch evaluation of the same window and do not
+    depend on how long the process has been running.
+    """
+
+    def __init__(self, alpha1=ALPHA1, k1=K1, k2=K2, trigger=TRIGGER):
+        """
+        Initialize the StreamingSignal.
+
+        Args:
+            alpha1 (float): Filter coefficient.
+            k1 (float): Quotient constant 1.
+            k2 (float): Quotient constant 2.
+            trigger (float): Buy/sell threshold for q1.
+        """
+        self.alpha1 = alpha1
+        self.k1 = k1
+        self.k2 = k2
+        self.trigger = trigger
+        self._a, self._b, self._c = highpass_coefficients(alpha1)
+        self.reset()
+
+    def reset(self):
+        """
+        Forget all filter state.
+
+        Returns:
+            None
+        """
+        self.count = 0
+        self.timestamp = None
+        self._close = [0.0, 0.0, 0.0]  # close[n-1], close[n-2], close[n-3]
+        self._hp = [0.0, 0.0, 0.0]  # hp[n-1], hp[n-2], hp[n-3]
+        self._history = {}  # open time -> running filter output, for the candles of the last window
+        self._window_hp = None  # filter output over the last `update` window
+
+    @property
+    def hp(self):
+        """float: Latest filter output; over the last window after `update`."""
+        return self._hp[0] if self._window_hp is None else self._window_hp
+
+    @property
+    def quotients(self):
+        """tuple: Latest quotient values (q1, q2)."""
+        x = self.hp
+        return (x + self.k1) / (self.k1 * x + 1), (x + self.k2) / (self.k2 * x + 1)
+
+    @property
+    def signals(self):
+        """tuple: Latest (buy, sell) signal state."""
+        q1 = self.quotients[0]
+        return q1 < self.trigger, q1 > self.trigger
+
+    def warm_up(self, close, timestamp=None):
+        """
+        Rebuild the state from a full close series with the vectorized batch filter.
+
+        Args:
+            close (np.ndarray): Array of closing prices.
+            timestamp (float, optional): Open time of the last candle in the series.
+
+        Returns:
+            np.ndarray: Filtered data for the whole series.
+        """
+        hp = highpass_filter(close, self.alpha1)
+        count = len(hp)
+        self.reset()
+        self.count = count
+        self.timestamp = timestamp
+        for lag in range(min(count, 3)):
+            self._close[lag] = float(close[count - 1 - lag])
+            self._hp[lag] = float(hp[count - 1 - lag])
+        return hp
+
+    def push(self, close, timestamp=None):
+        """
+        Append one closing price.
+
+        Args:
+            close (float): Closing price of the new candle.
+            timestamp (float, optional): Open time of the new candle.
+
+        Returns:
+            float: Filter output for the new candle.
+        """
+        close = float(close)
+        hp0 = 0.0
+        if self.count >= 2:
+            hp0 = self._step(close, self._close[0], self._close[1], self._hp[0], self._hp[1])
+        self._close = [close, self._close[0], self._close[1]]
+        self._hp = [hp0, self._hp[0], self._hp[1]]
+        self._window_hp = None
+        self.count += 1
+        self.timestamp = timestamp
+        return hp0
+
+    def revise(self, close):
+        """
+        Replace the closing price of the latest, still-forming candle.
+
+        Args:
+            close (float): Updated closing price.
+
+        Returns:
+            float: Recomputed filter output for the latest candle.
+        """
+        close = float(close)
+        if self.count >= 3:
+            self._hp[0] = self._step(close, self._close[1], self._close[2], self._hp[1], self._hp[2])
+        self._close[0] = close
+        self._window_hp = None
+        return self._hp[0]
+
+    @instrumented("streaming_signal_update")
+    def update(self, candles):
+        """
+        Feed a window of candles, processing only what changed since the last call.
+
+        The candle with the stored timestamp is revised in place and newer candles are
+        pushed. A cold state, or a window whose candles are not the ones the state has
+        seen (e.g., it reaches further back or gained a backfilled candle), falls back to
+        a batch warm-up over the window.
+
+        Args:
+            candles (np.ndarray): Candle data (time, close price, volume), oldest first.
+
+        Returns:
+            tuple: Latest (buy, sell) signal state; (False, False) for a window without
+            candles, which leaves the state untouched.
+        """
+        times = candles[:, 0]
+        close = candles[:, 1]
+        if not len(times):
+            return False, False
+        history = self._history
+        if self.timestamp is not None and times[0] in history:
+            for i in range(int(np.searchsorted(times, self.timestamp)), len(times)):
+                if times[i] == self.timestamp:
+                    history[times[i]] = self.revise(close[i])
+                elif times[i] > self.timestamp:
+                    history[times[i]] = self.push(close[i], times[i])
+            while next(iter(history)) < times[0]:
+                del history[next(iter(history))]
+        if self.timestamp is None or len(history) != len(times) or times[0] not in history:
+            hp = self.warm_up(close, times[-1])
+            self._history = history = dict(zip(times.tolist(), hp.tolist()))
+
+        if len(times) < 2:
+            self._window_hp = 0.0
+        else:
+            # Remove the response to the state the window starts from
+            p0, p1 = _transition_power(self._b, self._c, len(times) - 2)
+            self._window_hp = self._hp[0] - (p0 * history[times[1]] + p1 * history[times[0]])
+        return self.signals
+
+    def _step(self, close0, close1, close2, hp1, hp2):
+        """
+        Evaluate one step of the filter recursion, grouped as in `highpass_filter`.
+        """
+        return self._a * (close0 - 2 * close1 + close2) + self._b * hp1 - self._c * hp2
+
+    def __repr__(self):
+        return f"<StreamingSignal(alpha1={self.alpha1}, k1={self.k1}, k2={self.k2}, count={self.count})>"
+
+
+@functools.lru_cache(maxsize=64)
+def _transition_power(b, c, steps):
+    """
+    Return the first row of the filter's homogeneous transition [[b, -c], [1, 0]] to the
+    power `steps`: how (hp[n-1], hp[n-2]) carries into hp[n-1+steps] without input.
+    """
+    power = np.linalg.matrix_power(np.array([[b, -c], [1.0, 0.0]]), steps)
+    return float(power[0, 0]), float(power[0, 1])
+
+
+def highpass_filter_matrix(closes, alpha1=ALPHA1):
+    """
+    Apply the high-pass filter to many close series at once.
+
+    The recursion advances along the time axis with every step vectorized across the
+    symbol axis. Each row matches `highpass_filter` applied to that row bit for bit.
+
+    Args:
+        closes (np.ndarray): (symbols, time) array of closing prices with aligned timestamps.
+        alpha1 (float): Filter coefficient.
+
+    Returns:
+        np.ndarray: (symbols, time) array of filtered data.
+    """
+    closes = np.asarray(closes, dtype=float)
+    hp = np.zeros(closes.shape)
+    if closes.shape[1] < 3:
+        return hp
+
+    a, b, c = highpass_coefficients(alpha1)
+    diff = closes[:, 2:] - 2 * closes[:, 1:-1] + closes[:, :-2]
+    for i in range(2, closes.shape[1]):
+        hp[:, i] = a * diff[:, i - 2] + b * hp[:, i - 1] - c * hp[:, i - 2]
+    return hp
+
+
+@instrumented("evaluate_signal_matrix")
+def evaluate_signal_matrix(closes, alpha1=ALPHA1, k1=K1, k2=K2, trigger=TRIGGER):
+    """
+    Compute the latest buy/sell state of many symbols in one call.
+
+    Args:
+        closes (np.ndarray): (symbols, time) array of closing prices with aligned timestamps.
+        alpha1 (float): Filter coefficient.
+        k1 (float): Quotient constant 1.
+        k2 (float): Quotient constant 2.
+        trigger (float): Buy/sell threshold for q1.
+
+    Returns:
+        tuple: Boolean arrays (buy, sell) with one entry per symbol.
+    """
+    hp = highpass_filter_matrix(closes, alpha1)[:, -1]
+    q1, q2 = quotient(hp, k1, k2)
+    return signal_cross(q1, trigger)
+
+
+def stack_closes(windows, length):
+    """
+    Stack the last `length` closes of several candle windows into one matrix.
+
+    Windows are aligned on their newest candle; a window is usable only if it holds at
+    least `length` candles and its newest candle opened at the most common latest time.
+
+    Args:
+        windows (list): Candle arrays (time, close price, volume), one per symbol.
+        length (int): Number of candles per row.
+
+    Returns:
+        tuple: ((symbols, length) close matrix, boolean array of usable rows).
+    """
+    closes = np.zeros((len(windows), length))
+    latest = np.full(len(windows), np.nan)
+    for row, candles in enumerate(windows):
+        if len(candles) >= length:
+            closes[row] = candles[-length:, 1]
+            latest[row] = candles[-1, 0]
+
+    usable = ~np.isnan(latest)
+    if usable.any():
+        times, counts = np.unique(latest[usable], return_counts=True)
+        usable &= latest == times[np.argmax(counts)]
+    return closes, usable
@@ -0,0 +1,193 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+
+class MemorySignalStore:
+    """
+    In-process signal state store.
+
+    Tracks the side ("buy" or "sell") of the last signal sent for each symbol. State is
+    lost on restart; use `SQLiteSignalStore` to persist it or share it between processes.
+    """
+
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Return every stored state.
+
+        Returns:
+            dict: Mapping of symbol to "buy" or "sell".
+        """
+        with self._lock:
+            return dict(self._states)
+
+    def get(self, symbol):
+        """
+        Return the side of the last signal sent for a symbol.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+
+        Returns:
+            str: "buy", "sell", or None if no signal was sent yet.
+        """
+        with self._lock:
+            return self._states.get(symbol)
+
+    def compare_and_set(self, symbol, expected, side):
+        """
+        Atomically set a symbol's state if it still equals `expected`.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+            expected (str): State the caller based its decision on ("buy", "sell" or None).
+            side (str): New state.
+
+        Returns:
+            bool: True if the state was updated.
+        """
+        return symbol in self.compare_and_set_many([(symbol, expected, side)])
+
+    def compare_and_set_many(self, changes):
+        """
+        Apply several compare-and-set operations as one batch.
+
+        Args:
+            changes (list): (symbol, expected, side) tuples.
+
+        Returns:
+            set: Symbols whose state was updated.
+        """
+        updated = set()
+        with self._lock:
+            for symbol, expected, side in changes:
+                if self._states.get(symbol) == expected:
+                    self._states[symbol] = side
+                    updated.add(symbol)
+        return updated
+
+    def close(self):
+        pass
+
+    def __repr__(self):
+        return f"<MemorySignalStore(symbols={len(self._states)})>"
+
+
+class SQLiteSignalStore(MemorySignalStore):
+    """
+    Crash-safe signal state store backed by an SQLite database in WAL mode.
+
+    Every batch of compare-and-set operations is one immediate transaction, so several
+    monitor processes can share a database file without sending the same signal twice.
+    """
+
+    def __init__(self, path="data/signals.db"):
+        """
+        Initialize the SQLiteSignalStore.
+
+        Args:
+            path (str): Database file path; created if missing.
+        """
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS signal_state (symbol TEXT PRIMARY KEY, side TEXT, updated_at REAL)"
+        )
+
+    def load(self):
+        with self._lock:
+            rows = self._connection.execute("SELECT symbol, side FROM signal_state").fetchall()
+        return dict(rows)
+
+    def get(self, symbol):
+        with self._lock:
+            row = self._connection.execute("SELECT side FROM signal_state WHERE symbol = ?", (symbol,)).fetchone()
+        return row[0] if row else None
+
+    def compare_and_set_many(self, changes):
+        if not changes:
+            return set()
+        updated = set()
+        now = time.time()
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                for symbol, expected, side in changes:
+                    cursor.execute(
+                        "UPDATE signal_state SET side = ?, updated_at = ? WHERE symbol = ? AND side IS ?",
+                        (side, now, symbol, expected),
+                    )
+                    if cursor.rowcount == 0 and expected is None:
+                        cursor.execute(
+                            "INSERT OR IGNORE INTO signal_state (symbol, side, updated_at) VALUES (?, ?, ?)",
+                            (symbol, side, now),
+                        )
+                    if cursor.rowcount == 1:
+                        updated.add(symbol)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+        return updated
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __repr__(self):
+        return f"<SQLiteSignalStore(path={self.path})>"
+
+
+def create_signal_store(config_manager):
+    """
+    Build the signal state store selected by `state.backend`.
+
+    Args:
+        config_manager (ConfigurationManager): The configuration manager to load settings from.
+
+    Returns:
+        MemorySignalStore: The configured store.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    backend = config_manager.get("state.backend", "memory")
+    if backend == "memory":
+        return MemorySignalStore()
+    if backend == "sqlite":
+        return SQLiteSignalStore(config_manager.get("state.path", "data/signals.db"))
+    raise ValueError(f"Unknown signal state backend: {backend}")
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_signal_store(config_manager=None):
+    """
+    Return the process-wide signal state store.
+
+    Args:
+        config_manager (ConfigurationManager, optional): Source of the `state.*` settings,
+            used only when the store is first created.
+
+    Returns:
+        MemorySignalStore: The shared store.
+    """
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = create_signal_store(config_manager) if config_manager is not None else MemorySignalStore()
+            logging.info(f"Signal state store: {_shared_store}")
+        return _shared_store
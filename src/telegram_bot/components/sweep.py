@@ -0,0 +1,334 @@
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from telegram_bot.components.backtest import CandleArchive, resolve_trades, signal_events
+from telegram_bot.components.utils import ALPHA1, K1, K2, TRIGGER
+
+# Columns a sweep needs from the archive
+SWEEP_COLUMNS = ("time", "high", "low", "close")
+
+# Default search space when none is given on the command line
+DEFAULT_GRID = {
+    "alpha1": [0.03, 0.05, ALPHA1, 0.1, 0.15],
+    "k1": [0.3, K1, 0.7, 0.9],
+    "k2": [K2],
+    "trigger": [-0.2, TRIGGER, 0.2],
+}
+
+# Worker-side view of the shared candle blocks, attached once per process
+_worker_blocks = {}
+
+
+class SharedCandles:
+    """
+    Candle columns of several symbols published in shared memory for pool workers.
+
+    Each symbol gets one shared memory block holding its columns back to back. Workers
+    attach to the blocks by name, so candles are never pickled or copied per task.
+    """
+
+    def __init__(self):
+        self._blocks = []
+        self.descriptors = {}  # symbol -> (block name, length)
+
+    def publish(self, symbol, columns):
+        """
+        Copy a symbol's columns into a new shared memory block.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+            columns (dict): Mapping of column name to array; must contain `SWEEP_COLUMNS`.
+
+        Returns:
+            None
+        """
+        length = len(columns["close"])
+        block = shared_memory.SharedMemory(create=True, size=max(1, 8 * length * len(SWEEP_COLUMNS)))
+        self._blocks.append(block)
+        for view, name in zip(_column_views(block.buf, length), SWEEP_COLUMNS):
+            view[:] = columns[name]
+        self.descriptors[symbol] = (block.name, length)
+
+    def close(self):
+        """
+        Release and unlink every published block.
+
+        Returns:
+            None
+        """
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+        self.descriptors = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _column_views(buffer, length):
+    """
+    Build the column arrays of a shared block (time as int64, prices as float64).
+    """
+    views = []
+    for position, name in enumerate(SWEEP_COLUMNS):
+        dtype = np.int64 if name == "time" else np.float64
+        views.append(np.ndarray(length, dtype=dtype, buffer=buffer, offset=8 * length * position))
+    return views
+
+
+def _attach(descriptors):
+    """
+    Pool initializer: attach to the shared candle blocks.
+    """
+    for symbol, (name, length) in descriptors.items():
+        block = shared_memory.SharedMemory(name=name)
+        _worker_blocks[symbol] = (block, dict(zip(SWEEP_COLUMNS, _column_views(block.buf, length))))
+
+
+def _evaluate(task):
+    """
+    Backtest one (symbol, parameters) cell inside a pool worker.
+    """
+    symbol, params, window, take_profit_percentage, stop_loss_percentage = task
+    columns = _worker_blocks[symbol][1]
+    indices, sides = signal_events(columns["close"], window, params["alpha1"], params["k1"], params["trigger"])
+    trades = resolve_trades(columns, indices, sides, take_profit_percentage, stop_loss_percentage)
+    closed = trades["outcome"] != "open"
+    take_profits = int((trades["outcome"] == "tp").sum())
+    return {
+        "signals": len(trades),
+        "take_profits": take_profits,
+        "stop_losses": int((trades["outcome"] == "sl").sum()),
+        "win_rate": take_profits / int(closed.sum()) if closed.any() else 0.0,
+        "total_pnl": float(trades["pnl"].sum()),
+    }
+
+
+def grid_parameters(grid):
+    """
+    Expand a parameter grid into every combination.
+
+    Args:
+        grid (dict): Mapping of parameter name to candidate values.
+
+    Returns:
+        list: Parameter dictionaries.
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def random_parameters(grid, samples, seed=None):
+    """
+    Draw random combinations from a parameter grid without repetition.
+
+    Args:
+        grid (dict): Mapping of parameter name to candidate values.
+        samples (int): Number of combinations to draw.
+        seed (int, optional): Random seed.
+
+    Returns:
+        list: Parameter dictionaries.
+    """
+    combinations = grid_parameters(grid)
+    return random.Random(seed).sample(combinations, min(samples, len(combinations)))
+
+
+class SweepCache:
+    """
+    Results of finished sweep cells, persisted as JSON lines.
+
+    Cells are keyed by symbol, parameters and the exact data range, so reruns over the
+    same candles skip them and runs over extended archives recompute them.
+    """
+
+    def __init__(self, path="data/sweep_cache.jsonl"):
+        """
+        Initialize the SweepCache.
+
+        Args:
+            path (str): Cache file path.
+        """
+        self.path = os.path.abspath(path)
+        self._results = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self._results[entry["key"]] = entry["result"]
+
+    @staticmethod
+    def key(symbol, interval, params, window, take_profit_percentage, stop_loss_percentage, times):
+        """
+        Build the cache key of a cell.
+
+        Args:
+            symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+            interval (str): Candle interval (e.g., "1hour").
+            params (dict): Signal parameters.
+            window (int): Candles filtered per decision.
+            take_profit_percentage (float): Take-profit percentage.
+            stop_loss_percentage (float): Stop-loss percentage.
+            times (np.ndarray): Candle open times of the data range.
+
+        Returns:
+            str: Hex digest identifying the cell.
+        """
+        data_range = (int(times[0]), int(times[-1]), len(times)) if len(times) else (0, 0, 0)
+        parts = [symbol, interval, sorted(params.items()), window, take_profit_percentage, stop_loss_percentage, data_range]
+        return hashlib.sha1(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Return the cached result of a cell, or None.
+        """
+        return self._results.get(key)
+
+    def put(self, key, result):
+        """
+        Store a cell result in memory and append it to the cache file.
+
+        Returns:
+            None
+        """
+        self._results[key] = result
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"key": key, "result": result}) + "\n")
+
+    def __len__(self):
+        return len(self._results)
+
+
+def run_sweep(archive, symbols, interval, parameter_sets, window=50, take_profit_percentage=2,
+              stop_loss_percentage=1, workers=None, cache=None, start=None, end=None):
+    """
+    Backtest every parameter set on every symbol and rank the parameter sets.
+
+    `k2` only shapes `q2`, which no decision reads today, so cells differing only in
+    `k2` are computed once and shared.
+
+    Args:
+        archive (CandleArchive): Source archive.
+        symbols (list): Cryptocurrency pair symbols.
+        interval (str): Candle interval (e.g., "1hour").
+        parameter_sets (list): Parameter dictionaries with alpha1, k1, k2 and trigger.
+        window (int): Candles filtered per decision.
+        take_profit_percentage (float): Take-profit percentage.
+        stop_loss_percentage (float): Stop-loss percentage.
+        workers (int, optional): Process pool size; defaults to the CPU count.
+        cache (SweepCache, optional): Cache of finished cells.
+        start (int, optional): Unix time of the first candle to replay.
+        end (int, optional): Unix time after which candles are ignored.
+
+    Returns:
+        list: One row per parameter set, best total PnL first.
+    """
+    cells = {}  # cache key -> (symbol, decision parameters)
+    cell_keys = {}  # (symbol, parameter set index) -> cache key
+    with SharedCandles() as shared:
+        for symbol in symbols:
+            columns = archive.open(symbol, interval)
+            first = 0 if start is None else int(np.searchsorted(columns["time"], start, side="left"))
+            last = len(columns["time"]) if end is None else int(np.searchsorted(columns["time"], end, side="right"))
+            columns = {name: columns[name][first:last] for name in SWEEP_COLUMNS}
+
+            for index, params in enumerate(parameter_sets):
+                decision_params = {"alpha1": params["alpha1"], "k1": params["k1"], "trigger": params["trigger"]}
+                key = SweepCache.key(symbol, interval, decision_params, window, take_profit_percentage,
+                                     stop_loss_percentage, columns["time"])
+                cell_keys[(symbol, index)] = key
+                if (cache is None or cache.get(key) is None) and key not in cells:
+                    cells[key] = (symbol, decision_params)
+            if any(cell_symbol == symbol for cell_symbol, _ in cells.values()):
+                shared.publish(symbol, columns)
+
+        results = {} if cache is None else {key: cache.get(key) for key in cell_keys.values() if cache.get(key)}
+        logging.info(f"Sweep: {len(cell_keys)} cells, {len(cells)} to compute, {len(cell_keys) - len(cells)} cached or shared")
+        if cells:
+            tasks = [(symbol, params, window, take_profit_percentage, stop_loss_percentage) for symbol, params in cells.values()]
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(shared.descriptors,)) as pool:
+                for key, result in zip(cells, pool.map(_evaluate, tasks, chunksize=max(1, len(tasks) // 64))):
+                    results[key] = result
+                    if cache is not None:
+                        cache.put(key, result)
+
+    table = []
+    for index, params in enumerate(parameter_sets):
+        rows = [results[cell_keys[(symbol, index)]] for symbol in symbols]
+        signals = sum(row["signals"] for row in rows)
+        take_profits = sum(row["take_profits"] for row in rows)
+        closed = take_profits + sum(row["stop_losses"] for row in rows)
+        table.append({
+            **params,
+            "signals": signals,
+            "win_rate": take_profits / closed if closed else 0.0,
+            "total_pnl": sum(row["total_pnl"] for row in rows),
+        })
+    table.sort(key=lambda row: row["total_pnl"], reverse=True)
+    return table
+
+
+def _parse_grid(specs):
+    """
+    Parse command-line overrides like `alpha1=0.05,0.07` into a grid.
+    """
+    grid = {name: list(values) for name, values in DEFAULT_GRID.items()}
+    for spec in specs or []:
+        name, _, values = spec.partition("=")
+        if name not in grid:
+            raise ValueError(f"Unknown sweep parameter: {name}")
+        grid[name] = [float(value) for value in values.split(",")]
+    return grid
+
+
+def main():
+    """
+    Command-line entry point: sweep signal parameters and print the ranked table.
+    """
+    parser = argparse.ArgumentParser(description="Sweep signal parameters over archived candles.")
+    parser.add_argument("symbols", nargs="*", help="Symbols to sweep (default: every archived symbol).")
+    parser.add_argument("--archive", default="data/candles", help="Candle archive directory.")
+    parser.add_argument("--interval", default="1hour", help="Candle interval.")
+    parser.add_argument("--window", type=int, default=50, help="Candles filtered per decision.")
+    parser.add_argument("--grid", nargs="*", help="Parameter values, e.g. alpha1=0.05,0.07 k1=0.5.")
+    parser.add_argument("--random", type=int, help="Sample this many random combinations instead of the full grid.")
+    parser.add_argument("--seed", type=int, help="Seed for --random.")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count).")
+    parser.add_argument("--cache", default="data/sweep_cache.jsonl", help="Result cache file.")
+    parser.add_argument("--top", type=int, default=10, help="Rows to print.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s: %(message)s")
+    archive = CandleArchive(args.archive)
+    grid = _parse_grid(args.grid)
+    parameter_sets = random_parameters(grid, args.random, args.seed) if args.random else grid_parameters(grid)
+    symbols = args.symbols or archive.symbols(args.interval)
+
+    table = run_sweep(archive, symbols, args.interval, parameter_sets, window=args.window,
+                      workers=args.workers, cache=SweepCache(args.cache))
+    print(f"{'rank':>4} {'alpha1':>7} {'k1':>5} {'k2':>5} {'trigger':>7} {'signals':>8} {'win_rate':>8} {'total_pnl':>10}")
+    for rank, row in enumerate(table[:args.top], start=1):
+        print(f"{rank:>4} {row['alpha1']:>7.3f} {row['k1']:>5.2f} {row['k2']:>5.2f} {row['trigger']:>7.2f} "
+              f"{row['signals']:>8} {row['win_rate']:>8.2%} {row['total_pnl']:>10.2f}")
+    if table:
+        best = table[0]
+        print("\n# Best parameters for config.yaml")
+        print(f"signals:\n  alpha1: {best['alpha1']}\n  k1: {best['k1']}\n  k2: {best['k2']}\n  trigger: {best['trigger']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,218 @@
-import requests
+import functools
+import ipaddress
+import logging
+
 import numpy as np
-import telebot
 from decouple import config
-import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
+from telegram_bot.components.http_client import get_http_client
+from telegram_bot.components.klines import OHLCV_FIELDS, decode_kline_response
+from telegram_bot.components.metrics import instrumented
+from telegram_bot.components.signal_store import get_signal_store
+
+# Environment variables, read on first use rather than at import time
+ENV_SETTINGS = {
+    "TOKEN": "TELEGRAM_BOT_TOKEN",  # Telegram bot token
+    "CHAT_ID": "TELEGRAM_CHAT_ID",  # Telegram chat/channel ID
+    "COINMARKETCAP_API_KEY": "COINMARKETCAP_API_KEY",  # CoinMarketCap API key
+}
+
+# Upstream API endpoints
+COINMARKETCAP_QUOTES_URL = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/quotes/latest"
+COINEX_KLINE_URL = "https://api.coinex.com/v1/market/kline"
+TELEGRAM_API_URL = "https://api.telegram.org"
+
+# Environment variables overriding the endpoints, e.g., to point at a replay server
+UPSTREAM_URLS = {
+    "COINMARKETCAP_QUOTES_URL": COINMARKETCAP_QUOTES_URL,
+    "COINEX_KLINE_URL": COINEX_KLINE_URL,
+    "TELEGRAM_API_URL": TELEGRAM_API_URL,
+}
+
+# Signal pipeline parameters
+ALPHA1 = 0.07  # High-pass filter coefficient
+K1, K2 = 0.5, 0.3  # Quotient constants
+TRIGGER = 0  # Buy/sell threshold for q1
+
+# How each entry price source is named in signal messages
+PRICE_SOURCE_LABELS = {"candle": "CoinEx candle close", "quote": "CoinMarketCap quote", "cache": "cached quote"}
+
+
+@functools.lru_cache(maxsize=None)
+def env_setting(name):
+    """
+    Read an environment variable (or `.env` entry) through decouple, once.
 
-# Load environment variables
-TOKEN = config("TELEGRAM_BOT_TOKEN")  # Telegram bot token
-CHAT_ID = config("TELEGRAM_CHAT_ID")  # Telegram chat/channel ID
-COINMARKETCAP_API_KEY = config("COINMARKETCAP_API_KEY")  # CoinMarketCap API key
-bot = telebot.TeleBot(TOKEN)
+    Args:
+        name (str): Variable name (e.g., "COINMARKETCAP_API_KEY").
 
-# Store the last signal states
-last_signals = {}  # Track the last signal for each cryptocurrency
+    Returns:
+        str: The value.
+
+    Raises:
+        decouple.UndefinedValueError: If the variable is not set.
+    """
+    return config(name)
 
 
-def fetch_crypto_price(symbol):
+@functools.lru_cache(maxsize=None)
+def upstream_url(name):
     """
-    Fetch the latest cryptocurrency price using CoinMarketCap API.
+    Return an upstream endpoint, overridden by the environment variable of the same name if set.
 
     Args:
-        symbol (str): Cryptocurrency symbol (e.g., "BTC").
+        name (str): Key of `UPSTREAM_URLS` (e.g., "COINEX_KLINE_URL").
 
     Returns:
-        tuple: (float, str) - Current price of the cryptocurrency, or an error message.
+        str: The endpoint URL.
+    """
+    return config(name, default=UPSTREAM_URLS[name])
+
+
+def is_loopback(host):
+    """
+    Check whether a listen host is only reachable from this machine.
+
+    Args:
+        host (str): Host name or IP address.
+
+    Returns:
+        bool: True for "localhost" and loopback addresses.
+    """
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def get_bot():
+    """
+    Return the blocking `telebot.TeleBot` used by `send_signal`, creating it on first use.
+
+    Returns:
+        telebot.TeleBot: The bot client.
+    """
+    import telebot
+    from telebot import apihelper
+
+    if upstream_url("TELEGRAM_API_URL") != TELEGRAM_API_URL:
+        apihelper.API_URL = upstream_url("TELEGRAM_API_URL").rstrip("/") + "/bot{0}/{1}"
+    return telebot.TeleBot(env_setting("TELEGRAM_BOT_TOKEN"))
+
+
+def __getattr__(name):
+    # TOKEN, CHAT_ID, COINMARKETCAP_API_KEY and bot remain importable, resolved lazily
+    if name in ENV_SETTINGS:
+        return env_setting(ENV_SETTINGS[name])
+    if name == "bot":
+        return get_bot()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def base_asset(symbol):
+    """
+    Strip the quote currency from a trading pair symbol.
+
+    Args:
+        symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+
+    Returns:
+        str: Base asset symbol (e.g., "BTC").
+    """
+    return symbol.split("USDT")[0]
+
+
+def parse_quotes(payload, symbols):
+    """
+    Extract USD prices from a CoinMarketCap quotes/latest response.
+
+    Args:
+        payload (dict): Decoded JSON response.
+        symbols (list): Requested cryptocurrency symbols.
+
+    Returns:
+        dict: Mapping of symbol to price for the symbols present in the response.
+    """
+    data = payload["data"]
+    return {symbol: data[symbol]["quote"]["USD"]["price"] for symbol in symbols if symbol in data}
+
+
+def parse_candles(payload):
+    """
+    Convert a CoinEx kline response into the candle array used by the signal pipeline.
+
+    Args:
+        payload (bytes | dict): Raw response body, or the decoded JSON response.
+
+    Returns:
+        np.ndarray: (n, 3) array of candle data (time, close price, volume).
+    """
+    return decode_kline_response(payload)
+
+
+def parse_ohlcv(payload):
+    """
+    Convert a CoinEx kline response into full OHLCV rows.
+
+    Args:
+        payload (bytes | dict): Raw response body, or the decoded JSON response.
+
+    Returns:
+        np.ndarray: (n, 6) array of candles (time, open, high, low, close, volume).
+    """
+    return decode_kline_response(payload, OHLCV_FIELDS)
+
+
+@instrumented("fetch_crypto_prices")
+def fetch_crypto_prices(symbols):
+    """
+    Fetch the latest prices for several cryptocurrencies with a single CoinMarketCap request.
+
+    Args:
+        symbols (list): Cryptocurrency symbols (e.g., ["BTC", "ETH"]).
+
+    Returns:
+        tuple: (dict, str) - Mapping of symbol to price, or an error message.
     """
-    url = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/quotes/latest"
-    headers = {"X-CMC_PRO_API_KEY": COINMARKETCAP_API_KEY}
-    params = {"symbol": symbol.upper(), "convert": "USD"}
+    symbols = sorted({symbol.upper() for symbol in symbols})
+    if not symbols:
+        return {}, None
 
     try:
-        response = requests.get(url, headers=headers, params=params)
+        headers = {"X-CMC_PRO_API_KEY": env_setting("COINMARKETCAP_API_KEY")}
+        params = {"symbol": ",".join(symbols), "convert": "USD", "skip_invalid": "true"}
+        response = get_http_client().get(upstream_url("COINMARKETCAP_QUOTES_URL"), params=params, headers=headers)
         response.raise_for_status()
-        data = response.json()
-        price = data["data"][symbol]["quote"]["USD"]["price"]
-        return price, None
+        return parse_quotes(response.json(), symbols), None
     except Exception as e:
-        logging.error(f"Error fetching price for {symbol}: {e}")
-        return None, str(e)
+        logging.error(f"Error fetching prices for {', '.join(symbols)}: {e}")
+        return {}, str(e)
+
+
+@instrumented("fetch_crypto_price")
+def fetch_crypto_price(symbol):
+    """
+    Fetch the latest cryptocurrency price using CoinMarketCap API.
+
+    Args:
+        symbol (str): Cryptocurrency symbol (e.g., "BTC").
+
+    Returns:
+        tuple: (float, str) - Current price of the cryptocurrency, or an error message.
+    """
+    prices, error = fetch_crypto_prices([symbol])
+    if error:
+        return None, error
+    if symbol.upper() not in prices:
+        logging.error(f"Error fetching price for {symbol}: no quote returned")
+        return None, f"No quote returned for {symbol}"
+    return prices[symbol.upper()], None
 
 
+@instrumented("get_candles")
 def get_candles(symbol, interval, limit=50):
     """
     Fetch candle data (OHLC) for a cryptocurrency.
@@ -54,22 +225,40 @@ def get_candles(symbol, interval, limit=50):
     Returns:
         np.ndarray: Array of candle data (time, close price, volume).
     """
-    url = "https://api.coinex.com/v1/market/kline"
     params = {"market": symbol, "type": interval, "limit": limit}
     try:
-        response = requests.get(url, params=params)
+        response = get_http_client().get(upstream_url("COINEX_KLINE_URL"), params=params)
         response.raise_for_status()
-        data = response.json()["data"]
-        return np.array([[float(item[0]), float(item[2]), float(item[5])] for item in data])  # time, close, volume
+        return parse_candles(response.content)
     except Exception as e:
         logging.error(f"Error fetching candles for {symbol}: {e}")
         raise
 
 
+def highpass_coefficients(alpha1):
+    """
+    Compute the recursion coefficients of the high-pass filter.
+
+    The products are grouped exactly as in the filter formula, so filters built on
+    them reproduce `highpass_filter` bit for bit.
+
+    Args:
+        alpha1 (float): Filter coefficient.
+
+    Returns:
+        tuple: (input coefficient, first feedback coefficient, second feedback coefficient).
+    """
+    return (1 - alpha1 / 2) * (1 - alpha1 / 2), 2 * (1 - alpha1), (1 - alpha1) * (1 - alpha1)
+
+
+@instrumented("highpass_filter")
 def highpass_filter(close, alpha1):
     """
     Apply a high-pass filter to a series of closing prices.
 
+    The second differences are computed in one vectorized pass; only the IIR
+    recursion itself runs per element, on plain floats.
+
     Args:
         close (np.ndarray): Array of closing prices.
         alpha1 (float): Filter coefficient.
@@ -77,16 +266,24 @@ def highpass_filter(close, alpha1):
     Returns:
         np.ndarray: Filtered data.
     """
+    close = np.asarray(close, dtype=float)
     hp = np.zeros(len(close))
-    for i in range(2, len(close)):
-        hp[i] = (
-            (1 - alpha1 / 2) * (1 - alpha1 / 2) * (close[i] - 2 * close[i - 1] + close[i - 2])
-            + 2 * (1 - alpha1) * hp[i - 1]
-            - (1 - alpha1) * (1 - alpha1) * hp[i - 2]
-        )
+    if len(close) < 3:
+        return hp
+
+    a, b, c = highpass_coefficients(alpha1)
+    diff = (close[2:] - 2 * close[1:-1] + close[:-2]).tolist()
+    hp1 = hp2 = 0.0
+    values = []
+    for d in diff:
+        hp0 = a * d + b * hp1 - c * hp2
+        values.append(hp0)
+        hp2, hp1 = hp1, hp0
+    hp[2:] = values
     return hp
 
 
+@instrumented("quotient")
 def quotient(x, k1, k2):
     """
     Calculate quotient values for signal processing.
@@ -102,6 +299,7 @@ def quotient(x, k1, k2):
     return (x + k1) / (k1 * x + 1), (x + k2) / (k2 * x + 1)
 
 
+@instrumented("signal_cross")
 def signal_cross(q1, trigger):
     """
     Detect buy and sell signals based on crossing a threshold.
@@ -118,6 +316,7 @@ def signal_cross(q1, trigger):
     return buy_signal, sell_signal
 
 
+@instrumented("send_signal")
 def send_signal(message):
     """
     Send a message to the configured Telegram chat/channel.
@@ -129,7 +328,7 @@ def send_signal(message):
         None
     """
     try:
-        bot.send_message(CHAT_ID, message)
+        get_bot().send_message(env_setting("TELEGRAM_CHAT_ID"), message)
         logging.info(f"Message sent: {message}")
     except Exception as e:
         logging.error(f"Error sending message: {e}")
@@ -152,7 +351,103 @@ def calculate_risk_levels(entry_price, take_profit_percentage=2, stop_loss_perce
     return f"{take_profit:.6f}", f"{stop_loss:.6f}"
 
 
-def check_signals(symbol, interval, bot_token, chat_id):
+def evaluate_signals(symbol, candles, current_price):
+    """
+    Run the signal pipeline on candle data and build messages for new buy/sell signals.
+
+    Args:
+        symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+        candles (np.ndarray): Candle data (time, close price, volume) as returned by `get_candles`.
+        current_price (float): Entry price used for the risk levels.
+
+    Returns:
+        list: Messages for signals that differ from the last one sent for the symbol.
+    """
+    close_prices = candles[:, 1]
+    filtered = highpass_filter(close_prices, ALPHA1)
+    q1, q2 = quotient(filtered, K1, K2)
+    buy_signal, sell_signal = signal_cross(q1, TRIGGER)
+    return apply_signal(symbol, buy_signal[-1], sell_signal[-1], current_price)
+
+
+def signal_side(buy, sell):
+    """
+    Reduce the latest buy/sell state to a side.
+
+    Args:
+        buy (bool): Whether the latest candle is a buy signal.
+        sell (bool): Whether the latest candle is a sell signal.
+
+    Returns:
+        str: "buy", "sell", or None when neither fires.
+    """
+    if buy:
+        return "buy"
+    if sell:
+        return "sell"
+    return None
+
+
+def signal_message(symbol, side, current_price, source=None, age=None):
+    """
+    Build the Telegram message of a buy or sell signal.
+
+    Args:
+        symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+        side (str): "buy" or "sell".
+        current_price (float): Entry price used for the risk levels.
+        source (str, optional): Where the entry price came from (see `price_source.PRICE_SOURCES`).
+        age (float, optional): Seconds since the entry price was observed.
+
+    Returns:
+        str: The formatted message.
+    """
+    if side == "buy":
+        take_profit, stop_loss = calculate_risk_levels(current_price)
+        message = (
+            f"🔵 **Buy Signal ({symbol})** 🔵\n"
+            f"🔹 Entry Price: {current_price:.6f} USD\n"
+            f"🔹 Take Profit: {take_profit} USD\n"
+            f"🔹 Stop Loss: {stop_loss} USD"
+        )
+    else:
+        take_profit, stop_loss = calculate_risk_levels(current_price, take_profit_percentage=-2, stop_loss_percentage=-1)
+        message = (
+            f"🔴 **Sell Signal ({symbol})** 🔴\n"
+            f"🔹 Sell Price: {current_price:.6f} USD\n"
+            f"🔹 Take Profit: {take_profit} USD\n"
+            f"🔹 Stop Loss: {stop_loss} USD"
+        )
+    if source is not None:
+        message += f"\n🔹 Price Source: {PRICE_SOURCE_LABELS.get(source, source)}"
+        if age is not None:
+            message += f" ({age:.0f}s old)"
+    return message
+
+
+def apply_signal(symbol, buy, sell, current_price, store=None):
+    """
+    Turn the latest buy/sell state of a symbol into messages, skipping repeated signals.
+
+    Args:
+        symbol (str): Cryptocurrency pair symbol (e.g., "BTCUSDT").
+        buy (bool): Whether the latest candle is a buy signal.
+        sell (bool): Whether the latest candle is a sell signal.
+        current_price (float): Entry price used for the risk levels.
+        store (MemorySignalStore, optional): Signal state store; defaults to the shared one.
+
+    Returns:
+        list: Messages for signals that differ from the last one sent for the symbol.
+    """
+    store = store or get_signal_store()
+    side = signal_side(buy, sell)
+    previous = store.get(symbol)
+    if side is None or side == previous or not store.compare_and_set(symbol, previous, side):
+        return []
+    return [signal_message(symbol, side, current_price)]
+
+
+def check_signals(symbol, interval, bot_token, chat_id, quotes=None):
     """
     Analyze and send buy/sell signals based on trading data.
 
@@ -161,54 +456,28 @@ def check_signals(symbol, interval, bot_token, chat_id):
         interval (str): Candle interval (e.g., "1hour").
         bot_token (str): Telegram bot token.
         chat_id (str): Telegram chat ID.
+        quotes (dict, optional): Prices prefetched with `fetch_crypto_prices` for this cycle,
+            used when no candles were returned. Symbols missing from it are fetched individually.
 
     Returns:
         None
     """
     try:
-        global last_signals
         candles = get_candles(symbol, interval)
-        close_prices = candles[:, 1]
-
-        alpha1 = 0.07
-        filtered = highpass_filter(close_prices, alpha1)
-
-        k1, k2 = 0.5, 0.3
-        q1, q2 = quotient(filtered, k1, k2)
 
-        trigger = 0
-        buy_signal, sell_signal = signal_cross(q1, trigger)
-
-        current_price, error = fetch_crypto_price(symbol.split("USDT")[0])
-        if error:
-            return
-
-        if symbol not in last_signals:
-            last_signals[symbol] = {"buy": False, "sell": False}
-
-        if buy_signal[-1] and not last_signals[symbol]["buy"]:
-            take_profit, stop_loss = calculate_risk_levels(current_price)
-            message = (
-                f"🔵 **Buy Signal ({symbol})** 🔵\n"
-                f"🔹 Entry Price: {current_price:.6f} USD\n"
-                f"🔹 Take Profit: {take_profit} USD\n"
-                f"🔹 Stop Loss: {stop_loss} USD"
-            )
-            send_signal(message)
-            last_signals[symbol]["buy"] = True
-            last_signals[symbol]["sell"] = False
-
-        if sell_signal[-1] and not last_signals[symbol]["sell"]:
-            take_profit, stop_loss = calculate_risk_levels(current_price, take_profit_percentage=-2, stop_loss_percentage=-1)
-            message = (
-                f"🔴 **Sell Signal ({symbol})** 🔴\n"
-                f"🔹 Sell Price: {current_price:.6f} USD\n"
-                f"🔹 Take Profit: {take_profit} USD\n"
-                f"🔹 Stop Loss: {stop_loss} USD"
-            )
+        # The newest close is the entry price; quotes are only needed without candles
+        asset = base_asset(symbol)
+        if len(candles):
+            current_price = float(candles[-1, 1])
+        elif quotes and asset in quotes:
+            current_price = quotes[asset]
+        else:
+            current_price, error = fetch_crypto_price(asset)
+            if error:
+                return
+
+        for message in evaluate_signals(symbol, candles, current_price):
             send_signal(message)
-            last_signals[symbol]["sell"] = True
-            last_signals[symbol]["buy"] = False
 
     except Exception as e:
         logging.error(f"Error during signal analysis for {symbol}: {e}")
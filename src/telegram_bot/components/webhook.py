@@ -0,0 +1,195 @@
+import asyncio
+import hmac
+import json
+import logging
+import signal
+
+from telegram_bot.components.metrics import REGISTRY
+from telegram_bot.components.utils import is_loopback
+
+# Header Telegram sends the webhook's secret token in
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+WEBHOOK_UPDATES = {
+    result: REGISTRY.counter("telegram_bot_webhook_updates_total", "Webhook requests by result.", result=result)
+    for result in ("accepted", "rejected", "forbidden", "invalid")
+}
+WEBHOOK_PENDING = REGISTRY.gauge("telegram_bot_webhook_pending", "Updates received but not yet dispatched.")
+
+
+class WebhookServer:
+    """
+    Embedded HTTP server receiving Telegram updates by webhook.
+
+    Each request is parsed and put on the Application's update queue, then acknowledged
+    immediately; handlers run afterwards under the Application's concurrency limit
+    (`concurrent_updates`). When more than `max_pending` updates wait for a handler,
+    requests are answered with 503 so Telegram or the load balancer retries them later.
+    `GET /healthz` reports readiness.
+    """
+
+    def __init__(self, application, listen="127.0.0.1", port=8443, path="/telegram", secret_token=None, max_pending=1000):
+        """
+        Initialize the WebhookServer.
+
+        Args:
+            application (Application): Application whose handlers process the updates.
+            listen (str): Interface to listen on.
+            port (int): TCP port; 0 picks a free port.
+            path (str): URL path Telegram posts updates to.
+            secret_token (str, optional): Required value of the secret token header.
+            max_pending (int): Queued updates beyond which requests are refused.
+
+        Raises:
+            ValueError: If the server would listen on a non-loopback interface without a
+                secret token, accepting forged updates from anyone who can reach it.
+        """
+        if not secret_token and not is_loopback(listen):
+            raise ValueError(f"webhook.secret_token must be set to listen on {listen}")
+        self.application = application
+        self.listen = listen
+        self.port = int(port)
+        self.path = path
+        self.secret_token = secret_token
+        self.max_pending = int(max_pending)
+        self._runner = None
+
+    async def start(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_post(self.path, self._receive)
+        app.router.add_get("/healthz", self._health)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.listen, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        logging.info(f"Webhook server listening on http://{self.listen}:{self.port}{self.path}")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _receive(self, request):
+        from aiohttp import web
+        from telegram import Update
+
+        if self.secret_token and not hmac.compare_digest(request.headers.get(SECRET_TOKEN_HEADER, ""), self.secret_token):
+            WEBHOOK_UPDATES["forbidden"].inc()
+            return web.Response(status=403)
+        queue = self.application.update_queue
+        if queue.qsize() >= self.max_pending:
+            WEBHOOK_UPDATES["rejected"].inc()
+            return web.Response(status=503, headers={"Retry-After": "1"})
+        try:
+            update = Update.de_json(json.loads(await request.read()), self.application.bot)
+        except Exception as e:
+            logging.warning(f"Ignoring a malformed webhook update: {e}")
+            WEBHOOK_UPDATES["invalid"].inc()
+            return web.Response(status=400)
+        queue.put_nowait(update)
+        WEBHOOK_UPDATES["accepted"].inc()
+        WEBHOOK_PENDING.set(queue.qsize())
+        return web.Response()
+
+    async def _health(self, request):
+        from aiohttp import web
+
+        if self._runner is None or not self.application.running:
+            return web.Response(status=503, text="starting")
+        return web.Response(text="ok")
+
+    def __repr__(self):
+        return f"<WebhookServer(listen={self.listen}, port={self.port}, path={self.path}, max_pending={self.max_pending})>"
+
+
+def webhook_settings(config_manager):
+    """
+    Read the `webhook.*` settings.
+
+    Args:
+        config_manager (ConfigurationManager): The configuration manager to load settings from.
+
+    Returns:
+        dict: Settings of the webhook server and its registration with Telegram.
+    """
+    return {
+        "listen": config_manager.get("webhook.listen", "127.0.0.1"),
+        "port": int(config_manager.get("webhook.port", 8443)),
+        "path": config_manager.get("webhook.path", "/telegram"),
+        "url": config_manager.get("webhook.url"),
+        "secret_token": config_manager.get("webhook.secret_token"),
+        "max_pending": int(config_manager.get("webhook.max_pending", 1000)),
+        "concurrency": int(config_manager.get("webhook.concurrency", 32)),
+    }
+
+
+async def serve_webhook(application, server, url=None, secret_token=None, stop_event=None):
+    """
+    Run the Application behind a webhook server until `stop_event` is set.
+
+    Follows the lifecycle of `Application.run_polling`, including the post_init,
+    post_stop and post_shutdown hooks.
+
+    Args:
+        application (Application): The initialized bot Application.
+        server (WebhookServer): Server feeding the Application's update queue.
+        url (str, optional): Public URL registered with Telegram; the webhook is left as
+            is when omitted, e.g., when the load balancer's registration is managed elsewhere.
+        secret_token (str, optional): Secret token registered along with the URL.
+        stop_event (asyncio.Event, optional): Set to stop serving; runs forever by default.
+
+    Returns:
+        None
+    """
+    stop_event = stop_event or asyncio.Event()
+    await application.initialize()
+    try:
+        if application.post_init:
+            await application.post_init(application)
+        await application.start()
+        await server.start()
+        if url:
+            await application.bot.set_webhook(url, secret_token=secret_token, allowed_updates=["message"])
+            logging.info(f"Webhook registered at {url}")
+        await stop_event.wait()
+    finally:
+        await server.stop()
+        if application.running:
+            await application.stop()
+            if application.post_stop:
+                await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+
+
+def run_webhook(application, config_manager):
+    """
+    Serve updates by webhook until SIGINT or SIGTERM. Blocking counterpart of `run_polling`.
+
+    Args:
+        application (Application): The initialized bot Application.
+        config_manager (ConfigurationManager): Source of the `webhook.*` settings.
+
+    Returns:
+        None
+    """
+    settings = webhook_settings(config_manager)
+    server = WebhookServer(
+        application, settings["listen"], settings["port"], settings["path"], settings["secret_token"], settings["max_pending"]
+    )
+
+    async def main():
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        await serve_webhook(application, server, settings["url"], settings["secret_token"], stop_event)
+
+    asyncio.run(main())
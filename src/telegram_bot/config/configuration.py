@@ -1,14 +1,81 @@
 import yaml
 import os
 import logging
+import threading
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Marks keys missing from both the configuration and the environment
+_MISSING = object()
+
+
+class ConfigSnapshot:
+    """
+    An immutable view of one version of the configuration.
+
+    Every dotted key path (e.g., "bot", "bot.symbols") is precomputed into a flat index,
+    so a lookup is a single dictionary access.
+    """
+
+    def __init__(self, config, version=0):
+        """
+        Initialize the ConfigSnapshot.
+
+        Args:
+            config (dict): Parsed configuration.
+            version (int): Number of reloads before this snapshot.
+
+        Raises:
+            ValueError: If the configuration is not a mapping.
+        """
+        if config is not None and not isinstance(config, dict):
+            raise ValueError("The configuration must be a mapping of sections")
+        self.config = config or {}
+        self.version = version
+        self.index = {}
+        self.leaves = {}
+        self._flatten(self.config, "")
+        self._env = {}  # key -> environment fallback, resolved on first lookup
+
+    def _flatten(self, node, prefix):
+        for key, value in node.items():
+            path = f"{prefix}{key}"
+            self.index[path] = value
+            if isinstance(value, dict) and value:
+                self._flatten(value, f"{path}.")
+            else:
+                self.leaves[path] = value
+
+    def get(self, key, default=None):
+        value = self.index.get(key, _MISSING)
+        if value is _MISSING:
+            if key not in self._env:
+                # Fallback to environment variable, looked up once per key and snapshot
+                self._env[key] = os.getenv(key.replace(".", "_").upper(), _MISSING)
+            value = self._env[key]
+        return default if value is _MISSING else value
+
+    def changed_keys(self, other):
+        """
+        Return the leaf keys whose value differs from another snapshot.
+
+        Args:
+            other (ConfigSnapshot): The snapshot to compare with.
+
+        Returns:
+            set: Dotted keys added, removed or modified.
+        """
+        keys = set(self.leaves) | set(other.leaves)
+        return {key for key in keys if self.leaves.get(key, _MISSING) != other.leaves.get(key, _MISSING)}
+
+
 class ConfigurationManager:
     """
     A utility class to manage configuration loading and retrieval from a YAML file.
+
+    The file can be reloaded without a restart: `check_for_changes` (polled by `watch`
+    or by the caller's own scheduler) swaps in a new snapshot when the file changed and
+    notifies the subscribers of the keys that changed.
     """
 
     def __init__(self, config_file_path="config/config.yaml"):
@@ -19,7 +86,29 @@ class ConfigurationManager:
             config_file_path (str): Path to the configuration YAML file.
         """
         self.config_file_path = os.path.abspath(config_file_path)  # Normalize the file path
-        self.config = self._load_config()
+        self._subscribers = []  # (callback, key prefixes)
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop_watching = threading.Event()
+        self._file_seen = self._file_state()  # (mtime, size) of the last file read
+        self._snapshot = ConfigSnapshot(self._load_config())
+
+    @property
+    def config(self):
+        """dict: The current configuration."""
+        return self._snapshot.config
+
+    @property
+    def version(self):
+        """int: Number of reloads applied so far."""
+        return self._snapshot.version
+
+    def _file_state(self):
+        try:
+            stat = os.stat(self.config_file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
 
     def _load_config(self):
         """
@@ -56,18 +145,98 @@ class ConfigurationManager:
         Returns:
             Any: The configuration value or the default value if the key is not found.
         """
-        keys = key.split(".")
-        value = self.config
-        try:
-            for k in keys:
-                value = value[k]
-            return value
-        except (KeyError, TypeError):
-            # Fallback to environment variable
-            env_value = os.getenv(key.replace(".", "_").upper())
-            if env_value is not None:
-                return env_value
-            return default
+        return self._snapshot.get(key, default)
+
+    def subscribe(self, callback, *prefixes):
+        """
+        Register a callback for configuration changes.
+
+        Args:
+            callback (callable): Called as `callback(changed_keys)` with the set of changed
+                dotted keys, on the thread that performed the reload.
+            *prefixes (str): Only notify for keys equal to or under these keys (e.g., "bot.symbols",
+                "signals"); all changes if omitted.
+
+        Returns:
+            callable: The callback, for `unsubscribe`.
+        """
+        self._subscribers.append((callback, prefixes))
+        return callback
+
+    def unsubscribe(self, callback):
+        self._subscribers = [(registered, prefixes) for registered, prefixes in self._subscribers if registered is not callback]
+
+    def reload(self):
+        """
+        Reload the file and atomically swap in the new snapshot.
+
+        A file that fails to parse is logged and ignored; the current snapshot stays active.
+
+        Returns:
+            set: Dotted keys that changed.
+        """
+        with self._reload_lock:
+            # A broken file is not retried until it changes again
+            self._file_seen = self._file_state()
+            try:
+                snapshot = ConfigSnapshot(self._load_config(), self._snapshot.version + 1)
+            except (FileNotFoundError, ValueError) as e:
+                logger.error(f"Keeping the current configuration: {e}")
+                return set()
+            changed = snapshot.changed_keys(self._snapshot)
+            self._snapshot = snapshot
+
+        if changed:
+            logger.info(f"Configuration v{snapshot.version} applied; changed: {', '.join(sorted(changed))}")
+        for callback, prefixes in list(self._subscribers):
+            relevant = {key for key in changed if not prefixes or any(key == p or key.startswith(f"{p}.") for p in prefixes)}
+            if relevant:
+                try:
+                    callback(relevant)
+                except Exception as e:
+                    logger.error(f"Configuration subscriber {callback!r} failed: {e}")
+        return changed
+
+    def check_for_changes(self):
+        """
+        Reload if the file was modified since it was last read.
+
+        Returns:
+            set: Dotted keys that changed.
+        """
+        if self._file_state() == self._file_seen:
+            return set()
+        return self.reload()
+
+    def watch(self, interval=5.0):
+        """
+        Poll the file for changes from a background thread.
+
+        Subscribers are then notified on that thread; prefer scheduling `check_for_changes`
+        on the event loop when subscribers touch loop-owned state.
+
+        Args:
+            interval (float): Seconds between checks.
+
+        Returns:
+            None
+        """
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+
+        def poll():
+            while not self._stop_watching.wait(interval):
+                self.check_for_changes()
+
+        self._watcher = threading.Thread(target=poll, name="config-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._stop_watching.set()
+            self._watcher.join()
+            self._watcher = None
 
     def __repr__(self):
         """
@@ -77,3 +246,25 @@ class ConfigurationManager:
             str: String representation of the loaded configuration.
         """
         return f"<ConfigurationManager(config_file_path={self.config_file_path})>"
+
+
+_shared_manager = None
+_shared_manager_lock = threading.Lock()
+
+
+def get_configuration_manager(config_file_path="config/config.yaml"):
+    """
+    Return the process-wide configuration manager.
+
+    Args:
+        config_file_path (str): Path to the configuration YAML file, used only when the
+            manager is first created.
+
+    Returns:
+        ConfigurationManager: The shared manager.
+    """
+    global _shared_manager
+    with _shared_manager_lock:
+        if _shared_manager is None:
+            _shared_manager = ConfigurationManager(config_file_path)
+        return _shared_manager
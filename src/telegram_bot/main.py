@@ -1,5 +1,5 @@
+import asyncio
 import sys
-import time
 import logging
 from pathlib import Path
 
@@ -10,9 +10,26 @@ if str(src_directory) not in sys.path:
     sys.path.append(str(src_directory))  # Add 'src' to PYTHONPATH
 
 from telegram.ext import Application, CommandHandler
-from telegram_bot.components.command_handler import start_command, get_crypto_price
-from telegram_bot.components.utils import check_signals
-from telegram_bot.config.configuration import ConfigurationManager
+from telegram_bot.components.alerts import alert_messages, get_alert_engine
+from telegram_bot.components.bot_request import AiohttpRequest
+from telegram_bot.components.command_handler import (
+    alert_command,
+    alerts_command,
+    get_crypto_price,
+    start_command,
+    unalert_command,
+)
+from telegram_bot.components.http_client import get_http_client
+from telegram_bot.components.kline_stream import KlineStream
+from telegram_bot.components.message_queue import MessageQueue, message_queue_settings
+from telegram_bot.components.metrics import configure_metrics
+from telegram_bot.components.monitor import SignalMonitor
+from telegram_bot.components.price_cache import get_price_cache
+from telegram_bot.components.scheduler import CandleScheduler
+from telegram_bot.components.sharding import ShardCoordinator
+from telegram_bot.components.signal_store import get_signal_store
+from telegram_bot.components.webhook import run_webhook
+from telegram_bot.config.configuration import get_configuration_manager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s: %(message)s")
@@ -33,41 +50,259 @@ def initialize_bot(config_manager):
         raise ValueError("Bot token is missing in configuration.")
 
     # Use Application.builder to initialize the bot
-    application = Application.builder().token(bot_token).build()
+    builder = Application.builder().token(bot_token)
+    if config_manager.get("telegram.api_url"):
+        builder = builder.base_url(config_manager.get("telegram.api_url"))
+    if config_manager.get("bot.mode", "polling") == "webhook":
+        # Handlers of different updates run concurrently, at most this many at a time
+        builder = builder.concurrent_updates(int(config_manager.get("webhook.concurrency", 32)))
+    if config_manager.get("telegram.http_client", "httpx") == "aiohttp":
+        builder = builder.request(AiohttpRequest(int(config_manager.get("telegram.pool_size", 256))))
+    application = builder.build()
 
     # Register bot commands
     application.add_handler(CommandHandler("start", start_command))
     application.add_handler(CommandHandler("price", get_crypto_price))
+    application.add_handler(CommandHandler("alert", alert_command))
+    application.add_handler(CommandHandler("alerts", alerts_command))
+    application.add_handler(CommandHandler("unalert", unalert_command))
 
     logging.info("Commands registered successfully.")
     return application
 
 
-def monitor_signals(config_manager):
+def add_lifecycle_hooks(application, post_init=None, post_stop=None, post_shutdown=None):
     """
-    Monitor cryptocurrency signals and send alerts via Telegram.
-    
+    Chain hooks onto the Application's lifecycle callbacks.
+
+    Startup hooks run in registration order and teardown hooks in reverse, so a
+    component registered after the outbox is stopped before the outbox drains.
+
+    Args:
+        application (Application): The initialized bot Application.
+        post_init (callable, optional): Coroutine function run after initialization.
+        post_stop (callable, optional): Coroutine function run after the updater stopped.
+        post_shutdown (callable, optional): Coroutine function run after shutdown.
+
+    Returns:
+        None
+    """
+    for name, hook, first in (("post_init", post_init, False), ("post_stop", post_stop, True),
+                              ("post_shutdown", post_shutdown, True)):
+        if hook is None:
+            continue
+        previous = getattr(application, name)
+        if previous is None:
+            setattr(application, name, hook)
+            continue
+
+        async def chained(app, hooks=(hook, previous) if first else (previous, hook)):
+            for callback in hooks:
+                await callback(app)
+
+        setattr(application, name, chained)
+
+
+def monitor_signals(application, config_manager, outbox):
+    """
+    Schedule cryptocurrency signal monitoring on the bot's job queue.
+
+    Monitoring runs on the same event loop as command handling, so
+    `application.run_polling()` drives both.
+
     Args:
+        application (Application): The initialized bot Application.
         config_manager (ConfigurationManager): The configuration manager to load bot settings.
+        outbox (MessageQueue): Queue delivering the signals.
+
+    Returns:
+        SignalMonitor: The scheduled monitoring engine, or the `ShardCoordinator` when
+        `sharding.workers` is set.
     """
-    symbols = config_manager.get("bot.symbols", [])
-    interval = config_manager.get("bot.interval", "1hour")
+    if int(config_manager.get("sharding.workers", 0)) > 0:
+        return monitor_sharded(application, config_manager)
+    if config_manager.get("monitor.ingestion", "polling") == "websocket":
+        return monitor_streaming(application, config_manager, outbox)
+
+    monitor = SignalMonitor(config_manager, outbox=outbox)
+    if config_manager.get("schedule.mode", "candle") == "candle":
+        return monitor_candles(application, config_manager, monitor)
+
     monitoring_interval = config_manager.get("bot.monitoring_interval", 60)  # Default: 60 seconds
+    job = application.job_queue.run_repeating(monitor.run_cycle, interval=monitoring_interval, first=0, name="signal_monitor")
 
-    bot_token = config_manager.get("bot.token")
-    chat_id = config_manager.get("bot.chat_id")
+    def reschedule(_):
+        interval = float(config_manager.get("bot.monitoring_interval", 60))
+        job.job.reschedule(trigger="interval", seconds=interval)
+        logging.info(f"Signal monitoring rescheduled every {interval} seconds")
 
-    logging.info(f"Starting signal monitoring for symbols: {symbols}")
-    try:
-        while True:
-            for symbol in symbols:
-                check_signals(symbol, interval, bot_token, chat_id)
-            logging.info(f"Waiting for {monitoring_interval} seconds before the next cycle...")
-            time.sleep(monitoring_interval)
-    except KeyboardInterrupt:
-        logging.info("Signal monitoring stopped by user.")
-    except Exception as e:
-        logging.error(f"Unexpected error during signal monitoring: {e}")
+    # Symbols, signal parameters and intervals apply from the next cycle without a restart
+    config_manager.subscribe(monitor.on_config_change, "bot", "monitor", "signals", "prices", "indicators")
+    config_manager.subscribe(reschedule, "bot.monitoring_interval")
+
+    async def post_shutdown(_):
+        await monitor.close()
+        monitor.signal_store.close()
+
+    add_lifecycle_hooks(application, post_shutdown=post_shutdown)
+
+    logging.info(f"Signal monitoring scheduled every {monitoring_interval} seconds for symbols: {monitor.symbols}")
+    return monitor
+
+
+def monitor_candles(application, config_manager, monitor):
+    """
+    Run signal monitoring at candle closes instead of every `monitoring_interval`.
+
+    Args:
+        application (Application): The initialized bot Application.
+        config_manager (ConfigurationManager): The configuration manager to load bot settings.
+        monitor (SignalMonitor): The monitoring engine to schedule.
+
+    Returns:
+        SignalMonitor: The scheduled monitoring engine.
+    """
+    scheduler = CandleScheduler.from_config(monitor)
+    # Symbols, intervals and schedule settings apply from the next pass without a restart
+    config_manager.subscribe(scheduler.on_config_change, "bot", "monitor", "signals", "prices", "indicators", "schedule")
+
+    async def post_init(app):
+        scheduler.start(app.bot)
+
+    async def post_stop(_):
+        await scheduler.stop()
+
+    async def post_shutdown(_):
+        await monitor.close()
+        monitor.signal_store.close()
+
+    add_lifecycle_hooks(application, post_init=post_init, post_stop=post_stop, post_shutdown=post_shutdown)
+    return monitor
+
+
+def monitor_streaming(application, config_manager, outbox):
+    """
+    Drive signal monitoring from the exchange's WebSocket kline feed instead of polling.
+
+    Signals are evaluated as candle updates arrive, on the same event loop as command
+    handling.
+
+    Args:
+        application (Application): The initialized bot Application.
+        config_manager (ConfigurationManager): The configuration manager to load bot settings.
+        outbox (MessageQueue): Queue delivering the signals.
+
+    Returns:
+        KlineStream: The stream started with the bot.
+    """
+    monitor = SignalMonitor(config_manager, outbox=outbox)
+    stream = KlineStream.from_config(monitor)
+    config_manager.subscribe(stream.on_config_change, "bot", "monitor", "signals", "prices", "indicators")
+
+    async def post_init(_):
+        await stream.start()
+
+    async def post_stop(_):
+        await stream.stop()
+
+    async def post_shutdown(_):
+        await monitor.close()
+        monitor.signal_store.close()
+
+    add_lifecycle_hooks(application, post_init=post_init, post_stop=post_stop, post_shutdown=post_shutdown)
+
+    logging.info(f"Signal monitoring streams {monitor.base_interval} klines from {stream.url} for symbols: {monitor.symbols}")
+    return stream
+
+
+def monitor_sharded(application, config_manager):
+    """
+    Run signal monitoring in worker processes that each own a shard of the symbols.
+
+    The bot process keeps handling commands and hosts the shard coordinator.
+
+    Args:
+        application (Application): The initialized bot Application.
+        config_manager (ConfigurationManager): The configuration manager to load bot settings.
+
+    Returns:
+        ShardCoordinator: The coordinator started with the bot.
+    """
+    coordinator = ShardCoordinator.from_config(config_manager)
+
+    async def post_init(_):
+        coordinator.start()
+
+    async def post_shutdown(_):
+        await asyncio.to_thread(coordinator.stop)
+
+    add_lifecycle_hooks(application, post_init=post_init, post_shutdown=post_shutdown)
+    return coordinator
+
+
+def watch_config(application, config_manager):
+    """
+    Check the configuration file for changes on the bot's job queue.
+
+    Subscribers are notified on the event loop, between command handlers and monitoring
+    cycles. Disabled when `reload.interval` is 0.
+
+    Args:
+        application (Application): The initialized bot Application.
+        config_manager (ConfigurationManager): The configuration manager to reload.
+
+    Returns:
+        None
+    """
+    reload_interval = float(config_manager.get("reload.interval", 5))
+    if reload_interval <= 0:
+        return
+
+    async def reload_config(_):
+        config_manager.check_for_changes()
+
+    application.job_queue.run_repeating(reload_config, interval=reload_interval, first=reload_interval, name="config_reload")
+
+
+def watch_alerts(application, config_manager, outbox):
+    """
+    Evaluate the users' price alerts every `alerts.interval` seconds on the bot's job queue.
+
+    Quotes come from the shared cache: symbols quoted within its TTL, by `/price`, an
+    earlier check or a monitor pass with `quote` among `prices.sources`, cost no extra
+    request; the others are fetched in one batched request. With the default candle
+    prices the monitor quotes nothing, so alerts are usually checked against quotes the
+    previous check fetched. Triggered alerts are delivered as one message per chat.
+
+    Args:
+        application (Application): The initialized bot Application.
+        config_manager (ConfigurationManager): The configuration manager to load settings from.
+        outbox (MessageQueue): Queue delivering the notifications.
+
+    Returns:
+        AlertEngine: The shared alert engine.
+    """
+    engine = get_alert_engine(config_manager)
+    price_cache = get_price_cache()
+    alert_interval = float(config_manager.get("alerts.interval", 10))
+
+    async def check_alerts(_):
+        symbols = engine.symbols()
+        if not symbols:
+            return
+        prices = await asyncio.to_thread(price_cache.get_many, symbols)
+        # Deleting triggered alerts waits on the SQLite store, so it runs off the event loop
+        triggered = await asyncio.to_thread(engine.check, prices)
+        for chat_id, message in alert_messages(triggered, prices).items():
+            outbox.enqueue(chat_id, message)
+
+    async def post_shutdown(_):
+        engine.close()
+
+    application.job_queue.run_repeating(check_alerts, interval=alert_interval, first=alert_interval, name="price_alerts")
+    add_lifecycle_hooks(application, post_shutdown=post_shutdown)
+    logging.info(f"Price alerts checked every {alert_interval} seconds: {engine!r}")
+    return engine
 
 
 def main():
@@ -75,16 +310,40 @@ def main():
     Main entry point for the Telegram bot.
     """
     # Load configurations
-    config_manager = ConfigurationManager()
+    config_manager = get_configuration_manager()
+
+    # Configure the shared HTTP client, quote cache and signal state store before first use
+    get_http_client(config_manager)
+    get_price_cache(config_manager)
+    get_signal_store(config_manager)
+    configure_metrics(config_manager)
 
     # Initialize bot
     try:
         application = initialize_bot(config_manager)
-        logging.info("🚀 Bot is running... Press Ctrl+C to stop.")
-        application.run_polling()  # Use run_polling for the updated Application
 
-        # Start monitoring signals
-        monitor_signals(config_manager)
+        # One outbox delivers signals and alerts under the same Telegram rate limits
+        outbox = MessageQueue(application.bot, **message_queue_settings(config_manager))
+
+        async def start_outbox(_):
+            outbox.start()
+
+        async def drain_outbox(_):
+            # Drain queued messages while the bot can still send
+            await outbox.stop()
+
+        add_lifecycle_hooks(application, post_init=start_outbox, post_stop=drain_outbox)
+
+        # Schedule signal monitoring and alerts on the Application's event loop
+        monitor_signals(application, config_manager, outbox)
+        watch_alerts(application, config_manager, outbox)
+        watch_config(application, config_manager)
+
+        logging.info("🚀 Bot is running... Press Ctrl+C to stop.")
+        if config_manager.get("bot.mode", "polling") == "webhook":
+            run_webhook(application, config_manager)
+        else:
+            application.run_polling()  # Use run_polling for the updated Application
     except ValueError as ve:
         logging.error(f"Configuration error: {ve}")
     except Exception as e:
@@ -0,0 +1,26 @@
+import asyncio
+
+from telegram_bot.components.alerts import AlertEngine, SQLiteAlertStore
+
+
+def test_engine_calls_from_worker_threads_stay_consistent(tmp_path):
+    engine = AlertEngine(SQLiteAlertStore(str(tmp_path / "alerts.db")), max_per_chat=1000)
+
+    async def run():
+        await asyncio.gather(*(
+            asyncio.to_thread(engine.add, chat_id, "BTC", "above", 100 + index)
+            for chat_id in range(4) for index in range(50)
+        ))
+        removed = await asyncio.gather(
+            asyncio.to_thread(engine.check, {"BTC": 124.5}),
+            asyncio.to_thread(engine.remove_chat, 3),
+        )
+        return removed
+
+    triggered, _ = asyncio.run(run())
+    # remove_chat may run first and take chat 3's triggered alerts with it
+    assert len(triggered) in (75, 100)
+    assert all(threshold <= 124.5 for _, _, _, _, threshold in triggered)
+    assert len(engine) == 75
+    assert sorted(engine.store.load()) == sorted(alert for chat_id in range(3) for alert in engine.alerts(chat_id))
+    engine.close()
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from telegram_bot.components.backtest import resolve_trades
+
+
+def brute_force(high, low, index, side, take_profit, stop_loss):
+    """First candle after the entry touching a level, the stop-loss winning ties."""
+    for candle in range(index + 1, len(high)):
+        stop = low[candle] <= stop_loss if side > 0 else high[candle] >= stop_loss
+        target = high[candle] >= take_profit if side > 0 else low[candle] <= take_profit
+        if stop or target:
+            return candle, "sl" if stop else "tp"
+    return len(high) - 1, "open"
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("scan", [0, 3, 64])
+def test_resolve_trades_matches_brute_force(seed, scan):
+    rng = np.random.default_rng(seed)
+    count = int(rng.integers(10, 3000))
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002 * (1 + seed % 3), count)))
+    spread = 0.0 if seed % 3 == 0 else 0.002  # equal highs and lows make both levels hit on one candle
+    high, low = close * (1 + spread), close * (1 - spread)
+    columns = {"time": np.arange(count) * 60, "high": high, "low": low, "close": close}
+    indices = np.sort(rng.integers(0, count, 200))
+    sides = rng.choice([-1, 1], len(indices))
+
+    trades = resolve_trades(columns, indices, sides, 2, 1, scan)
+    for trade, index, side in zip(trades, indices, sides):
+        exit_index, outcome = brute_force(high, low, index, side, trade["take_profit"], trade["stop_loss"])
+        assert trade["outcome"] == outcome
+        assert trade["exit_time"] == exit_index * 60
+
+
+def test_trade_in_last_partial_block_never_exits_before_entry():
+    count = 1100
+    close = np.full(count, 100.0)
+    close[1030] = 90.0  # a stop-loss level only touched before the entry
+    columns = {"time": np.arange(count), "high": close, "low": close, "close": close}
+    trades = resolve_trades(columns, np.array([1050]), np.array([1]), 2, 1, scan=0)
+    assert trades["outcome"][0] == "open"
+    assert trades["exit_time"][0] == count - 1
@@ -0,0 +1,92 @@
+import logging
+
+import numpy as np
+
+from telegram_bot.components.candle_store import SNAPSHOT_MAGIC, CandleStore
+
+HOUR = 3600
+START = 1_700_000_000 // 86400 * 86400
+
+
+def hourly_candles(count, seed=0):
+    rng = np.random.default_rng(seed)
+    times = START + HOUR * np.arange(count, dtype=float)
+    return np.column_stack((times, 100 + rng.normal(0, 1, count).cumsum(), rng.uniform(1, 10, count)))
+
+
+def test_a_saved_store_loads_the_same_candles(tmp_path):
+    path = str(tmp_path / "candles.bin")
+    store = CandleStore(50)
+    store.update("BTCUSDT", "1hour", hourly_candles(80, seed=1))
+    store.update("ETHUSDT", "4hour", hourly_candles(20, seed=2))
+    assert store.save(path) == 2
+
+    loaded = CandleStore(50)
+    assert loaded.load(path) == 2
+    for key in [("BTCUSDT", "1hour"), ("ETHUSDT", "4hour")]:
+        np.testing.assert_array_equal(loaded.buffer(*key).candles, store.buffer(*key).candles)
+    assert len(loaded.buffer("BTCUSDT", "1hour")) == 50
+
+
+def test_a_loaded_store_only_fetches_the_gap(tmp_path):
+    path = str(tmp_path / "candles.bin")
+    store = CandleStore(50)
+    candles = hourly_candles(50)
+    store.update("BTCUSDT", "1hour", candles)
+    store.save(path)
+
+    loaded = CandleStore(50)
+    loaded.load(path)
+    now = candles[-1, 0] + 2.5 * HOUR
+    assert loaded.fetch_limit("BTCUSDT", "1hour", now=now) == 3
+    assert loaded.fetch_limit("ETHUSDT", "1hour", now=now) == 50
+
+
+def test_truncated_and_foreign_files_are_ignored(tmp_path):
+    path = tmp_path / "candles.bin"
+    store = CandleStore(50)
+    store.update("BTCUSDT", "1hour", hourly_candles(50))
+    store.save(str(path))
+    data = path.read_bytes()
+    assert data.startswith(SNAPSHOT_MAGIC)
+
+    # Truncated inside the columns, inside the header, empty, foreign, and a valid body under another magic
+    for content in (data[:len(data) // 2], data[:10], b"", b"not a snapshot" * 10, b"XXXXXXXX" + data[8:]):
+        path.write_bytes(content)
+        loaded = CandleStore(50)
+        assert loaded.load(str(path)) == 0
+        assert len(loaded.buffer("BTCUSDT", "1hour")) == 0
+    assert CandleStore(50).load(str(tmp_path / "missing.bin")) == 0
+
+
+def test_unused_snapshot_pairs_are_carried_over(tmp_path):
+    path = str(tmp_path / "candles.bin")
+    store = CandleStore(50)
+    store.update("BTCUSDT", "1hour", hourly_candles(50, seed=1))
+    store.update("ETHUSDT", "1hour", hourly_candles(50, seed=2))
+    store.save(path)
+
+    loaded = CandleStore(50)
+    loaded.load(path)
+    loaded.update("BTCUSDT", "1hour", hourly_candles(51, seed=3)[-1:])
+    assert loaded.save(path) == 2
+
+    reloaded = CandleStore(50)
+    assert reloaded.load(path) == 2
+    np.testing.assert_array_equal(reloaded.buffer("ETHUSDT", "1hour").candles, store.buffer("ETHUSDT", "1hour").candles)
+    np.testing.assert_array_equal(reloaded.buffer("BTCUSDT", "1hour").candles, loaded.buffer("BTCUSDT", "1hour").candles)
+
+
+def test_symbols_too_long_for_the_index_are_skipped_with_a_warning(tmp_path, caplog):
+    path = str(tmp_path / "candles.bin")
+    symbol = "X" * 33 + "USDT"
+    store = CandleStore(50)
+    store.update("BTCUSDT", "1hour", hourly_candles(50))
+    store.update(symbol, "1hour", hourly_candles(50))
+    with caplog.at_level(logging.WARNING):
+        assert store.save(path) == 1
+    assert symbol in caplog.text
+
+    loaded = CandleStore(50)
+    assert loaded.load(path) == 1
+    assert len(loaded.buffer("BTCUSDT", "1hour")) == 50
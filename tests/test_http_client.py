@@ -0,0 +1,74 @@
+import asyncio
+
+import httpx
+import pytest
+
+from telegram_bot.components.http_client import AsyncHttpClient, CircuitBreaker, CircuitOpenError
+
+
+def test_breaker_opens_and_half_open_trial_closes_it():
+    breaker = CircuitBreaker(threshold=2, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.allow()  # half-open: the trial
+    assert not breaker.allow()  # one trial at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_released_trial_lets_the_next_request_through():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def client_with(handler, **settings):
+    client = AsyncHttpClient(max_retries=0, breaker_threshold=1, breaker_reset=0, **settings)
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_cancelled_trial_does_not_keep_the_circuit_open():
+    async def run():
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise httpx.ConnectError("down")
+            if len(calls) == 2:
+                await asyncio.sleep(3600)
+            return httpx.Response(200)
+
+        client = client_with(handler)
+        with pytest.raises(httpx.ConnectError):
+            await client.get("http://upstream/x")  # opens the circuit
+        trial = asyncio.create_task(client.get("http://upstream/x"))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        response = await client.get("http://upstream/x")
+        await client.close()
+        return response.status_code
+
+    assert asyncio.run(run()) == 200
+
+
+def test_open_circuit_rejects_requests():
+    async def run():
+        async def handler(request):
+            raise httpx.ConnectError("down")
+
+        client = client_with(handler)
+        client._breakers[client._host("http://upstream/x")].reset_timeout = 3600
+        with pytest.raises(httpx.ConnectError):
+            await client.get("http://upstream/x")
+        with pytest.raises(CircuitOpenError):
+            await client.get("http://upstream/x")
+        await client.close()
+
+    asyncio.run(run())
@@ -0,0 +1,67 @@
+import numpy as np
+
+from telegram_bot.components.indicators import NODE_EVALUATIONS, IndicatorGraph, default_graph
+from telegram_bot.components.metrics import REGISTRY
+from telegram_bot.components.signal_filter import StreamingSignal
+from telegram_bot.components.utils import ALPHA1, highpass_filter
+
+HOUR = 3600
+
+
+def random_candles(seed, count):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    volume = rng.uniform(1, 10, count)
+    return np.column_stack((HOUR * np.arange(count, dtype=float), close, volume))
+
+
+def test_default_graph_matches_the_windowed_filter_over_many_cycles():
+    rng = np.random.default_rng(22)
+    candles = random_candles(22, 400)
+    graph = IndicatorGraph(default_graph())
+    streaming = StreamingSignal()
+    for end in range(50, 401):
+        window = candles[end - 50:end].copy()
+        if rng.random() < 0.5:
+            # Still-forming candle seen before its final close
+            forming = window.copy()
+            forming[-1, 1] *= 1 + rng.normal(0, 0.005)
+            graph.signal(forming, "BTCUSDT", "1hour")
+            streaming.update(forming)
+        hp = highpass_filter(window[:, 1], ALPHA1)[-1]
+        q1 = (hp + streaming.k1) / (streaming.k1 * hp + 1)
+        expected = (q1 < streaming.trigger, q1 > streaming.trigger)
+        assert graph.signal(window, "BTCUSDT", "1hour") == expected == streaming.update(window), end
+
+
+def test_a_changed_column_only_recomputes_the_nodes_downstream_of_it():
+    nodes = dict(default_graph())
+    nodes.update({
+        "low": {"op": "below", "inputs": ["q1"]},
+        "high": {"op": "above", "inputs": ["q1"]},
+        "avg": {"op": "sma", "inputs": ["volume"], "period": 5},
+        "busy": {"op": "above", "inputs": ["volume", "avg"]},
+        "buy": {"op": "all", "inputs": ["low", "busy"]},
+        "sell": {"op": "all", "inputs": ["high", "busy"]},
+    })
+    graph = IndicatorGraph(nodes)
+    window = random_candles(7, 50)
+    enabled = REGISTRY.enabled
+    REGISTRY.enabled = True
+
+    def evaluations(candles):
+        before = {result: counter.value for result, counter in NODE_EVALUATIONS.items()}
+        graph.evaluate(candles, "BTCUSDT", "1hour")
+        return {result: counter.value - before[result] for result, counter in NODE_EVALUATIONS.items()}
+
+    try:
+        assert evaluations(window) == {"computed": 8, "memoized": 0}
+        assert evaluations(window) == {"computed": 0, "memoized": 8}
+        # A revised close leaves the volume average and its comparison memoized
+        window[-1, 1] *= 1.001
+        assert evaluations(window) == {"computed": 6, "memoized": 2}
+        # A revised volume leaves the filter chain memoized
+        window[-1, 2] += 1
+        assert evaluations(window) == {"computed": 4, "memoized": 4}
+    finally:
+        REGISTRY.enabled = enabled
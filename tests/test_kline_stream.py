@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import yaml
+
+from telegram_bot.components.kline_stream import (
+    STREAM_BACKFILLS, STREAM_EVALUATIONS, STREAM_RECONNECTS, KlineStream, StandInKlineServer,
+)
+from telegram_bot.components.monitor import SignalMonitor
+from telegram_bot.config.configuration import ConfigurationManager
+
+SYMBOL = "BTCUSDT"
+PERIOD = 60
+
+
+class Outbox:
+    def __init__(self):
+        self.messages = []
+
+    def enqueue(self, chat_id, message):
+        self.messages.append(message)
+
+
+async def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.02)
+
+
+def run_stream(tmp_path, scenario):
+    """
+    Run `scenario(server, stream, monitor, base)` against a stand-in exchange with an hour of candles.
+    """
+    async def run():
+        server = StandInKlineServer()
+        await server.start()
+        # The candles pushed by the tests run up to the current minute, as on the exchange
+        base = int(time.time()) // PERIOD * PERIOD - 62 * PERIOD
+        for index in range(60):
+            await server.push(SYMBOL, base + index * PERIOD, 100 + index % 7)
+        config = {
+            "bot": {"token": "1:x", "chat_id": "@x", "symbols": [SYMBOL], "interval": "1min", "timeframes": []},
+            "exchange": {"kline_url": server.kline_url, "ws_url": server.ws_url},
+            "stream": {"ping_interval": 0.2, "idle_timeout": 2, "reconnect_base": 0.05, "reconnect_max": 0.2},
+            "monitor": {"snapshot_path": None},
+            "state": {"backend": "memory"},
+        }
+        path = tmp_path / "config.yaml"
+        path.write_text(yaml.safe_dump(config))
+        monitor = SignalMonitor(ConfigurationManager(str(path)), outbox=Outbox())
+        stream = KlineStream.from_config(monitor)
+        try:
+            await stream.start()
+            await wait_for(lambda: server.subscribers)
+            await scenario(server, stream, monitor, base)
+        finally:
+            await stream.stop()
+            await monitor.close()
+            await server.stop()
+
+    asyncio.run(run())
+
+
+def test_reconnects_after_the_connection_drops(tmp_path):
+    async def scenario(server, stream, monitor, base):
+        reconnects = STREAM_RECONNECTS.value
+        await server.drop_connections()
+        await wait_for(lambda: server.subscribers)
+        assert STREAM_RECONNECTS.value > reconnects
+        # Updates flow over the new connection
+        await server.push(SYMBOL, base + 60 * PERIOD, 150)
+        buffer = monitor.candle_store.buffer(SYMBOL, "1min")
+        await wait_for(lambda: buffer.candles[-1][0] == base + 60 * PERIOD)
+        assert buffer.candles[-1][1] == 150
+
+    run_stream(tmp_path, scenario)
+
+
+def test_backfills_candles_pushed_while_disconnected(tmp_path):
+    async def scenario(server, stream, monitor, base):
+        backfills = STREAM_BACKFILLS.value
+        await server.drop_connections()
+        # Only the REST endpoint sees these: nobody is subscribed
+        for index in range(60, 63):
+            assert await server.push(SYMBOL, base + index * PERIOD, 120 + index) == 0
+        await wait_for(lambda: STREAM_BACKFILLS.value > backfills)
+        buffer = monitor.candle_store.buffer(SYMBOL, "1min")
+        await wait_for(lambda: buffer.candles[-1][0] == base + 62 * PERIOD)
+        assert [tuple(candle[:2]) for candle in buffer.candles[-3:]] == [
+            (base + index * PERIOD, 120 + index) for index in range(60, 63)
+        ]
+
+    run_stream(tmp_path, scenario)
+
+
+def test_identical_update_is_not_reevaluated(tmp_path):
+    async def scenario(server, stream, monitor, base):
+        buffer = monitor.candle_store.buffer(SYMBOL, "1min")
+        open_time = base + 60 * PERIOD
+        evaluations = STREAM_EVALUATIONS.value
+        await server.push(SYMBOL, open_time, 130)
+        await wait_for(lambda: STREAM_EVALUATIONS.value == evaluations + 1)
+        await server.push(SYMBOL, open_time, 130)
+        # A changed update after the repeat proves the repeat was processed, and skipped
+        await server.push(SYMBOL, open_time, 131)
+        await wait_for(lambda: buffer.candles[-1][1] == 131)
+        assert STREAM_EVALUATIONS.value == evaluations + 2
+
+    run_stream(tmp_path, scenario)
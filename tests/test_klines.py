@@ -0,0 +1,43 @@
+import json
+import time
+
+import numpy as np
+import pytest
+
+from telegram_bot.components.klines import (
+    CANDLE_FIELDS, KLINE_FIELDS, OHLCV_FIELDS, ROW_DECODE_MAX_ITEMS, decode_kline_response, decode_klines,
+)
+from telegram_bot.components.replay import SyntheticMarket
+
+
+def reference(items, fields):
+    """The original decoding: one float() per field."""
+    return np.array([[float(item[KLINE_FIELDS[field]]) for field in fields] for item in items]).reshape(-1, len(fields))
+
+
+@pytest.mark.parametrize("fields", [CANDLE_FIELDS, OHLCV_FIELDS, ("close",)])
+@pytest.mark.parametrize("count", [0, 1, 2, ROW_DECODE_MAX_ITEMS, ROW_DECODE_MAX_ITEMS + 1, 500])
+def test_decode_matches_float_per_field(count, fields):
+    items = json.loads(json.dumps(SyntheticMarket("BTCUSDT", "1min").rows(time.time(), count)))
+    decoded = decode_klines(items, fields)
+    assert decoded.shape == (count, len(fields))
+    assert decoded.dtype == np.float64
+    assert np.array_equal(decoded, reference(items, fields))
+
+
+def test_decode_response_accepts_raw_and_decoded_bodies():
+    items = SyntheticMarket("ETHUSDT", "1hour").rows(time.time(), 40)
+    body = json.dumps({"code": 0, "data": items, "message": "OK"})
+    expected = reference(items, CANDLE_FIELDS)
+    for payload in (body, body.encode(), json.loads(body)):
+        assert np.array_equal(decode_kline_response(payload), expected)
+
+
+@pytest.mark.parametrize("count", [2, 100])
+def test_decode_rejects_unknown_fields_and_bad_values(count):
+    items = SyntheticMarket("BTCUSDT", "1min").rows(time.time(), count)
+    with pytest.raises(ValueError):
+        decode_klines(items, ("time", "vwap"))
+    items[-1][2] = "n/a"
+    with pytest.raises(ValueError):
+        decode_klines(items, CANDLE_FIELDS)
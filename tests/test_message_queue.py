@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+from telegram.error import RetryAfter
+
+from telegram_bot.components.message_queue import MAX_MESSAGE_LENGTH, MessageQueue, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeBot:
+    def __init__(self, clock, failures=None):
+        self.clock = clock
+        self.failures = failures or {}  # chat_id -> exceptions raised by its next sends
+        self.sent = []  # (time, chat_id, text)
+        self.attempts = []  # (time, chat_id)
+
+    async def send_message(self, chat_id, text):
+        self.attempts.append((self.clock(), chat_id))
+        if self.failures.get(chat_id):
+            raise self.failures[chat_id].pop(0)
+        self.sent.append((self.clock(), chat_id, text))
+
+
+def make_queue(failures=None, **settings):
+    clock = FakeClock()
+    bot = FakeBot(clock, failures)
+    return MessageQueue(bot, clock=clock, **settings), bot, clock
+
+
+def drain(queue, clock):
+    """Send everything queued, jumping the clock forward instead of sleeping."""
+    async def run():
+        while queue._pending:
+            chat_id, wait = queue._next_send()
+            if wait > 0:
+                clock.now += wait
+                continue
+            await queue._deliver(chat_id, *queue._take(chat_id))
+
+    asyncio.run(run())
+
+
+def test_token_bucket_refills_at_its_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(2, burst=3, clock=clock)
+    for _ in range(3):
+        assert bucket.wait_time() == 0
+        bucket.take()
+    assert bucket.wait_time() == 0.5
+    clock.now = 0.25
+    assert bucket.wait_time() == 0.25
+    clock.now = 10
+    assert bucket.wait_time() == 0 and bucket.tokens == 3
+
+
+def test_the_global_rate_limit_spans_all_chats():
+    queue, bot, clock = make_queue(global_rate=2, digest=False)
+    for chat in range(6):
+        queue.enqueue(f"chat{chat}", "signal")
+    drain(queue, clock)
+    assert [time for time, _, _ in bot.sent] == [0, 0, 0.5, 1.0, 1.5, 2.0]
+
+
+def test_the_chat_rate_limit_applies_after_its_burst():
+    queue, bot, clock = make_queue(chat_rate=1, chat_burst=3, digest=False)
+    for number in range(5):
+        queue.enqueue("chat", f"signal {number}")
+    queue.enqueue("other", "signal")
+    drain(queue, clock)
+    assert [time for time, chat_id, _ in bot.sent if chat_id == "chat"] == [0, 0, 0, 1, 2]
+    # A busy chat does not hold back the others
+    assert [time for time, chat_id, _ in bot.sent if chat_id == "other"] == [0]
+
+
+def test_messages_keep_their_order_within_a_chat():
+    queue, bot, clock = make_queue(chat_rate=1, chat_burst=1, digest=False)
+    for number in range(5):
+        queue.enqueue("a", f"a{number}")
+        queue.enqueue("b", f"b{number}")
+    drain(queue, clock)
+    for chat in ("a", "b"):
+        assert [text for _, chat_id, text in bot.sent if chat_id == chat] == [f"{chat}{n}" for n in range(5)]
+
+
+def test_a_digest_merges_pending_messages_up_to_the_length_limit():
+    queue, bot, clock = make_queue()
+    for number in range(4):
+        queue.enqueue("chat", str(number) * 2000)
+    queue.enqueue("other", "short one")
+    queue.enqueue("other", "short two")
+    drain(queue, clock)
+    chat = [text for _, chat_id, text in bot.sent if chat_id == "chat"]
+    assert [len(text) for text in chat] == [4002, 4002]
+    assert all(len(text) <= MAX_MESSAGE_LENGTH for text in chat)
+    assert "".join(chat).replace("\n", "") == "".join(str(number) * 2000 for number in range(4))
+    assert [text for _, chat_id, text in bot.sent if chat_id == "other"] == ["short one\n\nshort two"]
+
+
+# The queue reads retry_after both as seconds and as the timedelta PTB is moving to
+@pytest.mark.filterwarnings("ignore::telegram.warnings.PTBDeprecationWarning")
+def test_a_rate_limited_message_is_resent_after_retry_after():
+    queue, bot, clock = make_queue(failures={"chat": [RetryAfter(7)]}, digest=False)
+    queue.enqueue("chat", "first")
+    queue.enqueue("chat", "second")
+    drain(queue, clock)
+    assert bot.attempts[0] == (0, "chat")
+    # The rejected message goes out first, once the hint has passed
+    assert [(time, text) for time, _, text in bot.sent] == [(7, "first"), (7, "second")]
+
+
+def test_a_message_is_dropped_after_max_attempts():
+    queue, bot, clock = make_queue(failures={"chat": [OSError("down")] * 5}, max_attempts=3)
+    queue.enqueue("chat", "lost")
+    drain(queue, clock)
+    # Backs off 1 and 2 seconds between the attempts
+    assert bot.attempts == [(0, "chat"), (1, "chat"), (3, "chat")]
+    assert bot.sent == [] and queue.dropped == 1 and queue.pending() == 0
+
+
+def test_the_sender_delivers_queued_messages():
+    async def run():
+        bot = FakeBot(FakeClock())
+        queue = MessageQueue(bot)
+        queue.start()
+        queue.enqueue("chat", "one")
+        queue.enqueue("other", "two")
+        await queue.stop(timeout=5)
+        return bot.sent
+
+    assert sorted(text for _, _, text in asyncio.run(run())) == ["one", "two"]
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from telegram_bot.components.metrics import REGISTRY, instrumented
+
+
+def error_count(name):
+    return REGISTRY.counter("telegram_bot_call_errors_total", function=name).value
+
+
+def test_cancelled_call_is_not_an_error():
+    @instrumented("test_cancelled")
+    async def wait():
+        await asyncio.sleep(3600)
+
+    async def run():
+        task = asyncio.create_task(wait())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert error_count("test_cancelled") == 0
+
+
+def test_failures_are_counted():
+    @instrumented("test_failing")
+    async def fail():
+        raise RuntimeError("boom")
+
+    @instrumented("test_failing_sync")
+    def fail_sync():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(fail())
+    with pytest.raises(RuntimeError):
+        fail_sync()
+    assert error_count("test_failing") == 1
+    assert error_count("test_failing_sync") == 1
+
+
+def test_keyboard_interrupt_is_not_an_error():
+    @instrumented("test_interrupted")
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        interrupted()
+    assert error_count("test_interrupted") == 0
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+import yaml
+
+from telegram_bot.components.candle_store import CandleStore
+from telegram_bot.components.monitor import SignalMonitor
+from telegram_bot.config.configuration import ConfigurationManager
+
+HOUR = 3600
+
+
+def make_monitor(tmp_path, interval="1hour", timeframes=(), candle_limit=50, kline_limit=1000):
+    config = {
+        "bot": {"token": "1:x", "chat_id": "@x", "symbols": ["BTCUSDT"], "interval": interval,
+                "timeframes": list(timeframes)},
+        "monitor": {"candle_limit": candle_limit, "snapshot_path": None},
+        "exchange": {"kline_limit": kline_limit},
+        "state": {"backend": "memory"},
+    }
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return SignalMonitor(ConfigurationManager(str(path)))
+
+
+def hourly_candles(count, start=1_700_000_000 // 86400 * 86400):
+    times = start + HOUR * np.arange(count, dtype=float)
+    close = 100 + np.sin(np.arange(count) / 3)
+    return np.column_stack((times, close, np.ones(count)))
+
+
+def test_capacity_beyond_one_kline_request_is_rejected(tmp_path):
+    # 50 daily candles need 51 * 24 = 1224 hourly ones
+    with pytest.raises(ValueError, match="kline"):
+        make_monitor(tmp_path, timeframes=["1day"])
+    monitor = make_monitor(tmp_path, timeframes=["1day"], candle_limit=40)
+    assert monitor.candle_store.capacity == 41 * 24 <= monitor.kline_limit
+
+
+def test_fetch_limit_treats_a_full_request_as_warm():
+    store = CandleStore(1200)
+    assert store.fetch_limit("BTCUSDT", "1hour", max_limit=1000) == 1000
+    candles = hourly_candles(1000)
+    store.update("BTCUSDT", "1hour", candles)
+    now = candles[-1, 0] + 2.5 * HOUR
+    assert store.fetch_limit("BTCUSDT", "1hour", now=now, max_limit=1000) == 3
+    assert store.fetch_limit("BTCUSDT", "1hour", now=now) == 1200
+
+
+@pytest.mark.parametrize("mode", ["streaming", "batch", "graph"])
+def test_windows_shorter_than_a_coarse_candle_are_skipped(tmp_path, mode):
+    monitor = make_monitor(tmp_path, timeframes=["4hour"])
+    # Starting mid-bucket, six hourly candles hold one partial and one forming 4-hour candle
+    short = hourly_candles(6, start=1_700_000_000 // 86400 * 86400 + HOUR)
+    states = monitor.evaluate({"BTCUSDT": short}, mode=mode)
+    assert "BTCUSDT@4hour" not in states
+
+    states = monitor.evaluate({"BTCUSDT": hourly_candles(200)}, mode=mode)
+    assert {"BTCUSDT", "BTCUSDT@4hour"} <= set(states)
+
+
+def test_modes_agree_over_many_cycles(tmp_path):
+    rng = np.random.default_rng(6)
+    count = 600
+    candles = hourly_candles(count)
+    candles[:, 1] = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    monitors = {mode: make_monitor(tmp_path, timeframes=["4hour"]) for mode in ("streaming", "batch", "graph")}
+    for end in range(240, count + 1):
+        window = candles[end - 240:end].copy()
+        if rng.random() < 0.5:
+            # Still-forming candle seen before its final close
+            forming = window.copy()
+            forming[-1, 1] *= 1 + rng.normal(0, 0.005)
+            for mode, monitor in monitors.items():
+                monitor.evaluate({"BTCUSDT": forming}, mode=mode)
+        states = {mode: monitor.evaluate({"BTCUSDT": window}, mode=mode) for mode, monitor in monitors.items()}
+        assert set(states["streaming"]) == {"BTCUSDT", "BTCUSDT@4hour"}
+        assert states["streaming"] == states["batch"] == states["graph"], end
+
+
+def test_rejected_reload_leaves_the_monitor_untouched(tmp_path):
+    monitor = make_monitor(tmp_path)
+    path = tmp_path / "config.yaml"
+    config = yaml.safe_load(path.read_text())
+    config["monitor"]["snapshot_path"] = str(tmp_path / "candles.bin")
+    path.write_text(yaml.safe_dump(config))
+    monitor.config_manager.reload()
+    monitor.configure()
+    monitor.candle_store.update("BTCUSDT", "1hour", hourly_candles(50))
+    monitor.evaluate({"BTCUSDT": hourly_candles(50)})
+    before = (monitor.candle_store, monitor.indicator_graph, monitor.signal_filters, monitor.timeframes,
+              monitor.price_settings)
+
+    # The new timeframe alone is valid; the misspelled price source is not
+    config["bot"]["timeframes"] = ["4hour"]
+    config["prices"] = {"sources": ["candel"]}
+    path.write_text(yaml.safe_dump(config))
+    monitor.config_manager.reload()
+    with pytest.raises(ValueError, match="candel"):
+        monitor.configure()
+    after = (monitor.candle_store, monitor.indicator_graph, monitor.signal_filters, monitor.timeframes,
+             monitor.price_settings)
+    assert all(old is new for old, new in zip(before, after))
+    assert monitor.timeframes == ["1hour"] and "BTCUSDT" in monitor.signal_filters
+    assert len(monitor.candle_store.buffer("BTCUSDT", "1hour")) == 50
+    assert not (tmp_path / "candles.bin").exists()
@@ -0,0 +1,90 @@
+import threading
+import time
+
+from telegram_bot.components.price_cache import PriceCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class BlockingLoader:
+    """Counts upstream calls; each call waits for `release` before returning the next price."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.price = 100.0
+
+    def __call__(self, symbol):
+        self.calls.append(symbol)
+        assert self.release.wait(5)
+        return self.price, None
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_concurrent_misses_make_one_upstream_call():
+    loader = BlockingLoader()
+    cache = PriceCache(loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("btc"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    # Every caller is waiting on the one fetch before it is allowed to finish
+    wait_until(lambda: cache.stats()["misses"] == 8)
+    loader.release.set()
+    for thread in threads:
+        thread.join()
+    assert loader.calls == ["BTC"]
+    assert results == [(100.0, None)] * 8
+    assert cache.stats()["coalesced"] == 7
+
+
+def test_a_stale_entry_is_served_while_one_refresh_runs():
+    loader, clock = BlockingLoader(), FakeClock()
+    loader.release.set()
+    cache = PriceCache(loader, ttl=30, stale_ttl=120, clock=clock)
+    assert cache.get("BTC") == (100.0, None)
+
+    loader.release.clear()
+    loader.price = 101.0
+    clock.now = 31
+    # Served at once from the stale entry; only the first stale read starts a refresh
+    assert cache.get("BTC") == (100.0, None)
+    assert cache.get("BTC") == (100.0, None)
+    wait_until(lambda: len(loader.calls) == 2)
+    loader.release.set()
+    wait_until(lambda: cache.peek("BTC")[0] == 101.0)
+    assert cache.get("BTC") == (101.0, None)
+    assert len(loader.calls) == 2
+    assert cache.stats()["stale_hits"] == 2
+
+    # Past the stale window the caller waits for a fresh price
+    loader.price = 102.0
+    clock.now = 31 + 151
+    assert cache.get("BTC") == (102.0, None)
+    assert len(loader.calls) == 3
+
+
+def test_the_least_recently_used_symbol_is_evicted():
+    loader = BlockingLoader()
+    loader.release.set()
+    cache = PriceCache(loader, max_size=2)
+    cache.get("BTC")
+    cache.get("ETH")
+    cache.get("BTC")  # a hit makes ETH the least recently used
+    cache.get("XRP")
+    assert cache.peek("ETH") is None
+    assert cache.peek("BTC") is not None and cache.peek("XRP") is not None
+    cache.update({"SOL": 1.0})
+    assert cache.peek("BTC") is None and cache.stats()["size"] == 2
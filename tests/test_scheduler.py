@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from telegram_bot.components.scheduler import CandleScheduler, next_boundary, spread_offset
+
+HOUR = 3600
+# A whole hour, so the monotonic and wall clocks below share their boundaries
+WALL_OFFSET = 1_700_000_000 // 86400 * 86400
+
+
+class FakeConfig:
+    def __init__(self, values=None):
+        self.values = dict(values or {})
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+
+class FakeMonitor:
+    def __init__(self, symbols, base_interval="1hour"):
+        self.symbols = list(symbols)
+        self.base_interval = base_interval
+        self.config_manager = FakeConfig()
+        self.newest = {}  # symbol -> open time of its newest candle
+        self.passes = []
+
+    def apply_config(self):
+        pass
+
+    def on_config_change(self, changed):
+        pass
+
+    async def run_symbols(self, symbols, bot=None):
+        self.passes.append(list(symbols))
+
+    def newest_candle(self, symbol):
+        return (self.newest[symbol],) if symbol in self.newest else None
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = float(now)
+
+    def __call__(self):
+        return self.now
+
+    def wall(self):
+        return self.now + WALL_OFFSET
+
+
+def make_scheduler(symbols, now, **settings):
+    clock = FakeClock(now)
+    monitor = FakeMonitor(symbols)
+    return CandleScheduler(monitor, clock=clock, wall_clock=clock.wall, **settings), monitor, clock
+
+
+@pytest.mark.parametrize("interval, now, expected", [
+    ("1hour", 10 * HOUR + 10, 11 * HOUR),
+    ("1hour", 10 * HOUR, 11 * HOUR),  # a candle opening now closes an interval later
+    ("15min", 10 * HOUR + 899, 10 * HOUR + 900),
+    ("1week", 7 * 86400, 11 * 86400),  # weeks open on Monday, four days after the epoch
+])
+def test_next_boundary(interval, now, expected):
+    assert next_boundary(interval, now) == expected
+
+
+def test_next_due_adds_the_close_delay_and_the_symbol_offset():
+    scheduler, _, _ = make_scheduler(["BTCUSDT"], 0, close_delay=2, spread=5)
+    offset = 2 + spread_offset("BTCUSDT", 5)
+    start = WALL_OFFSET + 10 * HOUR
+    assert scheduler.next_due("BTCUSDT", 100.0, start + 60) == (pytest.approx(100.0 + HOUR - 60 + offset), start + HOUR)
+    # Past the boundary but before its delayed close, the symbol still waits for that close
+    assert scheduler.next_due("BTCUSDT", 100.0, start + offset / 2) == (pytest.approx(100.0 + offset / 2), start)
+    assert scheduler.next_due("BTCUSDT", 100.0, start + offset) == (pytest.approx(100.0 + HOUR), start + HOUR)
+
+
+def test_next_due_checks_within_the_candle():
+    scheduler, _, _ = make_scheduler(["BTCUSDT"], 0, close_delay=2, spread=0, check_interval=900)
+    start = WALL_OFFSET + 10 * HOUR
+    # Checks are delayed like the close
+    assert scheduler.next_due("BTCUSDT", 0.0, start + 100) == (900 + 2 - 100, None)
+    # The last check of a candle coincides with its close, which expects the new candle
+    assert scheduler.next_due("BTCUSDT", 0.0, start + 2800) == (HOUR - 2800 + 2, start + HOUR)
+
+
+def test_a_missing_candle_is_retried_up_to_max_retries():
+    scheduler, monitor, clock = make_scheduler(["BTCUSDT"], 10 * HOUR - 1, close_delay=2, spread=0, retry_delay=3,
+                                               max_retries=2)
+    assert asyncio.run(scheduler.run_once()) == ["BTCUSDT"]  # warm-up
+    due, opened, retries = scheduler._due["BTCUSDT"]
+    assert (due, opened, retries) == (10 * HOUR + 2, WALL_OFFSET + 10 * HOUR, 0)
+
+    for attempt in range(1, 3):
+        clock.now = scheduler._due["BTCUSDT"][0]
+        assert asyncio.run(scheduler.run_once()) == ["BTCUSDT"]
+        assert scheduler._due["BTCUSDT"] == (clock.now + 3, opened, attempt)
+
+    # Out of retries: back on the schedule, expecting the next close
+    clock.now = scheduler._due["BTCUSDT"][0]
+    asyncio.run(scheduler.run_once())
+    assert scheduler._due["BTCUSDT"] == (11 * HOUR + 2, WALL_OFFSET + 11 * HOUR, 0)
+    assert len(monitor.passes) == 4
+
+    # A published candle ends the retries
+    clock.now = scheduler._due["BTCUSDT"][0]
+    monitor.newest["BTCUSDT"] = WALL_OFFSET + 11 * HOUR
+    asyncio.run(scheduler.run_once())
+    assert scheduler._due["BTCUSDT"] == (12 * HOUR + 2, WALL_OFFSET + 12 * HOUR, 0)
+
+
+def test_a_config_change_keeps_the_symbols_spread():
+    symbols = [f"COIN{i}USDT" for i in range(20)]
+    scheduler, monitor, clock = make_scheduler(symbols, 10 * HOUR + 60, close_delay=2, spread=30, coalesce=0)
+    scheduler.sync_symbols()
+    for symbol in symbols:
+        scheduler.schedule(symbol, *scheduler.next_due(symbol, clock.now, clock.wall()))
+    before = dict(scheduler._due)
+
+    monitor.config_manager.values["schedule.spread"] = 30
+    scheduler.on_config_change({"schedule.close_delay"})
+    monitor.symbols.append("NEWUSDT")
+    assert asyncio.run(scheduler.run_once()) == ["NEWUSDT"]
+    assert {symbol: scheduler._due[symbol] for symbol in symbols} == before
+    assert len({due for due, _, _ in before.values()}) == len(symbols)
+
+    # New settings move every slot, still spread out
+    monitor.config_manager.values["schedule.close_delay"] = 10
+    scheduler.on_config_change({"schedule.close_delay"})
+    monitor.symbols.append("OTHERUSDT")
+    assert asyncio.run(scheduler.run_once()) == ["OTHERUSDT"]
+    for symbol in symbols:
+        assert scheduler._due[symbol] == (before[symbol][0] + 8, before[symbol][1], 0)
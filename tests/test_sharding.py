@@ -0,0 +1,39 @@
+import pytest
+
+from telegram_bot.components.sharding import DEFAULT_AUTHKEY, ShardBroker, connect_registry
+from telegram_bot.components.utils import is_loopback
+
+
+@pytest.mark.parametrize("host, loopback", [("127.0.0.1", True), ("localhost", True), ("::1", True),
+                                            ("0.0.0.0", False), ("10.0.0.5", False), ("broker.internal", False)])
+def test_is_loopback(host, loopback):
+    assert is_loopback(host) is loopback
+
+
+@pytest.mark.parametrize("authkey", [None, b"", DEFAULT_AUTHKEY])
+def test_broker_refuses_a_public_address_without_its_own_secret(authkey):
+    with pytest.raises(ValueError):
+        ShardBroker(("0.0.0.0", 0), authkey)
+
+
+# BaseManager's serve_forever ends its thread with sys.exit(0) when the broker stops
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_loopback_broker_without_a_secret_uses_a_random_key():
+    broker = ShardBroker(("127.0.0.1", 0))
+    assert broker.authkey and broker.authkey != DEFAULT_AUTHKEY
+    broker.start()
+    try:
+        registry = connect_registry(broker.address, broker.authkey, timeout=5)
+        registry.heartbeat("w0")
+        assert broker.registry.live_workers(5) == ["w0"]
+        with pytest.raises(Exception):
+            connect_registry(broker.address, DEFAULT_AUTHKEY, timeout=0).heartbeat("w1")
+    finally:
+        broker.stop()
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_public_broker_with_a_secret_starts():
+    broker = ShardBroker(("0.0.0.0", 0), b"not-the-default")
+    broker.start()
+    broker.stop()
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from telegram_bot.components.signal_filter import StreamingSignal, evaluate_signal_matrix, highpass_filter_matrix
+from telegram_bot.components.utils import ALPHA1, highpass_filter
+
+
+def reference_highpass(close, alpha1):
+    """The original per-element filter loop the faster paths must reproduce bit for bit."""
+    hp = np.zeros(len(close))
+    for i in range(2, len(close)):
+        hp[i] = (
+            (1 - alpha1 / 2) * (1 - alpha1 / 2) * (close[i] - 2 * close[i - 1] + close[i - 2])
+            + 2 * (1 - alpha1) * hp[i - 1]
+            - (1 - alpha1) * (1 - alpha1) * hp[i - 2]
+        )
+    return hp
+
+
+def random_closes(seed, length):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, length)))
+
+
+@pytest.mark.parametrize("alpha1", [ALPHA1, 0.2])
+@pytest.mark.parametrize("length", [0, 1, 2, 3, 50, 500])
+def test_highpass_filter_matches_reference(length, alpha1):
+    close = random_closes(length, length)
+    assert np.array_equal(highpass_filter(close, alpha1), reference_highpass(close, alpha1))
+
+
+def test_highpass_filter_matrix_matches_reference_per_row():
+    closes = np.stack([random_closes(seed, 200) for seed in range(20)])
+    hp = highpass_filter_matrix(closes)
+    for row, close in zip(hp, closes):
+        assert np.array_equal(row, reference_highpass(close, ALPHA1))
+
+
+def test_push_matches_reference():
+    close = random_closes(1, 300)
+    expected = reference_highpass(close, ALPHA1)
+    signal = StreamingSignal()
+    assert [signal.push(value) for value in close] == expected.tolist()
+
+
+def test_revise_matches_reference_of_revised_series():
+    close = random_closes(2, 100)
+    signal = StreamingSignal()
+    for value in close:
+        signal.push(value)
+    for revised in (close[-1] * 1.01, close[-1] * 0.97):
+        close[-1] = revised
+        assert signal.revise(revised) == reference_highpass(close, ALPHA1)[-1]
+
+
+def test_update_matches_batch_signal():
+    rng = np.random.default_rng(3)
+    close = random_closes(3, 300)
+    candles = np.column_stack([3600.0 * np.arange(300), close, np.ones(300)])
+    signal = StreamingSignal()
+    signal.update(candles[:50])
+    for end in range(51, 301):
+        window = candles[end - 50:end].copy()
+        if rng.random() < 0.5:
+            # Still-forming candle seen before its final close
+            forming = window.copy()
+            forming[-1, 1] *= 1.002
+            signal.update(forming)
+        state = signal.update(window)
+        hp = reference_highpass(window[:, 1], ALPHA1)[-1]
+        assert np.isclose(signal.hp, hp, rtol=1e-9, atol=1e-9)
+        q1 = (hp + signal.k1) / (signal.k1 * hp + 1)
+        assert state == (q1 < signal.trigger, q1 > signal.trigger)
+
+
+def test_evaluate_signal_matrix_matches_streaming():
+    closes = np.stack([random_closes(seed, 50) for seed in range(30)])
+    buy, sell = evaluate_signal_matrix(closes)
+    for row, close in enumerate(closes):
+        signal = StreamingSignal()
+        signal.warm_up(close)
+        assert (buy[row], sell[row]) == signal.signals
+
+
+def test_update_with_an_empty_window_signals_nothing():
+    empty = np.empty((0, 3))
+    assert StreamingSignal().update(empty) == (False, False)
+
+    close = random_closes(4, 60)
+    candles = np.column_stack((np.arange(60) * 60.0, close, np.ones(60)))
+    streaming = StreamingSignal()
+    before = streaming.update(candles)
+    hp, timestamp = streaming.hp, streaming.timestamp
+    assert streaming.update(empty) == (False, False)
+    # The filter state is untouched by the empty window
+    assert (streaming.hp, streaming.timestamp) == (hp, timestamp)
+    assert streaming.update(candles) == before
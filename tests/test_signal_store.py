@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+from telegram_bot.components.signal_store import MemorySignalStore, SQLiteSignalStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    store = MemorySignalStore() if request.param == "memory" else SQLiteSignalStore(str(tmp_path / "signals.db"))
+    yield store
+    store.close()
+
+
+def test_a_losing_compare_and_set_is_not_applied(store):
+    assert store.compare_and_set("BTCUSDT", None, "buy")
+    # Both callers decided from "no signal yet"; only the first one wins
+    assert not store.compare_and_set("BTCUSDT", None, "sell")
+    assert not store.compare_and_set("BTCUSDT", "sell", "buy")
+    assert store.get("BTCUSDT") == "buy"
+
+    changes = [("BTCUSDT", "buy", "sell"), ("ETHUSDT", "buy", "sell"), ("XRPUSDT", None, "buy")]
+    assert store.compare_and_set_many(changes) == {"BTCUSDT", "XRPUSDT"}
+    assert store.load() == {"BTCUSDT": "sell", "XRPUSDT": "buy"}
+
+
+def test_two_sqlite_stores_on_one_file_have_one_winner_per_transition(tmp_path):
+    path = str(tmp_path / "signals.db")
+    stores = [SQLiteSignalStore(path), SQLiteSignalStore(path)]
+    symbols = [f"COIN{i}USDT" for i in range(200)]
+    barrier = threading.Barrier(len(stores))
+    won = [set() for _ in stores]
+
+    def race(index):
+        barrier.wait()
+        for symbol in symbols:
+            if stores[index].compare_and_set(symbol, None, "buy"):
+                won[index].add(symbol)
+            if stores[index].compare_and_set(symbol, "buy", "sell"):
+                won[index].add((symbol, "sell"))
+
+    threads = [threading.Thread(target=race, args=(index,)) for index in range(len(stores))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    try:
+        assert not won[0] & won[1]
+        assert won[0] | won[1] == set(symbols) | {(symbol, "sell") for symbol in symbols}
+        assert stores[0].load() == stores[1].load() == dict.fromkeys(symbols, "sell")
+    finally:
+        for store in stores:
+            store.close()
+
+
+def test_sqlite_state_survives_reopening(tmp_path):
+    path = str(tmp_path / "signals.db")
+    store = SQLiteSignalStore(path)
+    store.compare_and_set_many([("BTCUSDT", None, "buy"), ("ETHUSDT", None, "sell")])
+    store.close()
+
+    store = SQLiteSignalStore(path)
+    try:
+        assert store.load() == {"BTCUSDT": "buy", "ETHUSDT": "sell"}
+        assert not store.compare_and_set("BTCUSDT", None, "sell")
+        assert store.compare_and_set("BTCUSDT", "buy", "sell")
+    finally:
+        store.close()
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+from telegram.error import TimedOut
+
+from telegram_bot.components.bot_request import AiohttpRequest
+from telegram_bot.components.webhook import WebhookServer
+
+
+def test_public_listen_address_requires_a_secret_token():
+    with pytest.raises(ValueError, match="secret_token"):
+        WebhookServer(None, "0.0.0.0")
+    assert WebhookServer(None, "0.0.0.0", secret_token="s3cret").listen == "0.0.0.0"
+    assert WebhookServer(None).listen == "127.0.0.1"
+
+
+def test_aiohttp_request_applies_its_timeouts_unless_overridden():
+    from aiohttp import web
+
+    async def slow(request):
+        await asyncio.sleep(0.3)
+        return web.Response(text="ok")
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/", slow)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{runner.addresses[0][1]}/"
+        request = AiohttpRequest(read_timeout=0.05)
+        await request.initialize()
+        try:
+            with pytest.raises(TimedOut):
+                await request.do_request(url, "GET")
+            return await request.do_request(url, "GET", read_timeout=5)
+        finally:
+            await request.shutdown()
+            await runner.cleanup()
+
+    assert asyncio.run(run()) == (200, b"ok")